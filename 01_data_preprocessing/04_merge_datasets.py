@@ -10,15 +10,12 @@ ROOT_DIR_FOR_IMPORT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))
 sys.path.append(ROOT_DIR_FOR_IMPORT)
 
 from config.paths import UNZIPPED_DIR, ROOT_DIR
+from config.dataset_params import CLASS_MERGE_MAP
 from utils.logger_config import setup_logging
 
 UNIFIED_DATASET_NAME = 'unificacaoDosOceanos'
 UNIFIED_DATASET_DIR = os.path.join(UNZIPPED_DIR, UNIFIED_DATASET_NAME)
 
-CLASS_MERGE_MAP = {
-    'stingray': 'ray'
-}
-
 def create_unified_structure(logger: logging.Logger):
     """Cria a estrutura de diretórios para o dataset unificado."""
     logger.info(f"Criando a estrutura de diretórios em '{UNIFIED_DATASET_DIR}'...")
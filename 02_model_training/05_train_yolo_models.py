@@ -2,23 +2,35 @@
 import sys
 import logging
 import datetime
-import csv
 import time
 import os
+import shutil
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 try:
     import torch
     from ultralytics import YOLO
+    from ultralytics.cfg import DEFAULT_CFG
 except ImportError:
     print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics).")
     print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics pyyaml")
     sys.exit(1)
 
-from config.paths import UNZIPPED_DIR, REPORTS_DIR, ROOT_DIR, RUNS_DIR
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, ROOT_DIR, RUNS_DIR, STAGES_DIR, CACHE_DIR
+from config.evaluation_params import TEST_TENSOR_CACHE_CONFIG
 from config.training_params import YOLO_CONFIG
 from utils.logger_config import setup_logging
+from utils.latency_benchmark import medir_latencia_ms
+from utils.edge_profiles import medir_latencia_perfis
+from utils.model_cache import cache_modelos, carregar_modelo, carregar_modelo_para_treino
+from utils.test_tensor_cache import entradas_reais_de_teste
+from utils.validation_schedule import criar_trainer_agendado
+from utils.progressive_resize import calcular_estagios, descrever_agenda, taxas_do_estagio
+from utils.backbone_feature_cache import TreinadorCabecaComCache
+from utils.training_jobs import (nomes_do_job, resultado_inicial, registrar_interrupcao_antecipada,
+                                 registrar_conclusao, registrar_run, gerar_relatorios)
+from utils.distillation import resolver_pesos_professor, CacheProfessor, montar_dataset_destilacao
 
 class PipelineTreinamentoYOLO:
     """
@@ -32,6 +44,8 @@ class PipelineTreinamentoYOLO:
         self.root_dir = Path(ROOT_DIR)
                                                
         self.runs_dir = Path(RUNS_DIR)
+        self.stages_dir = Path(STAGES_DIR)
+        self.cache_dir = Path(CACHE_DIR)
         self.timestamp = datetime.datetime.now().strftime('%d-%m-%Y_%H-%M-%S')
         self.logger = setup_logging('YOLO_Training_Logger', __file__)
         self.resultados = []
@@ -55,7 +69,7 @@ class PipelineTreinamentoYOLO:
 
         for job in self.config["TRAINING_JOBS"]:
             try:
-                YOLO(job['base_model'])
+                cache_modelos().precarregar(job['base_model'])
                 self.logger.info(f"[OK] Modelo '{job['base_model']}' disponível.")
             except Exception as e:
                 self.logger.critical(f"[FALHA] Modelo '{job['base_model']}' não disponível: {e}")
@@ -68,91 +82,196 @@ class PipelineTreinamentoYOLO:
         self.logger.info("[OK] Verificação do ambiente concluída com sucesso.")
         return device
 
-    def _medir_latencia(self, model_path: str, device: str) -> float:
+    def _medir_latencia(self, model_path: str, device: str, data_config: Optional[str] = None) -> float:
         """Mede a latência de inferência de um modelo."""
         try:
             self.logger.info(f"  Iniciando medição de latência para '{Path(model_path).name}'...")
-            model = YOLO(model_path)
-
-            if device.isdigit():
-                inference_device = int(device)
-            else:
-                inference_device = device
-
-            model.to(inference_device)
-            dummy_input = torch.randn(1, 3, self.config['IMG_SIZE'], self.config['IMG_SIZE']).to(inference_device)
-
-            for _ in range(self.config['LATENCY_WARMUPS']):
-                model(dummy_input, verbose=False)
-
-            latencies = []
-            for _ in range(self.config['LATENCY_RUNS']):
-                start = time.perf_counter()
-                model(dummy_input, verbose=False)
-                end = time.perf_counter()
-                latencies.append((end - start) * 1000)
-
-            avg_latency = sum(latencies) / len(latencies)
+            avg_latency = medir_latencia_ms(carregar_modelo(model_path), self.config['IMG_SIZE'], device,
+                                            self.config['LATENCY_WARMUPS'], self.config['LATENCY_RUNS'],
+                                            self._entradas_latencia(data_config))
             self.logger.info(f"  Latência média de inferência: {avg_latency:.2f} ms.")
             return avg_latency
         except Exception as e:
             self.logger.error(f"  Falha ao medir a latência: {e}", exc_info=True)
             return 0.0
 
+    def _entradas_latencia(self, data_config: Optional[str]):
+        """Imagens reais do split de teste, do cache de tensores; None (tensor aleatório) se indisponível."""
+        if not data_config or not TEST_TENSOR_CACHE_CONFIG['ENABLED']:
+            return None
+        try:
+            return entradas_reais_de_teste(data_config, self.config['IMG_SIZE'], TEST_TENSOR_CACHE_CONFIG,
+                                           self.cache_dir / 'test_tensors')
+        except Exception:
+            self.logger.warning("  Cache de tensores de teste indisponível; usando tensor aleatório.", exc_info=True)
+            return None
+
+    def _treinar_estagios_progressivos(self, job: Dict[str, Any], data_config: str, device: str, run_name: str):
+        """
+        Treina os estágios de resolução reduzida da agenda progressiva, carregando os pesos
+        de um estágio para o seguinte. Cada estágio recebe o trecho correspondente da agenda linear
+        de taxa de aprendizado do treino completo, e o mosaico só é desligado no estágio final.
+        Retorna os pesos e a lista de estágios [(imgsz, épocas), ...].
+        """
+        estagios = calcular_estagios(self.config['PROGRESSIVE_RESIZE_SCHEDULE'], self.config['NUM_EPOCHS'])
+        if estagios[-1][0] != self.config['IMG_SIZE']:
+            self.logger.warning(f"  O estágio final ({estagios[-1][0]}px) difere de IMG_SIZE ({self.config['IMG_SIZE']}px).")
+        self.logger.info("  A taxa de aprendizado segue uma única agenda linear ao longo dos estágios, mas o estado "
+                         "do otimizador (momentos) é reiniciado a cada estágio.")
+
+        pesos = job['base_model']
+        for i, (imgsz, epocas) in enumerate(estagios[:-1]):
+            lr0, lrf = taxas_do_estagio(estagios, i, DEFAULT_CFG.lr0, DEFAULT_CFG.lrf)
+            self.logger.info(f"  Estágio {i + 1}/{len(estagios)}: {epocas} épocas a {imgsz}px, lr0={lr0:.2e} "
+                             f"(pesos: {pesos}).")
+            model = carregar_modelo_para_treino(pesos)
+            model.train(
+                data=data_config,
+                epochs=epocas,
+                batch=self.config['BATCH_SIZE'],
+                optimizer=self.config['OPTIMIZER'],
+                lr0=lr0,
+                lrf=lrf,
+                device=device,
+                imgsz=imgsz,
+                warmup_epochs=0 if i > 0 else 3,
+                close_mosaic=0,
+                val=False,
+                project=str(self.stages_dir),
+                name=f"{run_name}_estagio{i + 1}_{imgsz}px",
+                exist_ok=True,
+                verbose=True
+            )
+            pesos = str(Path(model.trainer.save_dir) / 'weights' / 'last.pt')
+
+        self.logger.info(f"  Estágio {len(estagios)}/{len(estagios)}: {estagios[-1][1]} épocas a {estagios[-1][0]}px.")
+        return pesos, estagios
+
+    def _treinar_backbone_congelado(self, job: Dict[str, Any], data_config: str, device: str, run_name: str):
+        """
+        Treina pescoço e cabeça a partir do cache de características do backbone congelado.
+        Retorna o checkpoint resultante (ponto de partida do ajuste fino completo) e a razão
+        estimada entre o custo de um passo de treino completo e o de um passo só de pescoço/cabeça.
+        """
+        epocas_cabeca = self.config['NUM_EPOCHS'] - self.config['FROZEN_BACKBONE_FINETUNE_EPOCHS']
+        treinador = TreinadorCabecaComCache(job['base_model'], data_config, self.config['IMG_SIZE'],
+                                            self.config['BATCH_SIZE'], device, self.cache_dir, self.logger)
+        treinador.construir_cache()
+        razao_passo = treinador.estimar_razao_por_passo()
+        self.logger.info(f"  Passo de treino só com pescoço/cabeça: ~{razao_passo:.2f}x mais rápido que o completo "
+                         f"(estimativa por passo, entrada aleatória).")
+
+        self.logger.info(f"  Treinando pescoço/cabeça por {epocas_cabeca} épocas a partir do cache...")
+        treinador.treinar(epocas_cabeca, self.config['FROZEN_BACKBONE_LR'])
+        pesos = treinador.salvar_checkpoint(self.stages_dir / f"{run_name}_backbone_congelado" / 'weights' / 'last.pt')
+        return str(pesos), razao_passo
+
+    def _validar_sem_ajuste_fino(self, model, data_config: str, pesos: str, device: str, run_name: str):
+        """Publica o checkpoint do backbone congelado como 'best.pt' do run e o valida no split 'valid'."""
+        destino = self.runs_dir / run_name / 'weights' / 'best.pt'
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(pesos, destino)
+        return model.val(data=data_config, split='val', device=device, imgsz=self.config['IMG_SIZE'],
+                         project=str(self.runs_dir), name=run_name, exist_ok=True)
+
+    def _preparar_destilacao(self, job: Dict[str, Any], dataset_name: str, data_config: str,
+                             device: str, run_name: str) -> str:
+        """
+        Destilação por pseudo-rótulos: as predições do professor no split de treino são
+        calculadas uma única vez (cache em disco) e somadas às anotações originais num
+        dataset derivado, usado no treino do aluno. Retorna o data.yaml desse dataset.
+        """
+        pesos_professor = resolver_pesos_professor(job['teacher'], dataset_name, self.runs_dir)
+        if pesos_professor is None:
+            raise FileNotFoundError(f"Nenhum run 'Completed' do professor '{job['teacher']}' encontrado para '{dataset_name}'. "
+                                    f"Treine o professor antes do aluno.")
+        self.logger.info(f"  Professor '{job['teacher']}': {pesos_professor}")
+
+        cache = CacheProfessor(pesos_professor, data_config, self.config['IMG_SIZE'],
+                               self.config['DISTILLATION_CONF_THRESHOLD'], self.cache_dir, self.logger)
+        predicoes = cache.carregar_ou_gerar(self.config['BATCH_SIZE'], device)
+        data_yaml = montar_dataset_destilacao(data_config, predicoes, self.cache_dir / 'distillation' / run_name,
+                                              self.config['DISTILLATION_IOU_MATCH'], self.logger)
+        return os.path.relpath(data_yaml, self.root_dir)
+
     def _executar_job(self, job: Dict[str, Any], dataset_name: str, device: str):
         """Executa um único job de treinamento e coleta os resultados."""
         start_time = time.time()
-        job_name_with_params = f"{job['modelo']}_{self.config['IMG_SIZE']}px_{self.config['NUM_EPOCHS']}e"
-        run_name = f"{job_name_with_params}_on_{dataset_name}_{self.timestamp}"
+        progressivo = job.get('progressive_resize', False)
+        congelado = job.get('frozen_backbone', False)
+        professor = job.get('teacher')
+        modelo, job_name_with_params, run_name = nomes_do_job(job, self.config, dataset_name, self.timestamp, professor)
 
         absolute_data_config_path = self.base_dataset_dir / dataset_name / 'data.yaml'
         relative_data_config_path = os.path.relpath(absolute_data_config_path, self.root_dir)
 
-        resultado_job = {
-            "Job_Name": job_name_with_params, "Dataset": dataset_name, "Base_Model": job['base_model'],
-            "Status": "Failed", "mAP50_95": 0.0, "mAP50": 0.0, "Precision": 0.0,
-            "Recall": 0.0, "F1_Score": 0.0, "Latency_ms": 0.0, "Training_Time_Min": 0.0,
-            "Output_Dir": "N/A", "Error": "N/A"
-        }
+        resultado_job = resultado_inicial(job, job_name_with_params, dataset_name, professor)
 
         try:
-            self.logger.info(f"Carregando modelo base: {job['base_model']}")
-            model = YOLO(job['base_model'])
+            if progressivo and congelado:
+                raise ValueError("'progressive_resize' e 'frozen_backbone' não podem ser combinados no mesmo job.")
+            pesos_iniciais = job['base_model']
+            data_config_treino = str(relative_data_config_path)
+            if professor:
+                data_config_treino = self._preparar_destilacao(
+                    job, dataset_name, str(relative_data_config_path), device, run_name)
+            imgsz_final, epocas_finais = self.config['IMG_SIZE'], self.config['NUM_EPOCHS']
+            lr0_final, lrf_final = DEFAULT_CFG.lr0, DEFAULT_CFG.lrf
+            if progressivo:
+                pesos_iniciais, estagios = self._treinar_estagios_progressivos(
+                    job, data_config_treino, device, run_name)
+                imgsz_final, epocas_finais = estagios[-1]
+                lr0_final, lrf_final = taxas_do_estagio(estagios, len(estagios) - 1, lr0_final, lrf_final)
+                resultado_job["Resize_Schedule"] = descrever_agenda(estagios)
+            elif congelado:
+                pesos_iniciais, razao_passo = self._treinar_backbone_congelado(
+                    job, data_config_treino, device, run_name)
+                epocas_finais = self.config['FROZEN_BACKBONE_FINETUNE_EPOCHS']
+                resultado_job["Frozen_Backbone_Step_Ratio_Est"] = razao_passo
+
+            self.logger.info(f"Carregando modelo base: {pesos_iniciais}")
+            model = carregar_modelo_para_treino(pesos_iniciais)
 
             self.logger.info(f"Iniciando treinamento do job '{job_name_with_params}' em '{dataset_name}'...")
-            results = model.train(
-                data=str(relative_data_config_path),
-                epochs=self.config['NUM_EPOCHS'],
-                patience=self.config['PATIENCE_EPOCHS'],
-                batch=self.config['BATCH_SIZE'],
-                optimizer=self.config['OPTIMIZER'],
-                device=device,
-                imgsz=self.config['IMG_SIZE'],
+            interrupcao = registrar_interrupcao_antecipada(model, self.config, dataset_name, absolute_data_config_path,
+                                                           self.resultados, self.runs_dir, self.logger)
+            if epocas_finais > 0:
+                results = model.train(
+                    trainer=criar_trainer_agendado(model, self.config),
+                    data=data_config_treino,
+                    epochs=epocas_finais,
+                    patience=self.config['PATIENCE_EPOCHS'],
+                    batch=self.config['BATCH_SIZE'],
+                    optimizer=self.config['OPTIMIZER'],
+                    lr0=lr0_final,
+                    lrf=lrf_final,
+                    device=device,
+                    imgsz=imgsz_final,
+                    warmup_epochs=0 if (progressivo or congelado) else 3,
                                                                                      
-                project=str(self.runs_dir),
-                name=run_name,
-                exist_ok=True,
-                verbose=True
-            )
-
-            final_metrics = results.results_dict
-            precision = final_metrics.get('metrics/precision(B)', 0)
-            recall = final_metrics.get('metrics/recall(B)', 0)
-            f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+                    project=str(self.runs_dir),
+                    name=run_name,
+                    exist_ok=True,
+                    verbose=True
+                )
+            else:
+                results = self._validar_sem_ajuste_fino(
+                    model, str(relative_data_config_path), pesos_iniciais, device, run_name)
 
             best_weights_path = Path(results.save_dir) / 'weights' / 'best.pt'
-            latency = self._medir_latencia(str(best_weights_path), device) if best_weights_path.exists() else 0.0
-
-            resultado_job.update({
-                "Status": "Completed",
-                "mAP50_95": final_metrics.get('metrics/mAP50-95(B)', 0),
-                "mAP50": final_metrics.get('metrics/mAP50(B)', 0),
-                "Precision": precision,
-                "Recall": recall,
-                "F1_Score": f1_score,
-                "Latency_ms": latency,
-                "Output_Dir": results.save_dir,
-            })
+            if model.trainer is not None and Path(model.trainer.best).resolve() == best_weights_path.resolve():
+                # Ao fim do treino o objeto já recarregou o 'best.pt': a latência não o lê de novo do disco.
+                cache_modelos().registrar(best_weights_path, model)
+            latency = (self._medir_latencia(str(best_weights_path), device, str(relative_data_config_path))
+                       if best_weights_path.exists() else 0.0)
+            # Mesma medição sob os perfis de hardware embarcado (threads, núcleos e cota de CPU limitados).
+            latencias_embarcadas = (medir_latencia_perfis(best_weights_path, 'YOLO', self.config['IMG_SIZE'],
+                                                          str(relative_data_config_path),
+                                                          self.cache_dir / 'test_tensors', self.logger)
+                                    if best_weights_path.exists() else {})
+
+            registrar_conclusao(resultado_job, results, model, interrupcao,
+                                {"Latency_ms": latency, **latencias_embarcadas}, self.config, self.logger)
             self.logger.info(f"Job '{job_name_with_params}' concluído com sucesso em '{dataset_name}'.")
 
         except Exception as e:
@@ -163,31 +282,12 @@ class PipelineTreinamentoYOLO:
             training_time_min = (time.time() - start_time) / 60
             resultado_job["Training_Time_Min"] = training_time_min
             self.resultados.append(resultado_job)
+            registrar_run(self.runs_dir / run_name, 'yolo', job, modelo, dataset_name,
+                          absolute_data_config_path, resultado_job, start_time, self.config, self.logger)
 
     def _gerar_relatorio(self):
-        """Gera um arquivo CSV com o resumo de todos os treinamentos."""
-        if not self.resultados:
-            self.logger.warning("Nenhum resultado para gerar relatório.")
-            return
-
-        report_filename = f"yolo_resumo_comparativo_{self.timestamp}.csv"
-        report_path = self.reports_dir / report_filename
-        self.logger.info(f"Gerando relatório de resumo em '{report_path}'...")
-
-        os.makedirs(self.reports_dir, exist_ok=True)
-
-        header = self.resultados[0].keys()
-
-        try:
-            with open(report_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=header)
-                writer.writeheader()
-                for row in self.resultados:
-                    formatted_row = {k: (f"{v:.4f}" if isinstance(v, float) else v) for k, v in row.items()}
-                    writer.writerow(formatted_row)
-            self.logger.info("Relatório de resumo gerado com sucesso.")
-        except Exception as e:
-            self.logger.error(f"Não foi possível gerar o relatório CSV: {e}")
+        """Gera o CSV de resumo de todos os treinamentos e os comparativos das variantes de treino."""
+        gerar_relatorios('yolo', self.resultados, self.reports_dir, self.timestamp, self.logger)
 
     def run(self):
         """Orquestra a execução de todo o pipeline."""
@@ -4,26 +4,51 @@ import logging
 import platform
 import datetime
 import os
+import time
+import multiprocessing
+from multiprocessing.connection import wait
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 try:
     import torch
     import yaml
+    import pandas as pd
     from ultralytics import YOLO
     from ultralytics.utils import __version__ as ultralytics_version
+    from ultralytics.data.utils import check_det_dataset
 except ImportError:
-    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, pyyaml).")
-    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics pyyaml")
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, pyyaml, pandas).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics pyyaml pandas pyarrow")
     sys.exit(1)
 
-from config.paths import RUNS_DIR, UNZIPPED_DIR, REPORTS_DIR, ROOT_DIR, EVAL_DIR
+from config.paths import RUNS_DIR, UNZIPPED_DIR, REPORTS_DIR, ROOT_DIR, EVAL_DIR, RUN_CATALOG_PATH, CACHE_DIR
+from config.evaluation_params import EVAL_CONFIG, TEST_TENSOR_CACHE_CONFIG
 from utils.logger_config import setup_logging
+from utils.model_cache import carregar_modelo_para_treino
+from utils.parallel_loading import criar_validador_paralelo
+from utils.evaluation_cache import CacheAvaliacao
+from utils.model_cost import CacheCustoModelos, COLUNAS_CUSTO
+from utils.prediction_store import criar_validador_com_predicoes
+from utils.run_catalog import CatalogoRuns
+from utils.test_tensor_cache import criar_validador_com_cache_tensores
+
+
+def _avaliar_candidato_em_processo(config: Dict[str, Any], candidato: Dict[str, Path], threads: int, conexao):
+    """Alvo dos processos avaliadores: valida um único candidato e devolve seus resultados pela conexão."""
+    torch.set_num_threads(threads)
+    # Os workers do DataLoader também consomem núcleos: limitados ao orçamento de threads do processo.
+    config = {**config, 'DATALOADER_WORKERS': min(config['DATALOADER_WORKERS'], threads)}
+    validador = ValidadorAbsoluto(config, nome_logger='FinalEvaluatorWorkerLogger')
+    validador._executar_validacao_para_candidato(candidato)
+    conexao.send(validador.artefato_final["resultados_validacao"])
+    conexao.close()
 
 
 class ValidadorAbsoluto:
 
-    def __init__(self):
+    def __init__(self, config: Dict[str, Any], nome_logger: str = 'FinalEvaluatorLogger'):
+        self.config = config
         self.diretorio_runs = Path(RUNS_DIR)
         self.diretorio_datasets = Path(UNZIPPED_DIR)
 
@@ -33,7 +58,7 @@ class ValidadorAbsoluto:
 
         self.eval_dir = Path(EVAL_DIR)
 
-        self.logger = setup_logging('FinalEvaluatorLogger', __file__)
+        self.logger = setup_logging(nome_logger, __file__)
 
         try:
             os.makedirs(self.reports_dir, exist_ok=True)
@@ -44,6 +69,21 @@ class ValidadorAbsoluto:
 
         self.artefato_final = self._criar_estrutura_artefato()
 
+        metadata = self.artefato_final['metadata_ambiente']
+        self.cache = CacheAvaliacao(self.eval_dir / 'cache', {
+            "split": "test",
+            "versao_ultralytics": metadata['versao_ultralytics'],
+            "dispositivo_torch": metadata['dispositivo_torch'],
+            "salvar_predicoes": self.config['SAVE_PREDICTIONS'],
+            "imgsz": self.config['IMG_SIZE'],
+            "batch": self.config['BATCH_SIZE'],
+            "conf": self.config['CONF_THRESHOLD'],
+            "iou": self.config['NMS_IOU'],
+            "rect": self.config['RECT'],
+            "dataloader_workers": self.config['DATALOADER_WORKERS'],
+            "cache_tensores_teste": TEST_TENSOR_CACHE_CONFIG['ENABLED'],
+        })
+
     def _obter_metadata_ambiente(self) -> Dict[str, Any]:
         gpu_disponivel = torch.cuda.is_available()
         return {
@@ -64,45 +104,36 @@ class ValidadorAbsoluto:
             "resultados_validacao": []
         }
 
-    def _identificar_candidatos(self) -> List[Dict[str, Path]]:
-        self.logger.info(f"Iniciando varredura por candidatos em '{self.diretorio_runs}'")
-        candidatos = []
+    def _identificar_candidatos(self) -> List[Dict[str, Any]]:
+        """
+        Consulta o catálogo de runs (sincronizado de forma incremental com RUNS_DIR) pelos runs com
+        'best.pt', aplicando os filtros de modelo, dataset e data de EVAL_CONFIG.
+        """
         if not self.diretorio_runs.is_dir():
             self.logger.critical(f"O diretório de runs especificado não existe: '{self.diretorio_runs}'")
             return []
 
-        for diretorio_run in self.diretorio_runs.iterdir():
-            if not diretorio_run.is_dir():
-                continue
-
-            modelo_path = diretorio_run / 'weights' / 'best.pt'
-            if modelo_path.is_file():
-                candidatos.append({"run_dir": diretorio_run, "model_path": modelo_path})
-                self.logger.info(f"Candidato identificado: {modelo_path}")
-            else:
-                self.logger.warning(f"Diretório '{diretorio_run.name}' não contém 'weights/best.pt'. Ignorando.")
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        sincronizacao = catalogo.sincronizar(self.diretorio_runs)
+        self.logger.info(f"Catálogo de runs sincronizado: {sincronizacao['runs']} runs, "
+                         f"{sincronizacao['atualizados']} novos/alterados, {sincronizacao['removidos']} removidos.")
+
+        registros = catalogo.consultar(modelos=self.config['FILTER_MODELS'], datasets=self.config['FILTER_DATASETS'],
+                                       desde=self.config['FILTER_SINCE'], ate=self.config['FILTER_UNTIL'])
+        for chave, coluna in (('FILTER_MODELS', 'modelo'), ('FILTER_DATASETS', 'dataset')):
+            encontrados = {(r[coluna] or '').lower() for r in registros}
+            for valor in self.config[chave] or []:
+                if valor.lower() not in encontrados:
+                    self.logger.warning(f"Filtro {chave}: '{valor}' não corresponde a nenhum run da consulta.")
+        candidatos = []
+        for registro in registros:
+            candidatos.append({"run_dir": Path(registro['caminho']), "model_path": Path(registro['caminho_pesos']),
+                               "dataset": registro['dataset'], "modelo": registro['modelo']})
+            self.logger.info(f"Candidato identificado: {registro['caminho_pesos']}")
 
-        self.logger.info(f"Varredura concluída. Total de {len(candidatos)} candidatos identificados.")
+        self.logger.info(f"Consulta concluída. Total de {len(candidatos)} candidatos identificados.")
         return candidatos
 
-    def _extrair_nome_dataset(self, nome_diretorio_run: str) -> Optional[str]:
-        try:
-            parte_depois_on = nome_diretorio_run.split('_on_')[1]
-            componentes = parte_depois_on.rsplit('_', 2)
-            if len(componentes) > 1:
-                nome_dataset = componentes[0]
-                self.logger.info(f"Nome do dataset extraído: '{nome_dataset}' de '{nome_diretorio_run}'")
-                return nome_dataset
-            else:
-                raise IndexError("Padrão de nome de pasta inesperado.")
-        except IndexError:
-            self.logger.warning(
-                f"Não foi possível determinar o nome do dataset a partir de '{nome_diretorio_run}'.")
-            return None
-        except Exception:
-            self.logger.exception(f"Erro inesperado ao extrair nome do dataset de '{nome_diretorio_run}'.")
-            return None
-
     def _carregar_detalhes_dataset(self, nome_dataset: str) -> Optional[Dict[str, Any]]:
         caminho_yaml_absoluto = self.diretorio_datasets / nome_dataset / 'data.yaml'
         if not caminho_yaml_absoluto.is_file():
@@ -128,8 +159,9 @@ class ValidadorAbsoluto:
         dispositivo = '0' if self.artefato_final['metadata_ambiente']['gpu_disponivel'] else 'cpu'
 
         self.logger.info(f"--- Processando: {run_dir.name} ---")
+        inicio = time.perf_counter()
 
-        nome_dataset = self._extrair_nome_dataset(run_dir.name)
+        nome_dataset = candidato.get('dataset')
         if not nome_dataset:
             self._registrar_falha(run_dir.name, str(model_path), "Não foi possível determinar o dataset.")
             return
@@ -150,20 +182,48 @@ class ValidadorAbsoluto:
 
         try:
             self.logger.info(f"Carregando modelo de '{model_path}'.")
-            modelo = YOLO(str(model_path))
+            # Cópia própria (do cache de modelos do processo): o callback abaixo fica só nesta instância.
+            modelo = carregar_modelo_para_treino(model_path)
 
             self.logger.info(
                 f"Iniciando validação no split 'test' do dataset '{nome_dataset}' usando dispositivo '{dispositivo}'.")
 
-            # FIX CRÍTICO: workers=0 evita o erro de pickle no RT-DETRDataset
-            metricas = modelo.val(data=detalhes_dataset['caminho_yaml_relativo'],
+            # O RTDETRDataset não é serializável para workers de processo: o validator escolhe,
+            # por dataset, entre workers do DataLoader e o carregador em threads.
+            carregamento = {}
+            modelo.add_callback("on_val_end", lambda v: carregamento.update(
+                imagens=len(v.dataloader.dataset), carregador=v.descricao_carregador,
+                cache_tensores=getattr(v, 'resumo_cache_tensores', {})))
+            validador = criar_validador_paralelo(modelo, self.config)
+            if self.config['SAVE_PREDICTIONS']:
+                validador = criar_validador_com_predicoes(validador)
+            if TEST_TENSOR_CACHE_CONFIG['ENABLED']:
+                validador = criar_validador_com_cache_tensores(validador, TEST_TENSOR_CACHE_CONFIG,
+                                                               Path(CACHE_DIR) / 'test_tensors')
+            inicio_val = time.perf_counter()
+            metricas = modelo.val(validator=validador,
+                                  data=detalhes_dataset['caminho_yaml_relativo'],
                                   split='test',
+                                  imgsz=self.config['IMG_SIZE'],
+                                  batch=self.config['BATCH_SIZE'],
+                                  conf=self.config['CONF_THRESHOLD'],
+                                  iou=self.config['NMS_IOU'],
+                                  rect=self.config['RECT'],
                                   device=dispositivo,
                                   project=str(self.eval_dir),
                                   name=f"{run_dir.name}_EVAL",
                                   exist_ok=True,
-                                  verbose=False,
-                                  workers=0)
+                                  verbose=False)
+            tempo_val = time.perf_counter() - inicio_val
+            imagens_por_segundo = carregamento.get('imagens', 0) / tempo_val if tempo_val > 0 else 0.0
+            self.logger.info(f"Carregador: {carregamento.get('carregador', 'N/A')}; "
+                             f"{imagens_por_segundo:.1f} imagens/s na validação.")
+            cache_tensores = carregamento.get('cache_tensores') or {}
+            if cache_tensores:
+                self.logger.info(
+                    f"Cache de tensores de teste {'reutilizado' if cache_tensores['reutilizado'] else 'construído'} "
+                    f"('{cache_tensores['diretorio']}'); decodificação economizada: "
+                    f"{cache_tensores['tempo_decodificacao_economizado_s']:.1f}s.")
 
             self.logger.info("Validação concluída com sucesso. Coletando métricas.")
 
@@ -187,14 +247,62 @@ class ValidadorAbsoluto:
                     "recall": recall,
                     "f1_score": f1_score
                 },
-                "metricas_velocidade_ms": metricas.speed
+                "metricas_velocidade_ms": metricas.speed,
+                "carregador": carregamento.get('carregador', 'N/A'),
+                "imagens_por_segundo": imagens_por_segundo,
+                "tempo_decodificacao_economizado_s": cache_tensores.get('tempo_decodificacao_economizado_s', 0.0),
+                "caminho_predicoes": (str(Path(metricas.save_dir) / 'predicoes')
+                                      if self.config['SAVE_PREDICTIONS'] else None),
+                "metricas_por_classe": self._extrair_metricas_por_classe(metricas),
+                "tempo_avaliacao_s": time.perf_counter() - inicio
             })
             self.artefato_final["resultados_validacao"].append(resultado)
         except Exception as e:
             self.logger.error(f"Ocorreu um erro catastrófico durante a validação de '{run_dir.name}'.", exc_info=True)
             resultado["mensagem_erro"] = str(e)
+            resultado["tempo_avaliacao_s"] = time.perf_counter() - inicio
             self.artefato_final["resultados_validacao"].append(resultado)
 
+    def _extrair_metricas_por_classe(self, metricas) -> List[Dict[str, Any]]:
+        """AP50, AP50-95, P, R e nº de instâncias de cada classe presente no split de teste."""
+        instancias = getattr(metricas, 'nt_per_class', None)
+        por_classe = []
+        for i, classe in enumerate(metricas.box.ap_class_index):
+            precisao, recall, ap50, ap50_95 = metricas.box.class_result(i)
+            por_classe.append({
+                "classe": int(classe),
+                "nome_classe": metricas.names[int(classe)],
+                "AP50": float(ap50),
+                "AP50_95": float(ap50_95),
+                "precisao": float(precisao),
+                "recall": float(recall),
+                "instancias": int(instancias[int(classe)]) if instancias is not None else -1,
+            })
+        return por_classe
+
+    def _salvar_metricas_por_classe(self, caminho_relatorio: Path):
+        """Tabela longa (run, dataset, classe, métricas) em Parquet, ao lado do relatório TXT."""
+        linhas = [
+            {"nome_run": resultado["nome_run"],
+             "dataset_nome": resultado.get("dataset", {}).get("nome_identificado", "N/A"),
+             **classe}
+            for resultado in self.artefato_final["resultados_validacao"]
+            if resultado.get("status") == "SUCESSO"
+            for classe in resultado.get("metricas_por_classe", [])
+        ]
+        if not linhas:
+            return
+        caminho = caminho_relatorio.with_name(
+            caminho_relatorio.stem.replace("relatorio_metricas_absolutas", "relatorio_metricas_por_classe") + ".parquet")
+        try:
+            df = pd.DataFrame(linhas)
+            for coluna in ("nome_run", "dataset_nome", "nome_classe"):
+                df[coluna] = df[coluna].astype("category")
+            df.to_parquet(caminho, index=False, compression='zstd')
+            self.logger.info(f"Métricas por classe salvas em: {caminho}")
+        except Exception:
+            self.logger.exception("Falha ao salvar as métricas por classe.")
+
     def _registrar_falha(self, nome_run: str, caminho_modelo: str, motivo: str):
         self.logger.error(f"Falha registrada para '{nome_run}'. Motivo: {motivo}")
         self.artefato_final["resultados_validacao"].append({
@@ -212,7 +320,7 @@ class ValidadorAbsoluto:
         cabecalho = ["nome_run", "status", "dataset_nome", "mAP50_95", "mAP50", "mAP75", "precisao", "recall",
                      "f1_score",
                      "velocidade_preprocess_ms", "velocidade_inference_ms", "velocidade_postprocess_ms",
-                     "mensagem_erro"]
+                     "carregador", "imagens_por_segundo", "tempo_avaliacao_s", *COLUNAS_CUSTO, "mensagem_erro"]
 
         try:
             with open(caminho_arquivo, 'w', encoding='utf-8') as f:
@@ -222,6 +330,7 @@ class ValidadorAbsoluto:
                     if resultado.get("status") == "SUCESSO":
                         metricas = resultado.get("metricas_box", {})
                         velocidade = resultado.get("metricas_velocidade_ms", {})
+                        custo = resultado.get("custo_estatico") or {}
                         dataset_nome = resultado.get("dataset", {}).get("nome_identificado", "N/A")
                         linha_dados = [
                             resultado.get("nome_run", ""),
@@ -236,6 +345,10 @@ class ValidadorAbsoluto:
                             f"{velocidade.get('preprocess', 0.0):.3f}",
                             f"{velocidade.get('inference', 0.0):.3f}",
                             f"{velocidade.get('postprocess', 0.0):.3f}",
+                            resultado.get("carregador", "N/A"),
+                            f"{resultado.get('imagens_por_segundo', 0.0):.1f}",
+                            f"{resultado.get('tempo_avaliacao_s', 0.0):.1f}",
+                            *[f"{custo[c]:.3f}" if c in custo else "N/A" for c in COLUNAS_CUSTO],
                             ""
                         ]
                         f.write(DELIMITADOR.join(linha_dados) + "\n")
@@ -247,7 +360,9 @@ class ValidadorAbsoluto:
                             resultado.get("nome_run", ""),
                             resultado.get("status", "FALHA"),
                             dataset_nome,
-                            "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A",
+                            "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A",
+                            f"{resultado.get('tempo_avaliacao_s', 0.0):.1f}",
+                            *["N/A"] * len(COLUNAS_CUSTO),
                             erro_msg
                         ]
 
@@ -255,6 +370,173 @@ class ValidadorAbsoluto:
             self.logger.info("Relatório salvo com sucesso.")
         except Exception:
             self.logger.exception("Falha crítica ao salvar o relatório TXT.")
+        return caminho_arquivo
+
+    def _anexar_custos_estaticos(self):
+        """Anexa a cada candidato avaliado com sucesso o seu perfil de custo estático (em cache por hash dos pesos)."""
+        cache_custo = CacheCustoModelos(self.eval_dir / 'cache_custo')
+        imgsz = self.config['COST_PROFILE_IMG_SIZE']
+        for resultado in self.artefato_final["resultados_validacao"]:
+            if resultado.get("status") != "SUCESSO":
+                continue
+            try:
+                resultado["custo_estatico"] = cache_custo.obter(resultado["caminho_modelo"], imgsz)
+                custo = resultado["custo_estatico"]
+                self.logger.info(f"Custo de '{resultado['nome_run']}': {custo['parametros_m']:.2f} M parâmetros, "
+                                 f"{custo['gflops']:.1f} GFLOPs, pico de RSS {custo['rss_pico_mb']:.0f} MB.")
+            except Exception:
+                self.logger.warning(f"Falha no perfil de custo de '{resultado['nome_run']}'.", exc_info=True)
+
+    def _chave_cache(self, candidato: Dict[str, Path]) -> Optional[str]:
+        """
+        Chave de cache do candidato; None quando o dataset ou o split de teste não podem ser resolvidos.
+        O split é resolvido como no 'model.val()' (check_det_dataset), seja diretório, lista ou .txt.
+        """
+        nome_dataset = candidato.get('dataset')
+        if not nome_dataset:
+            return None
+        detalhes_dataset = self._carregar_detalhes_dataset(nome_dataset)
+        if not detalhes_dataset:
+            return None
+        split_teste = check_det_dataset(detalhes_dataset['caminho_yaml_absoluto']).get('test')
+        if not split_teste:
+            return None
+        return self.cache.chave(candidato['model_path'], split_teste)
+
+    def _caminho_predicoes(self, candidato: Dict[str, Path]) -> Optional[str]:
+        """Diretório de predições do run atual ('<run>_EVAL/predicoes'), se SAVE_PREDICTIONS estiver ativo."""
+        if not self.config['SAVE_PREDICTIONS']:
+            return None
+        return str(self.eval_dir / f"{candidato['run_dir'].name}_EVAL" / 'predicoes')
+
+    def _predicoes_disponiveis(self, candidato: Dict[str, Path]) -> bool:
+        """Um acerto de cache só vale se o armazenamento de predições esperado pelos scripts 10-12 existir."""
+        caminho = self._caminho_predicoes(candidato)
+        return caminho is None or Path(caminho).is_dir()
+
+    def _consultar_cache(self, candidatos: List[Dict[str, Path]]):
+        """Separa os candidatos já avaliados (mesmos pesos, mesmo split de teste, mesmas configurações)."""
+        chaves, resultados_por_indice = {}, {}
+        for idx, candidato in enumerate(candidatos):
+            try:
+                chaves[idx] = self._chave_cache(candidato)
+            except OSError:
+                self.logger.warning(f"Não foi possível calcular a chave de cache de '{candidato['run_dir'].name}'.",
+                                    exc_info=True)
+                chaves[idx] = None
+            registro = self.cache.ler(chaves[idx]) if chaves[idx] else None
+            if registro is not None and not self._predicoes_disponiveis(candidato):
+                self.logger.info(f"Predições de '{candidato['run_dir'].name}' ausentes; o candidato será reavaliado.")
+                registro = None
+            if registro is not None:
+                # O mesmo best.pt pode ter sido movido ou renomeado desde a avaliação em cache.
+                registro.update({"nome_run": candidato['run_dir'].name, "caminho_modelo": str(candidato['model_path']),
+                                 "caminho_predicoes": self._caminho_predicoes(candidato),
+                                 "reutilizado_do_cache": True})
+                resultados_por_indice[idx] = [registro]
+                self.logger.info(f"Resultado em cache reutilizado: {candidato['run_dir'].name}")
+        self.logger.info(f"{len(resultados_por_indice)} de {len(candidatos)} candidatos reutilizados do cache.")
+        return chaves, resultados_por_indice
+
+    def _avaliar_sequencialmente(self, candidatos: List[Dict[str, Path]], indices: List[int]):
+        resultados_por_indice = {}
+        for idx in indices:
+            self.logger.info(f"Processando candidato {idx + 1}/{len(candidatos)}")
+            inicio_lista = len(self.artefato_final["resultados_validacao"])
+            self._executar_validacao_para_candidato(candidatos[idx])
+            resultados_por_indice[idx] = self.artefato_final["resultados_validacao"][inicio_lista:]
+            self.logger.info("-" * 80)
+        return resultados_por_indice
+
+    @staticmethod
+    def _iniciar_processo(processo, threads: int):
+        """
+        Inicia o processo com OMP_NUM_THREADS = threads, herdado antes da inicialização do OpenMP
+        no filho; a variável do processo principal é restaurada logo em seguida.
+        """
+        original = os.environ.get('OMP_NUM_THREADS')
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+        try:
+            processo.start()
+        finally:
+            if original is None:
+                os.environ.pop('OMP_NUM_THREADS', None)
+            else:
+                os.environ['OMP_NUM_THREADS'] = original
+
+    def _avaliar_em_paralelo(self, candidatos: List[Dict[str, Path]], indices: List[int]):
+        """
+        Distribui os candidatos entre processos 'spawn', no máximo PARALLEL_WORKERS simultâneos,
+        cada um limitado a um orçamento de threads. Os resultados são mesclados na ordem dos
+        candidatos, independentemente da ordem de término; um processo que morre sem responder
+        (ex.: falta de memória, segfault) é registrado como FALHA só para o seu candidato.
+        """
+        num_processos = min(self.config['PARALLEL_WORKERS'], len(indices))
+        threads = self.config['THREADS_PER_WORKER'] or max(1, (os.cpu_count() or 1) // num_processos)
+        self.logger.info(f"Avaliação paralela: {num_processos} processos, {threads} threads por processo.")
+
+        contexto = multiprocessing.get_context('spawn')
+        resultados_por_indice: Dict[int, List[Dict[str, Any]]] = {}
+        pendentes = [(idx, candidatos[idx]) for idx in indices]
+        em_execucao = {}
+
+        while pendentes or em_execucao:
+            while pendentes and len(em_execucao) < num_processos:
+                idx, candidato = pendentes.pop(0)
+                leitor, escritor = contexto.Pipe(duplex=False)
+                processo = contexto.Process(target=_avaliar_candidato_em_processo,
+                                            args=(self.config, candidato, threads, escritor))
+                self._iniciar_processo(processo, threads)
+                escritor.close()
+                em_execucao[leitor] = (idx, candidato, processo, time.perf_counter())
+                self.logger.info(f"Candidato {idx + 1}/{len(candidatos)} iniciado: {candidato['run_dir'].name}")
+
+            for leitor in wait(list(em_execucao)):
+                idx, candidato, processo, inicio = em_execucao.pop(leitor)
+                try:
+                    resultados_por_indice[idx] = leitor.recv()
+                except EOFError:
+                    resultados_por_indice[idx] = None
+                leitor.close()
+                processo.join()
+
+                if resultados_por_indice[idx] is None:
+                    motivo = f"Processo avaliador terminou sem resultado (código de saída {processo.exitcode})."
+                    self.logger.error(f"Falha registrada para '{candidato['run_dir'].name}'. Motivo: {motivo}")
+                    resultados_por_indice[idx] = [{
+                        "status": "FALHA", "nome_run": candidato['run_dir'].name,
+                        "caminho_modelo": str(candidato['model_path']), "mensagem_erro": motivo,
+                        "tempo_avaliacao_s": time.perf_counter() - inicio
+                    }]
+                self.logger.info(f"Candidato {idx + 1}/{len(candidatos)} finalizado: {candidato['run_dir'].name}")
+
+        return resultados_por_indice
+
+    def _salvar_resumo_execucao(self, caminho_relatorio: Path, tempo_parede: float):
+        """Compara o tempo de parede da avaliação com a soma dos tempos individuais (linha de base sequencial)."""
+        avaliados = [r for r in self.artefato_final["resultados_validacao"] if not r.get('reutilizado_do_cache')]
+        soma_sequencial = sum(r.get('tempo_avaliacao_s', 0.0) for r in avaliados)
+        resumo = {
+            "relatorio": caminho_relatorio.name,
+            "processos": self.config['PARALLEL_WORKERS'],
+            "threads_por_processo": self.config['THREADS_PER_WORKER'],
+            "candidatos": len(self.artefato_final["resultados_validacao"]),
+            "candidatos_do_cache": len(self.artefato_final["resultados_validacao"]) - len(avaliados),
+            "tempo_parede_s": tempo_parede,
+            "soma_tempos_candidatos_s": soma_sequencial,
+            "aceleracao_estimada": soma_sequencial / tempo_parede if tempo_parede > 0 else 0.0,
+            "decodificacao_economizada_s": sum(r.get('tempo_decodificacao_economizado_s', 0.0) for r in avaliados),
+        }
+        self.logger.info(f"Tempo total de avaliação: {tempo_parede / 60:.1f} min "
+                         f"(soma sequencial dos candidatos: {soma_sequencial / 60:.1f} min, "
+                         f"aceleração {resumo['aceleracao_estimada']:.2f}x).")
+        self.logger.info(f"Decodificação do split de teste economizada pelo cache de tensores: "
+                         f"{resumo['decodificacao_economizada_s'] / 60:.1f} min.")
+        try:
+            with open(caminho_relatorio.with_name(f"{caminho_relatorio.stem}_execucao.json"), 'w', encoding='utf-8') as f:
+                json.dump(resumo, f, indent=4, ensure_ascii=False)
+        except Exception:
+            self.logger.exception("Falha ao salvar o resumo de execução.")
 
     def executar(self):
         self.logger.info("=" * 80)
@@ -264,18 +546,36 @@ class ValidadorAbsoluto:
         if not candidatos:
             self.logger.warning("Nenhum candidato válido encontrado. O processo será encerrado.")
             return
-        for idx, candidato in enumerate(candidatos):
-            self.logger.info(f"Processando candidato {idx + 1}/{len(candidatos)}")
-            self._executar_validacao_para_candidato(candidato)
-            self.logger.info("-" * 80)
-        self._salvar_artefato()
+        inicio = time.perf_counter()
+        chaves, resultados_por_indice = {}, {}
+        if self.config['USE_EVAL_CACHE']:
+            chaves, resultados_por_indice = self._consultar_cache(candidatos)
+        a_avaliar = [idx for idx in range(len(candidatos)) if idx not in resultados_por_indice]
+
+        if a_avaliar and self.config['PARALLEL_WORKERS'] > 1:
+            novos = self._avaliar_em_paralelo(candidatos, a_avaliar)
+        else:
+            novos = self._avaliar_sequencialmente(candidatos, a_avaliar)
+
+        for idx, resultados in novos.items():
+            if chaves.get(idx) and len(resultados) == 1 and resultados[0].get('status') == 'SUCESSO':
+                self.cache.gravar(chaves[idx], resultados[0])
+        resultados_por_indice.update(novos)
+        self.artefato_final["resultados_validacao"] = [
+            r for idx in range(len(candidatos)) for r in resultados_por_indice[idx]]
+
+        if self.config['STATIC_COST_PROFILE']:
+            self._anexar_custos_estaticos()
+        caminho_relatorio = self._salvar_artefato()
+        self._salvar_metricas_por_classe(caminho_relatorio)
+        self._salvar_resumo_execucao(caminho_relatorio, time.perf_counter() - inicio)
         self.logger.info("PROCESSO DE VALIDAÇÃO ABSOLUTA FINALIZADO")
         self.logger.info("=" * 80)
 
 
 def main():
     """Ponto de entrada do script."""
-    validador = ValidadorAbsoluto()
+    validador = ValidadorAbsoluto(EVAL_CONFIG)
     validador.executar()
 
 
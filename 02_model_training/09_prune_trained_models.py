@@ -0,0 +1,246 @@
+
+import sys
+import copy
+import csv
+import datetime
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+try:
+    import torch
+    from ultralytics import YOLO
+    from utils.structured_pruning import podar_modulo, contar_parametros, criar_trainer_podado
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, torch-pruning).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics torch-pruning")
+    sys.exit(1)
+
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, ROOT_DIR, RUNS_DIR, EVAL_DIR, RUN_CATALOG_PATH, CACHE_DIR
+from config.evaluation_params import EVAL_CONFIG, TEST_TENSOR_CACHE_CONFIG
+from config.training_params import PRUNING_CONFIG
+from utils.logger_config import setup_logging
+from utils.latency_benchmark import medir_latencia_ms
+from utils.model_cache import carregar_modelo, carregar_modelo_para_treino
+from utils.parallel_loading import criar_validador_paralelo
+from utils.test_tensor_cache import entradas_reais_de_teste
+from utils.run_catalog import CatalogoRuns, gravar_metadados_run
+
+
+class PodadorEstruturado:
+    """
+    Poda estrutural de canais dos 'best.pt' treinados, guiada por um alvo de latência medido
+    com o mesmo harness dos scripts de treino. Cada modelo podado passa por um ajuste fino
+    curto e é salvo como um novo run em RUNS_DIR ('<modelo>-P<pct>_..._on_<dataset>_<ts>'),
+    sendo avaliado automaticamente pelo 07_evaluate_models_on_test_set.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.base_dataset_dir = Path(UNZIPPED_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.root_dir = Path(ROOT_DIR)
+        self.runs_dir = Path(RUNS_DIR)
+        self.eval_dir = Path(EVAL_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%d-%m-%Y_%H-%M-%S')
+        self.logger = setup_logging('Pruning_Logger', __file__)
+        self.resultados = []
+        self.entradas_latencia = None
+
+    def _identificar_candidatos(self) -> List[Dict[str, Any]]:
+        """Seleciona, pelo catálogo de runs, o run mais recente de cada (modelo, dataset) listado."""
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(self.runs_dir)
+        candidatos: Dict[tuple, Dict[str, Any]] = {}
+        for registro in catalogo.consultar(modelos=self.config['MODELS_TO_PRUNE']):
+            chave = (registro['modelo'], registro['dataset'])
+            if registro['dataset'] is None or (chave in candidatos and
+                                               (registro['data_run'] or '') <= candidatos[chave]['data_run']):
+                continue
+            candidatos[chave] = {
+                "run_dir": Path(registro['caminho']), "model_path": Path(registro['caminho_pesos']),
+                "data_run": registro['data_run'] or '', "modelo": registro['modelo'], "dataset": registro['dataset'],
+                "parametros": registro['metadados'].get('parametros') or
+                              f"{self.config['IMG_SIZE']}px_{self.config['FINETUNE_EPOCHS']}e",
+            }
+
+        self.logger.info(f"{len(candidatos)} modelos selecionados para poda.")
+        return list(candidatos.values())
+
+    def _latencia(self, pesos: Path, modulo: Optional[torch.nn.Module], device: str) -> float:
+        """Mede a latência com o harness do projeto; 'modulo' substitui a rede carregada de 'pesos'."""
+        if modulo is None:
+            model = carregar_modelo(pesos)
+        else:
+            model = carregar_modelo_para_treino(pesos)
+            # Cópia: o preditor funde Conv+BN no módulo recebido, o que inviabilizaria o ajuste fino.
+            model.model = copy.deepcopy(modulo)
+        return medir_latencia_ms(model, self.config['IMG_SIZE'], device,
+                                 self.config['LATENCY_WARMUPS'], self.config['LATENCY_RUNS'], self.entradas_latencia)
+
+    def _preparar_entradas_latencia(self, data_config: str):
+        """Mesmas imagens reais do split de teste (cache de tensores) para todas as medições do candidato."""
+        self.entradas_latencia = None
+        if not TEST_TENSOR_CACHE_CONFIG['ENABLED']:
+            return
+        try:
+            self.entradas_latencia = entradas_reais_de_teste(
+                data_config, self.config['IMG_SIZE'], TEST_TENSOR_CACHE_CONFIG, Path(CACHE_DIR) / 'test_tensors')
+        except Exception:
+            self.logger.warning("  Cache de tensores de teste indisponível; usando tensor aleatório.", exc_info=True)
+
+    def _buscar_razao_de_poda(self, pesos: Path, latencia_alvo: float, device: str):
+        """Aumenta a razão de poda em passos até atingir a latência alvo (ou a razão máxima)."""
+        modulo_original = carregar_modelo_para_treino(pesos).model
+        inference_device = int(device) if device.isdigit() else device
+        passo, maxima = self.config['RATIO_STEP'], self.config['MAX_RATIO']
+
+        razao, modulo, latencia = 0.0, None, float('inf')
+        for i in range(1, int(round(maxima / passo)) + 1):
+            razao = round(i * passo, 4)
+            modulo = podar_modulo(modulo_original, razao, self.config['IMG_SIZE'], inference_device)
+            latencia = self._latencia(pesos, modulo, device)
+            self.logger.info(f"  Razão {razao:.0%}: {contar_parametros(modulo) / 1e6:.2f}M parâmetros, "
+                             f"{latencia:.2f} ms (alvo {latencia_alvo:.2f} ms).")
+            if latencia <= latencia_alvo:
+                break
+        return modulo, razao, latencia, contar_parametros(modulo_original)
+
+    def _ajuste_fino(self, pesos: Path, modulo: torch.nn.Module, data_config: str, device: str, run_name: str):
+        model = carregar_modelo_para_treino(pesos)
+        model.model = modulo
+        model.train(
+            trainer=criar_trainer_podado(model),
+            data=data_config,
+            epochs=self.config['FINETUNE_EPOCHS'],
+            batch=self.config['BATCH_SIZE'],
+            optimizer=self.config['OPTIMIZER'],
+            lr0=self.config['FINETUNE_LR0'],
+            warmup_epochs=0,
+            device=device,
+            imgsz=self.config['IMG_SIZE'],
+            project=str(self.runs_dir),
+            name=run_name,
+            exist_ok=True,
+            verbose=True
+        )
+        return model
+
+    def _podar_candidato(self, candidato: Dict[str, Any], device: str):
+        pesos = candidato['model_path']
+        resultado = {
+            "Source_Run": candidato['run_dir'].name, "Pruned_Run": "N/A", "Dataset": candidato['dataset'],
+            "Status": "Failed", "Pruning_Ratio": 0.0, "Params_Before_M": 0.0, "Params_After_M": 0.0,
+            "Latency_Before_ms": 0.0, "Latency_After_ms": 0.0, "Latency_Target_ms": 0.0, "Target_Met": False,
+            "Test_mAP50_95": 0.0, "Test_mAP50": 0.0, "Error": "N/A"
+        }
+        try:
+            data_config = os.path.relpath(self.base_dataset_dir / candidato['dataset'] / 'data.yaml', self.root_dir)
+            self._preparar_entradas_latencia(data_config)
+            latencia_original = self._latencia(pesos, None, device)
+            latencia_alvo = self.config['TARGET_LATENCY_MS'] or self.config['TARGET_LATENCY_FRACTION'] * latencia_original
+            self.logger.info(f"  Latência original: {latencia_original:.2f} ms; alvo: {latencia_alvo:.2f} ms.")
+
+            modulo, razao, latencia, parametros_antes = self._buscar_razao_de_poda(pesos, latencia_alvo, device)
+            if latencia > latencia_alvo:
+                self.logger.warning(f"  Alvo de latência não atingido com a razão máxima ({razao:.0%}); "
+                                    f"seguindo com {latencia:.2f} ms.")
+
+            run_name = (f"{candidato['modelo']}-P{int(round(razao * 100))}_{candidato['parametros']}"
+                        f"_on_{candidato['dataset']}_{self.timestamp}")
+            self.logger.info(f"  Ajuste fino de {self.config['FINETUNE_EPOCHS']} épocas em '{run_name}'...")
+            model = self._ajuste_fino(pesos, modulo, data_config, device, run_name)
+
+            # Mesmo carregamento paralelo do avaliador (workers de processo ou threads, conforme o dataset).
+            metricas = model.val(validator=criar_validador_paralelo(model, EVAL_CONFIG), data=data_config,
+                                 split='test', device=device, imgsz=self.config['IMG_SIZE'],
+                                 project=str(self.eval_dir), name=f"{run_name}_EVAL", exist_ok=True,
+                                 verbose=False)
+            latencia_final = self._latencia(self.runs_dir / run_name / 'weights' / 'best.pt', None, device)
+
+            resultado.update({
+                "Pruned_Run": run_name, "Status": "Completed", "Pruning_Ratio": razao,
+                "Params_Before_M": parametros_antes / 1e6, "Params_After_M": contar_parametros(modulo) / 1e6,
+                "Latency_Before_ms": latencia_original, "Latency_After_ms": latencia_final,
+                "Latency_Target_ms": latencia_alvo, "Target_Met": latencia_final <= latencia_alvo,
+                "Test_mAP50_95": metricas.box.map, "Test_mAP50": metricas.box.map50,
+            })
+            self.logger.info(f"  Modelo podado '{run_name}': {latencia_final:.2f} ms, mAP50-95 (test) {metricas.box.map:.4f}.")
+            self._registrar_run(candidato, run_name, data_config, resultado)
+        except Exception as e:
+            self.logger.error(f"FALHA na poda de '{candidato['run_dir'].name}'. Motivo: {e}", exc_info=True)
+            resultado["Error"] = str(e).replace('\n', ' ')
+        finally:
+            self.resultados.append(resultado)
+
+    def _registrar_run(self, candidato: Dict[str, Any], run_name: str, data_config: str, resultado: Dict[str, Any]):
+        """Sidecar e entrada no catálogo do run podado, como nos scripts de treino."""
+        try:
+            modelo = run_name.split('_')[0]
+            gravar_metadados_run(self.runs_dir / run_name, {
+                "modelo": modelo,
+                "familia": "podado",
+                "modelo_base": str(candidato['model_path']),
+                "run_origem": candidato['run_dir'].name,
+                "dataset": candidato['dataset'],
+                "data_config": str(self.root_dir / data_config),
+                "parametros": candidato['parametros'],
+                "status": resultado["Status"],
+                "inicio": datetime.datetime.strptime(self.timestamp, '%d-%m-%Y_%H-%M-%S').isoformat(),
+                "fim": datetime.datetime.now().isoformat(timespec='seconds'),
+                "resultado": resultado,
+                "config": self.config,
+            })
+            CatalogoRuns(RUN_CATALOG_PATH).registrar(self.runs_dir / run_name)
+        except Exception:
+            self.logger.warning(f"Não foi possível gravar os metadados do run '{run_name}'.", exc_info=True)
+
+    def _gerar_relatorio(self):
+        if not self.resultados:
+            self.logger.warning("Nenhum resultado para gerar relatório.")
+            return
+
+        report_path = self.reports_dir / f"poda_estruturada_resumo_{self.timestamp}.csv"
+        self.logger.info(f"Gerando relatório de poda em '{report_path}'...")
+        os.makedirs(self.reports_dir, exist_ok=True)
+        try:
+            with open(report_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.resultados[0].keys())
+                writer.writeheader()
+                for row in self.resultados:
+                    writer.writerow({k: (f"{v:.4f}" if isinstance(v, float) else v) for k, v in row.items()})
+            self.logger.info("Relatório de poda gerado com sucesso.")
+        except Exception as e:
+            self.logger.error(f"Não foi possível gerar o relatório CSV: {e}")
+
+    def run(self):
+        self.logger.info("=" * 70)
+        self.logger.info("INICIANDO PODA ESTRUTURADA COM ALVO DE LATÊNCIA")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 70)
+
+        if not self.config['MODELS_TO_PRUNE']:
+            self.logger.info("Nenhum modelo listado em 'MODELS_TO_PRUNE'. Nada a podar.")
+            return
+
+        device = '0' if torch.cuda.is_available() else 'cpu'
+        candidatos = self._identificar_candidatos()
+        for i, candidato in enumerate(candidatos):
+            self.logger.info("-" * 70)
+            self.logger.info(f"Poda {i + 1}/{len(candidatos)}: {candidato['run_dir'].name}")
+            self._podar_candidato(candidato, device)
+
+        self._gerar_relatorio()
+        self.logger.info("=" * 70)
+        self.logger.info("PODA ESTRUTURADA FINALIZADA")
+        self.logger.info("=" * 70)
+
+
+def main():
+    """Ponto de entrada do script."""
+    podador = PodadorEstruturado(PRUNING_CONFIG)
+    podador.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import sys
+import time
+import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+    import torch
+    import yaml
+    from ultralytics import YOLO
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, pyyaml, pandas).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics pyyaml pandas pyarrow")
+    sys.exit(1)
+
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, ROOT_DIR, RUNS_DIR, CACHE_DIR, RUN_CATALOG_PATH
+from config.evaluation_params import CROSS_DATASET_CONFIG, TEST_TENSOR_CACHE_CONFIG
+from utils.logger_config import setup_logging
+from utils.model_cache import carregar_modelo
+from utils.class_mapping import traduzir_classes
+from utils.detection_metrics import calcular_metricas
+from utils.run_catalog import CatalogoRuns, mais_recentes
+from utils.test_tensor_cache import criar_cache_tensores, dataset_de_teste, LeitorTensores
+
+
+class SplitTeste:
+    """Split de teste de um dataset já decodificado (cache de tensores) e seu gabarito em pixels."""
+
+    def __init__(self, nome: str, nomes_classes: Dict[int, str], leitor: LeitorTensores, gabarito: pd.DataFrame):
+        self.nome = nome
+        self.nomes_classes = nomes_classes
+        self.leitor = leitor
+        self.gabarito = gabarito
+
+
+class AvaliacaoCruzada:
+    """
+    Matriz de generalização modelo x dataset: cada modelo treinado é avaliado no split de teste
+    de todos os datasets, com as classes traduzidas pelos nomes canônicos (CLASS_MERGE_MAP).
+    Cada split é decodificado uma única vez (cache de tensores de teste) e cada modelo é carregado
+    uma única vez e percorre todos os splits; as métricas vêm de 'utils.detection_metrics'.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.base_dataset_dir = Path(UNZIPPED_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.root_dir = Path(ROOT_DIR)
+        self.runs_dir = Path(RUNS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('CrossDatasetLogger', __file__)
+        self.cache_tensores = criar_cache_tensores(TEST_TENSOR_CACHE_CONFIG, Path(CACHE_DIR) / 'test_tensors')
+        self.resultados = []
+
+    def _datasets_de_teste(self) -> List[str]:
+        nomes = self.config['TEST_DATASETS'] or sorted(
+            d.name for d in self.base_dataset_dir.iterdir() if (d / 'data.yaml').is_file())
+        validos = []
+        for nome in nomes:
+            with open(self.base_dataset_dir / nome / 'data.yaml', 'r', encoding='utf-8') as f:
+                dir_teste = self.base_dataset_dir / nome / yaml.safe_load(f).get('test', 'test/images')
+            if dir_teste.is_dir():
+                validos.append(nome)
+            else:
+                self.logger.warning(f"Dataset '{nome}' sem split de teste em '{dir_teste}'. Ignorado.")
+        return validos
+
+    def _preparar_split(self, nome: str) -> SplitTeste:
+        """Decodifica (ou reutiliza do cache) as imagens e converte os rótulos para xyxy em pixels."""
+        data_config = str(self.base_dataset_dir / nome / 'data.yaml')
+        dataset = dataset_de_teste(data_config, self.config['IMG_SIZE'])
+        leitor, resumo = self.cache_tensores.preparar(dataset, TEST_TENSOR_CACHE_CONFIG['BUILD_THREADS'])
+        self.logger.info(f"  Split '{nome}': {len(leitor)} imagens "
+                         f"({'cache reutilizado' if resumo['reutilizado'] else 'cache construído'}).")
+
+        linhas = []
+        for rotulo in dataset.labels:
+            posicao = leitor.posicao(rotulo['im_file'])
+            if posicao is None or not len(rotulo['cls']):
+                continue
+            _, _, (h, w) = leitor.imagem(posicao)
+            xywh = rotulo['bboxes'] * np.array([w, h, w, h])
+            xyxy = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1)
+            linhas.append(np.column_stack([np.full(len(xyxy), posicao), xyxy, rotulo['cls'].reshape(-1)]))
+        gabarito = pd.DataFrame(np.concatenate(linhas) if linhas else np.zeros((0, 6)),
+                                columns=['imagem', 'x1', 'y1', 'x2', 'y2', 'classe'])
+        gabarito[['imagem', 'classe']] = gabarito[['imagem', 'classe']].astype(int)
+        return SplitTeste(nome, dict(dataset.data['names']), leitor, gabarito)
+
+    def _candidatos(self) -> List[Dict[str, Any]]:
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(self.runs_dir)
+        registros = [r for r in catalogo.consultar(modelos=self.config['FILTER_MODELS'],
+                                                   datasets=self.config['FILTER_DATASETS']) if r['dataset']]
+        return mais_recentes(registros) if self.config['LATEST_RUN_ONLY'] else registros
+
+    def _predizer(self, modelo, split: SplitTeste, device: str) -> pd.DataFrame:
+        """Predições do modelo sobre as imagens do split, em lotes, nas coordenadas das imagens do cache."""
+        lotes = []
+        total, batch = len(split.leitor), self.config['BATCH_SIZE']
+        for inicio in range(0, total, batch):
+            posicoes = range(inicio, min(inicio + batch, total))
+            imagens = [split.leitor.imagem(p)[0] for p in posicoes]
+            resultados = modelo.predict(imagens, imgsz=self.config['IMG_SIZE'], conf=self.config['CONF_THRESHOLD'],
+                                        iou=self.config['NMS_IOU'], device=device, verbose=False)
+            for posicao, resultado in zip(posicoes, resultados):
+                caixas = resultado.boxes
+                lotes.append(np.column_stack([
+                    np.full(len(caixas), posicao), caixas.xyxy.cpu().numpy(),
+                    caixas.conf.cpu().numpy(), caixas.cls.cpu().numpy()]))
+        predicoes = pd.DataFrame(np.concatenate(lotes) if lotes else np.zeros((0, 7)),
+                                 columns=['imagem', 'x1', 'y1', 'x2', 'y2', 'conf', 'classe'])
+        predicoes[['imagem', 'classe']] = predicoes[['imagem', 'classe']].astype(int)
+        return predicoes
+
+    def _avaliar_celula(self, registro: Dict[str, Any], modelo, split: SplitTeste, device: str) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        traducao = traduzir_classes(modelo.names, split.nomes_classes)
+        celula = {
+            "nome_run": registro['nome_run'], "modelo": registro['modelo'], "dataset_treino": registro['dataset'],
+            "dataset_teste": split.nome, "mesmo_dataset": registro['dataset'] == split.nome,
+            "classes_compartilhadas": len(set(traducao.values())),
+            "classes_sem_correspondencia": ', '.join(
+                nome for i, nome in sorted(split.nomes_classes.items()) if i not in set(traducao.values())),
+            "mAP50_95": np.nan, "mAP50": np.nan, "precisao": np.nan, "recall": np.nan, "f1_score": np.nan,
+        }
+        if traducao:
+            predicoes = self._predizer(modelo, split, device)
+            # Predições de classes que o dataset não anota e gabarito de classes que o modelo não conhece
+            # ficam fora da métrica: a matriz mede a generalização apenas no vocabulário compartilhado.
+            predicoes = predicoes[predicoes['classe'].isin(list(traducao))]
+            predicoes = predicoes.assign(classe=predicoes['classe'].map(traducao))
+            gabarito = split.gabarito[split.gabarito['classe'].isin(set(traducao.values()))]
+            if len(gabarito):
+                metricas = calcular_metricas(predicoes, gabarito, nomes_classes=split.nomes_classes)
+                celula.update({k: metricas[k] for k in ('mAP50_95', 'mAP50', 'precisao', 'recall', 'f1_score')})
+        celula["tempo_s"] = time.perf_counter() - inicio
+        return celula
+
+    def _salvar_relatorio(self) -> Optional[Path]:
+        if not self.resultados:
+            self.logger.warning("Nenhum resultado para gerar relatório.")
+            return None
+        caminho = self.reports_dir / f"matriz_generalizacao_{self.timestamp}.csv"
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(self.resultados).to_csv(caminho, index=False, float_format='%.4f')
+        self.logger.info(f"Matriz de generalização salva em '{caminho}'.")
+        return caminho
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO AVALIAÇÃO CRUZADA ENTRE DATASETS")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        candidatos = self._candidatos()
+        if not candidatos:
+            self.logger.warning("Nenhum run com 'best.pt' encontrado no catálogo. Nada a avaliar.")
+            return
+
+        splits = []
+        for nome in self._datasets_de_teste():
+            try:
+                splits.append(self._preparar_split(nome))
+            except Exception:
+                self.logger.exception(f"Falha ao preparar o split de teste de '{nome}'.")
+        if not splits:
+            self.logger.warning("Nenhum split de teste disponível.")
+            return
+
+        device = '0' if torch.cuda.is_available() else 'cpu'
+        self.logger.info(f"{len(candidatos)} modelos x {len(splits)} datasets no dispositivo '{device}'.")
+        for i, registro in enumerate(candidatos):
+            self.logger.info("-" * 80)
+            self.logger.info(f"Modelo {i + 1}/{len(candidatos)}: {registro['nome_run']}")
+            try:
+                modelo = carregar_modelo(registro['caminho_pesos'])
+            except Exception:
+                self.logger.exception(f"Falha ao carregar '{registro['caminho_pesos']}'.")
+                continue
+            for split in splits:
+                try:
+                    celula = self._avaliar_celula(registro, modelo, split, device)
+                    self.resultados.append(celula)
+                    self.logger.info(f"  -> {split.nome}: mAP50-95 {celula['mAP50_95']:.4f} "
+                                     f"({celula['classes_compartilhadas']} classes compartilhadas, "
+                                     f"{celula['tempo_s']:.1f}s)")
+                except Exception:
+                    self.logger.exception(f"Falha na avaliação de '{registro['nome_run']}' em '{split.nome}'.")
+
+        self._salvar_relatorio()
+        self.logger.info("=" * 80)
+        self.logger.info("AVALIAÇÃO CRUZADA FINALIZADA")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    AvaliacaoCruzada(CROSS_DATASET_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
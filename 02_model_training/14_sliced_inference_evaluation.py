@@ -0,0 +1,182 @@
+import sys
+import time
+import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+
+try:
+    import cv2
+    import numpy as np
+    import pandas as pd
+    import torch
+    from ultralytics import YOLO
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv, pandas).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics pandas pyarrow")
+    sys.exit(1)
+
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, RUNS_DIR, RUN_CATALOG_PATH
+from config.evaluation_params import SLICED_INFERENCE_CONFIG
+from utils.logger_config import setup_logging
+from utils.model_cache import carregar_modelo
+from utils.detection_metrics import calcular_metricas, calcular_map_faixa_area
+from utils.run_catalog import CatalogoRuns, mais_recentes
+from utils.sliced_inference import inferir_fatiado
+from utils.test_tensor_cache import dataset_de_teste
+
+COLUNAS_PREDICOES = ['imagem', 'x1', 'y1', 'x2', 'y2', 'conf', 'classe']
+
+
+def _area(df: pd.DataFrame) -> pd.Series:
+    return (df['x2'] - df['x1']) * (df['y2'] - df['y1'])
+
+
+def _tabela(deteccoes: List[tuple]) -> pd.DataFrame:
+    linhas = [np.column_stack([np.full(len(conf), i), caixas, conf, classes])
+              for i, (caixas, conf, classes) in enumerate(deteccoes)]
+    df = pd.DataFrame(np.concatenate(linhas) if linhas else np.zeros((0, 7)), columns=COLUNAS_PREDICOES)
+    df[['imagem', 'classe']] = df[['imagem', 'classe']].astype(int)
+    return df
+
+
+class AvaliacaoInferenciaFatiada:
+    """
+    Compara, para cada modelo no split de teste do seu dataset, a inferência padrão (imagem inteira
+    em letterbox) com a inferência fatiada em tiles: latência por imagem, mAP geral e mAP em objetos
+    pequenos. O relatório indica, por modelo, se o ganho em objetos pequenos justifica o custo extra.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.base_dataset_dir = Path(UNZIPPED_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.runs_dir = Path(RUNS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('SlicedInferenceLogger', __file__)
+        self.resultados = []
+
+    def _carregar_split(self, nome_dataset: str):
+        """Imagens originais (BGR) e gabarito xyxy em pixels da resolução original."""
+        dataset = dataset_de_teste(str(self.base_dataset_dir / nome_dataset / 'data.yaml'),
+                                   self.config['FULL_IMAGE_SIZE'])
+        rotulos = dataset.labels[:self.config['MAX_IMAGES']] if self.config['MAX_IMAGES'] else dataset.labels
+        imagens, linhas = [], []
+        for i, rotulo in enumerate(rotulos):
+            imagens.append(cv2.imread(rotulo['im_file']))
+            h, w = rotulo['shape']
+            if len(rotulo['cls']):
+                xywh = rotulo['bboxes'] * np.array([w, h, w, h])
+                xyxy = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1)
+                linhas.append(np.column_stack([np.full(len(xyxy), i), xyxy, rotulo['cls'].reshape(-1)]))
+        gabarito = pd.DataFrame(np.concatenate(linhas) if linhas else np.zeros((0, 6)),
+                                columns=['imagem', 'x1', 'y1', 'x2', 'y2', 'classe'])
+        gabarito[['imagem', 'classe']] = gabarito[['imagem', 'classe']].astype(int)
+        return imagens, gabarito
+
+    def _inferir_grupo(self, modelo, lote: List[np.ndarray], device: str, fatiado: bool):
+        if fatiado:
+            fundidas, resumo = inferir_fatiado(modelo, lote, self.config, device)
+            return fundidas, resumo['tiles']
+        deteccoes = []
+        for resultado in modelo.predict(lote, imgsz=self.config['FULL_IMAGE_SIZE'],
+                                        conf=self.config['CONF_THRESHOLD'], iou=self.config['NMS_IOU'],
+                                        max_det=self.config['MAX_DETECTIONS'], device=device, verbose=False):
+            caixas = resultado.boxes
+            deteccoes.append((caixas.xyxy.cpu().numpy(), caixas.conf.cpu().numpy(),
+                              caixas.cls.cpu().numpy().astype(np.int64)))
+        return deteccoes, 0
+
+    def _inferir(self, modelo, imagens: List[np.ndarray], device: str, fatiado: bool):
+        deteccoes, tiles = [], 0
+        grupo = self.config['IMAGES_PER_GROUP']
+        # Aquecimento fora da medição: o primeiro predict de cada caminho monta o predictor e,
+        # no fatiado, um novo tamanho de entrada; sem isso a ordem dos caminhos enviesaria a latência.
+        self._inferir_grupo(modelo, imagens[:grupo], device, fatiado)
+        inicio = time.perf_counter()
+        for inicio_grupo in range(0, len(imagens), grupo):
+            deteccoes_grupo, tiles_grupo = self._inferir_grupo(modelo, imagens[inicio_grupo:inicio_grupo + grupo],
+                                                               device, fatiado)
+            deteccoes.extend(deteccoes_grupo)
+            tiles += tiles_grupo
+        latencia_ms = (time.perf_counter() - inicio) * 1000 / max(1, len(imagens))
+        return _tabela(deteccoes), latencia_ms, tiles / max(1, len(imagens))
+
+    def _metricas(self, predicoes: pd.DataFrame, gabarito: pd.DataFrame) -> Dict[str, float]:
+        """
+        mAP geral e em objetos pequenos (área abaixo de SMALL_OBJECT_AREA). Os pequenos seguem a
+        avaliação por faixa de área do COCO: casamento com o gabarito inteiro e, depois, descarte
+        só das predições casadas com objetos maiores ou sem par e fora da faixa.
+        """
+        geral = calcular_metricas(predicoes, gabarito)
+        area = self.config['SMALL_OBJECT_AREA']
+        pequenos = calcular_map_faixa_area(predicoes, gabarito, area)
+        return {"mAP50_95": geral['mAP50_95'], "mAP50": geral['mAP50'],
+                "mAP50_95_pequenos": pequenos['mAP50_95'], "mAP50_pequenos": pequenos['mAP50'],
+                "objetos_pequenos": int((_area(gabarito) < area).sum())}
+
+    def _avaliar(self, registro: Dict[str, Any], imagens, gabarito, device: str):
+        modelo = carregar_modelo(registro['caminho_pesos'])
+        pred_base, latencia_base, _ = self._inferir(modelo, imagens, device, fatiado=False)
+        pred_fatiada, latencia_fatiada, tiles = self._inferir(modelo, imagens, device, fatiado=True)
+        base, fatiada = self._metricas(pred_base, gabarito), self._metricas(pred_fatiada, gabarito)
+
+        ganho_pequenos = fatiada['mAP50_95_pequenos'] - base['mAP50_95_pequenos']
+        resultado = {
+            "nome_run": registro['nome_run'], "modelo": registro['modelo'], "dataset": registro['dataset'],
+            "imagens": len(imagens), "objetos_pequenos": base['objetos_pequenos'], "tiles_por_imagem": tiles,
+            "latencia_base_ms": latencia_base, "latencia_fatiada_ms": latencia_fatiada,
+            "latencia_extra_ms": latencia_fatiada - latencia_base,
+            "mAP50_95_base": base['mAP50_95'], "mAP50_95_fatiado": fatiada['mAP50_95'],
+            "mAP50_95_pequenos_base": base['mAP50_95_pequenos'],
+            "mAP50_95_pequenos_fatiado": fatiada['mAP50_95_pequenos'],
+            "ganho_mAP50_95_pequenos": ganho_pequenos,
+            "ganho_mAP50_95_geral": fatiada['mAP50_95'] - base['mAP50_95'],
+            "recomendar_fatiamento": bool(ganho_pequenos >= self.config['MIN_SMALL_GAIN']),
+        }
+        self.logger.info(f"  Pequenos: mAP50-95 {base['mAP50_95_pequenos']:.4f} -> {fatiada['mAP50_95_pequenos']:.4f}; "
+                         f"latência {latencia_base:.1f} -> {latencia_fatiada:.1f} ms/imagem "
+                         f"({tiles:.1f} tiles/imagem).")
+        return resultado
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO AVALIAÇÃO DA INFERÊNCIA FATIADA (TILES)")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(self.runs_dir)
+        candidatos = mais_recentes([r for r in catalogo.consultar(modelos=self.config['FILTER_MODELS'],
+                                                                  datasets=self.config['FILTER_DATASETS'])
+                                    if r['dataset']])
+        if not candidatos:
+            self.logger.warning("Nenhum run com 'best.pt' encontrado no catálogo. Nada a avaliar.")
+            return
+
+        device = '0' if torch.cuda.is_available() else 'cpu'
+        splits = {}
+        for i, registro in enumerate(candidatos):
+            self.logger.info("-" * 80)
+            self.logger.info(f"Modelo {i + 1}/{len(candidatos)}: {registro['nome_run']}")
+            try:
+                if registro['dataset'] not in splits:
+                    splits[registro['dataset']] = self._carregar_split(registro['dataset'])
+                self.resultados.append(self._avaliar(registro, *splits[registro['dataset']], device))
+            except Exception:
+                self.logger.exception(f"Falha na avaliação fatiada de '{registro['nome_run']}'.")
+
+        if self.resultados:
+            caminho = self.reports_dir / f"inferencia_fatiada_{self.timestamp}.csv"
+            self.reports_dir.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(self.resultados).to_csv(caminho, index=False, float_format='%.4f')
+            self.logger.info(f"Relatório salvo em '{caminho}'.")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    AvaliacaoInferenciaFatiada(SLICED_INFERENCE_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
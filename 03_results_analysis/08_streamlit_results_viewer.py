@@ -4,14 +4,15 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 import altair as alt
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 
 try:
-    from config.paths import REPORTS_DIR
+    from config.paths import REPORTS_DIR, RUN_CATALOG_PATH
+    from utils.run_catalog import CatalogoRuns
 except ImportError:
     st.error(
         "Erro Crítico: Não foi possível importar 'config.paths'. Verifique se o script está na pasta '03_results_analysis/'.")
@@ -183,6 +184,17 @@ def load_raw_data(filenames_to_load: Tuple[str, ...]) -> pd.DataFrame:
     return raw_df
 
 
+# Custos estáticos do avaliador (independentes do hardware, exceto o RSS), usados como eixos de Pareto
+COST_COLUMNS = {
+    'parametros_m': 'Parâmetros (M)',
+    'gflops': 'GFLOPs',
+    'tamanho_pesos_mb': 'Pesos (MB)',
+    'rss_pico_mb': 'RSS pico (MB)',
+    'rss_incremento_mb': 'RSS incremento (MB)',
+    'ativacoes_mb': 'Ativações (MB)',
+}
+
+
 @st.cache_data
 def process_data(raw_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -201,11 +213,13 @@ def process_data(raw_df: pd.DataFrame) -> pd.DataFrame:
         'precisao': 'Precision',
         'recall': 'Recall',
         'f1_score': 'F1-Score',
-        'velocidade_inference_ms': 'Inferencia (ms)'
+        'velocidade_inference_ms': 'Inferencia (ms)',
+        **COST_COLUMNS
     }, inplace=True)
 
     # Força conversão para numérico
-    num_cols = ['mAP50-95', 'mAP50', 'mAP75', 'Precision', 'Recall', 'F1-Score', 'Inferencia (ms)']
+    num_cols = ['mAP50-95', 'mAP50', 'mAP75', 'Precision', 'Recall', 'F1-Score', 'Inferencia (ms)',
+                *COST_COLUMNS.values()]
     for col in num_cols:
         if col in processed_df.columns:
             processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')
@@ -213,6 +227,30 @@ def process_data(raw_df: pd.DataFrame) -> pd.DataFrame:
     return processed_df
 
 
+@st.cache_data(show_spinner="Consultando catálogo de runs...")
+def load_run_catalog(since: Optional[str] = None, until: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Runs do catálogo SQLite mantido pelos scripts de treino e pelo avaliador, opcionalmente
+    restritos a um intervalo de datas de treino (consulta indexada, sem varrer RUNS_DIR).
+    """
+    if not Path(RUN_CATALOG_PATH).is_file():
+        return None
+    runs = CatalogoRuns(RUN_CATALOG_PATH).consultar(desde=since, ate=until, somente_com_pesos=False)
+    return pd.DataFrame([{
+        'nome_run': r['nome_run'], 'modelo_catalogo': r['modelo'], 'data_treino': r['data_run'],
+        'familia': r['metadados'].get('familia', 'N/A'), 'modelo_base': r['metadados'].get('modelo_base', 'N/A'),
+    } for r in runs], columns=['nome_run', 'modelo_catalogo', 'data_treino', 'familia', 'modelo_base'])
+
+
+def attach_catalog(processed_df: pd.DataFrame, catalog_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Usa o modelo registrado no catálogo (quando houver) e acrescenta data de treino e família."""
+    if catalog_df is None or catalog_df.empty:
+        return processed_df
+    merged = processed_df.merge(catalog_df, on='nome_run', how='left')
+    merged['Modelo'] = merged['modelo_catalogo'].fillna(merged['Modelo'])
+    return merged.drop(columns=['modelo_catalogo'])
+
+
 @st.cache_data
 def get_flat_view(processed_df: pd.DataFrame) -> (pd.DataFrame, pd.DataFrame):
     """
@@ -220,7 +258,9 @@ def get_flat_view(processed_df: pd.DataFrame) -> (pd.DataFrame, pd.DataFrame):
     """
     flat_cols = [
         'Modelo', 'dataset_nome', 'mAP50-95', 'mAP50', 'Precision', 'Recall', 'F1-Score', 'Inferencia (ms)',
-        'mAP75', 'nome_run', 'status', 'velocidade_preprocess_ms', 'velocidade_postprocess_ms', 'mensagem_erro'
+        'mAP75', 'nome_run', 'status', 'velocidade_preprocess_ms', 'velocidade_postprocess_ms',
+        'carregador', 'imagens_por_segundo', *COST_COLUMNS.values(), 'data_treino', 'familia', 'modelo_base',
+        'mensagem_erro'
     ]
 
     existing_cols = [col for col in flat_cols if col in processed_df.columns]
@@ -283,6 +323,46 @@ def get_pivot_view(processed_df: pd.DataFrame) -> (pd.DataFrame, pd.DataFrame):
         return None, None
 
 
+def latest_report(pattern: str) -> Optional[Path]:
+    """Arquivo mais recente de REPORTS_DIR que segue o padrão (o timestamp no nome ordena)."""
+    files = sorted(Path(REPORTS_DIR).glob(pattern), key=lambda f: f.name, reverse=True)
+    return files[0] if files else None
+
+
+@st.cache_data
+def load_bootstrap_intervals() -> Optional[pd.DataFrame]:
+    """Intervalos de confiança da execução mais recente do 12_bootstrap_confidence_intervals.py."""
+    path = latest_report('intervalos_bootstrap_*.csv')
+    return pd.read_csv(path) if path else None
+
+
+@st.cache_data
+def load_win_probabilities() -> Optional[pd.DataFrame]:
+    """Probabilidades de vitória pareadas da execução mais recente do bootstrap."""
+    path = latest_report('probabilidades_vitoria_*.csv')
+    return pd.read_csv(path) if path else None
+
+
+def error_bars(df_ci: pd.DataFrame, metric: str, sort_field: str) -> alt.Chart:
+    """
+    Barras de erro horizontais (intervalo bootstrap) para sobrepor a um gráfico de barras por Modelo;
+    'sort_field' repete a ordenação das barras ('-x') para que as camadas compartilhem o eixo.
+    """
+    return alt.Chart(df_ci).mark_errorbar(ticks=True, color='black').encode(
+        x=alt.X(f'{metric}_ic_inf:Q', title=None),
+        x2=f'{metric}_ic_sup:Q',
+        y=alt.Y('Modelo', sort=alt.EncodingSortField(field=sort_field, op='sum', order='descending')),
+        tooltip=['nome_run', alt.Tooltip(f'{metric}_ic_inf:Q', format='.4f'),
+                 alt.Tooltip(f'{metric}_ic_sup:Q', format='.4f')]
+    )
+
+
+def pareto_frontier(df: pd.DataFrame, cost: str, quality: str) -> pd.DataFrame:
+    """Modelos não dominados: percorrendo do menor custo ao maior, os que melhoram a qualidade."""
+    ordered = df.dropna(subset=[cost, quality]).sort_values([cost, quality], ascending=[True, False])
+    return ordered[ordered[quality] > ordered[quality].cummax().shift(fill_value=float('-inf'))]
+
+
 def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
     """Renderiza todo o conteúdo da aba 'Análise Gráfica'."""
 
@@ -293,17 +373,21 @@ def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
         return
 
     # Agrupa para média geral
-    metrics_for_mean = ['mAP50-95', 'mAP50', 'Precision', 'Recall', 'F1-Score', 'Inferencia (ms)']
+    metrics_for_mean = ['mAP50-95', 'mAP50', 'Precision', 'Recall', 'F1-Score', 'Inferencia (ms)',
+                        *COST_COLUMNS.values()]
     existing_metrics_for_mean = [m for m in metrics_for_mean if m in df.columns]
 
     df_mean = df.groupby('Modelo')[existing_metrics_for_mean].mean().reset_index()
 
-    tab_overview, tab_dataset, tab_model, tab_matrix, tab_dist = st.tabs([
+    tab_overview, tab_dataset, tab_model, tab_matrix, tab_dist, tab_kd, tab_cross, tab_streams = st.tabs([
         "🚀 Visão Geral",
         "📊 Por Dataset",
         "🤖 Por Modelo",
         "🔲 Matrizes e Heatmaps",
-        "📉 Distribuições"
+        "📉 Distribuições",
+        "🎓 Destilação",
+        "🌐 Generalização",
+        "🎥 Multi-stream"
     ])
 
     with tab_overview:
@@ -315,16 +399,25 @@ def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
         else:
             tooltip_cols = ['Modelo', 'mAP50-95', 'Inferencia (ms)']
 
+        cost_axes = ['Inferencia (ms)'] + [c for c in COST_COLUMNS.values()
+                                           if c in df_mean.columns and df_mean[c].notna().any()]
+        cost_axis = st.selectbox("Eixo de custo (Pareto)", cost_axes, key="pareto_cost_axis")
+        tooltip_pareto = tooltip_cols + [c for c in cost_axes if c not in tooltip_cols]
+
         chart_map_vs_speed = alt.Chart(df_mean).mark_circle(size=100).encode(
-            x=alt.X('Inferencia (ms)', scale=alt.Scale(zero=False)),
+            x=alt.X(cost_axis, scale=alt.Scale(zero=False)),
             y=alt.Y('mAP50-95', scale=alt.Scale(zero=False)),
             color='Modelo',
-            tooltip=tooltip_cols
+            tooltip=tooltip_pareto
         ).properties(
-            title='Visão Geral: mAP50-95 vs. Velocidade de Inferência (Média)'
-        ).interactive()
+            title=f'Visão Geral: mAP50-95 vs. {cost_axis} (Média)'
+        )
+        frontier = pareto_frontier(df_mean, cost_axis, 'mAP50-95')
+        chart_frontier = alt.Chart(frontier).mark_line(strokeDash=[4, 4], color='gray').encode(
+            x=cost_axis, y='mAP50-95')
 
-        st.altair_chart(chart_map_vs_speed)
+        st.altair_chart((chart_frontier + chart_map_vs_speed).interactive())
+        st.caption("Linha tracejada: fronteira de Pareto (nenhum outro modelo é mais preciso com custo menor).")
 
         col1, col2 = st.columns(2)
 
@@ -381,6 +474,16 @@ def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
 
             col1, col2 = st.columns(2)
 
+            # Intervalos bootstrap (12_bootstrap_confidence_intervals.py), quando disponíveis
+            intervals = load_bootstrap_intervals()
+            df_ci = None
+            if intervals is not None:
+                ci_cols = [c for c in ['Modelo', 'nome_run', 'mAP50-95', 'F1-Score'] if c in df_filtered.columns]
+                df_ci = df_filtered[ci_cols].merge(intervals.drop(columns=['dataset_nome']),
+                                                   on='nome_run', how='inner')
+                if df_ci.empty:
+                    df_ci = None
+
             with col1:
                 chart_ds_map95 = alt.Chart(df_filtered).mark_bar().encode(
                     x=alt.X('mAP50-95'),
@@ -389,7 +492,8 @@ def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
                     tooltip=['Modelo', 'mAP50-95', 'F1-Score'] if 'F1-Score' in df_filtered.columns else ['Modelo',
                                                                                                           'mAP50-95']
                 ).properties(title=f'mAP50-95 em "{selected_dataset}"')
-                st.altair_chart(chart_ds_map95)
+                st.altair_chart(chart_ds_map95 + error_bars(df_ci, 'mAP50_95', 'mAP50-95') if df_ci is not None
+                                else chart_ds_map95)
 
                 if 'F1-Score' in df_filtered.columns:
                     chart_ds_f1 = alt.Chart(df_filtered).mark_bar().encode(
@@ -398,7 +502,25 @@ def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
                         color='Modelo',
                         tooltip=['Modelo', 'F1-Score']
                     ).properties(title=f'F1-Score em "{selected_dataset}"')
-                    st.altair_chart(chart_ds_f1)
+                    st.altair_chart(chart_ds_f1 + error_bars(df_ci, 'f1_score', 'F1-Score') if df_ci is not None
+                                    else chart_ds_f1)
+
+                if df_ci is not None:
+                    st.caption(f"Barras de erro: intervalo bootstrap de {df_ci['confianca'].iloc[0]:.0%} "
+                               f"({int(df_ci['reamostragens'].iloc[0])} reamostragens das imagens de teste).")
+
+                wins = load_win_probabilities()
+                if df_ci is not None and wins is not None:
+                    wins = wins[wins['run_a'].isin(df_ci['nome_run']) & wins['run_b'].isin(df_ci['nome_run'])]
+                    if not wins.empty:
+                        chart_wins = alt.Chart(wins).mark_rect().encode(
+                            x=alt.X('run_b:N', title='Run B'),
+                            y=alt.Y('run_a:N', title='Run A'),
+                            color=alt.Color('prob_a_supera_b:Q', scale=alt.Scale(domain=[0, 1], scheme='redblue'),
+                                            title='P(A > B)'),
+                            tooltip=['run_a', 'run_b', alt.Tooltip('prob_a_supera_b:Q', format='.3f')]
+                        ).properties(title='Probabilidade de A superar B em mAP50-95 (bootstrap)')
+                        st.altair_chart(chart_wins)
 
             with col2:
                 # Precision vs Recall vs F1
@@ -526,6 +648,275 @@ def render_graphics_tab(df: pd.DataFrame, pivot_df: pd.DataFrame):
             ).properties(title='Distribuição de Velocidade')
             st.altair_chart(hist_speed)
 
+    with tab_kd:
+        st.subheader("Alunos Destilados vs. Treino Convencional")
+        df_kd = df[df['Modelo'].str.endswith('-KD')].copy()
+        if df_kd.empty:
+            st.info("Nenhum modelo destilado (sufixo '-KD') nos relatórios selecionados.")
+        else:
+            df_kd['Modelo Base'] = df_kd['Modelo'].str[:-len('-KD')]
+            df_base = df[df['Modelo'].isin(df_kd['Modelo Base'].unique())].copy()
+            df_base['Modelo Base'] = df_base['Modelo']
+            df_base['Treino'] = 'Convencional'
+            df_kd['Treino'] = 'Destilado'
+            df_comp = pd.concat([df_base, df_kd], ignore_index=True)
+
+            chart_kd = alt.Chart(df_comp).mark_bar().encode(
+                x=alt.X('Treino:N', title=None),
+                y=alt.Y('mean(mAP50-95):Q', title='mAP50-95'),
+                color='Treino:N',
+                column=alt.Column('dataset_nome:N', title='Dataset'),
+                row=alt.Row('Modelo Base:N', title='Modelo'),
+                tooltip=['Modelo', 'dataset_nome', 'mAP50-95', 'Inferencia (ms)']
+            ).properties(title='mAP50-95 do aluno destilado vs. mesmo modelo treinado só com as anotações')
+            st.altair_chart(chart_kd)
+
+            tabela = df_comp.pivot_table(index=['Modelo Base', 'dataset_nome'], columns='Treino',
+                                         values='mAP50-95', aggfunc='mean')
+            if {'Convencional', 'Destilado'}.issubset(tabela.columns):
+                tabela['Ganho (mAP50-95)'] = tabela['Destilado'] - tabela['Convencional']
+            st.dataframe(tabela.reset_index(), width='stretch', hide_index=True)
+
+    with tab_cross:
+        render_generalization_section()
+
+    with tab_streams:
+        render_multistream_section()
+
+
+@st.cache_data
+def load_generalization_matrix() -> Optional[pd.DataFrame]:
+    """Matriz modelo x dataset da execução mais recente do 13_cross_dataset_evaluation.py."""
+    path = latest_report('matriz_generalizacao_*.csv')
+    return pd.read_csv(path) if path else None
+
+
+def render_generalization_section():
+    """Heatmap da avaliação cruzada: cada modelo treinado avaliado no split de teste de todos os datasets."""
+    st.subheader("Generalização entre Datasets")
+    df_cross = load_generalization_matrix()
+    if df_cross is None or df_cross.empty:
+        st.info("Nenhuma matriz encontrada. Execute '13_cross_dataset_evaluation.py' para gerá-la.")
+        return
+
+    metric = st.selectbox("Métrica", ['mAP50_95', 'mAP50', 'f1_score', 'precisao', 'recall'], key="cross_metric")
+    df_cross = df_cross.copy()
+    df_cross['Modelo (treino)'] = df_cross['modelo'] + ' @ ' + df_cross['dataset_treino']
+
+    base = alt.Chart(df_cross).encode(
+        x=alt.X('dataset_teste:N', title='Dataset de teste'),
+        y=alt.Y('Modelo (treino):N', title='Modelo @ dataset de treino'),
+    )
+    heatmap = base.mark_rect().encode(
+        color=alt.Color(f'{metric}:Q', scale=alt.Scale(scheme='viridis')),
+        tooltip=['nome_run', 'dataset_teste', alt.Tooltip(f'{metric}:Q', format='.3f'),
+                 'classes_compartilhadas', 'classes_sem_correspondencia']
+    )
+    text = base.mark_text(fontSize=10).encode(
+        text=alt.Text(f'{metric}:Q', format='.2f'),
+        color=alt.condition(f'datum.{metric} > 0.5', alt.value('black'), alt.value('white'))
+    )
+    st.altair_chart((heatmap + text).properties(title=f'{metric} por modelo e dataset de teste'))
+    st.caption("Apenas as classes compartilhadas (nomes canônicos, CLASS_MERGE_MAP) entram na métrica; "
+               "células vazias indicam nenhuma classe em comum.")
+
+    # Queda em relação ao próprio dataset de treino
+    own = df_cross[df_cross['mesmo_dataset']].set_index('nome_run')[metric]
+    df_cross['Queda vs. treino'] = own.reindex(df_cross['nome_run']).to_numpy() - df_cross[metric]
+    st.dataframe(df_cross[~df_cross['mesmo_dataset']][
+                     ['nome_run', 'dataset_teste', 'classes_compartilhadas', metric, 'Queda vs. treino']],
+                 width='stretch', hide_index=True)
+
+
+@st.cache_data
+def load_multistream_benchmark() -> Optional[pd.DataFrame]:
+    """Resultados da execução mais recente do 20_multistream_benchmark.py."""
+    path = latest_report('benchmark_multistream_*.csv')
+    return pd.read_csv(path) if path else None
+
+
+def render_multistream_section():
+    """Vazão agregada, cauda de latência e CPU em função do número de streams simultâneos, por modo."""
+    st.subheader("Contenção com Múltiplos Streams")
+    df_streams = load_multistream_benchmark()
+    if df_streams is None or df_streams.empty:
+        st.info("Nenhum benchmark encontrado. Execute '20_multistream_benchmark.py' para gerá-lo.")
+        return
+
+    run = st.selectbox("Run", sorted(df_streams['nome_run'].unique()), key="multistream_run")
+    df_run = df_streams[df_streams['nome_run'] == run]
+
+    def line(y: str, title: str):
+        return alt.Chart(df_run).mark_line(point=True).encode(
+            x=alt.X('streams:Q', title='Streams simultâneos'),
+            y=alt.Y(f'{y}:Q', title=title),
+            color=alt.Color('modo:N', title='Modo'),
+            tooltip=['modo', 'streams', 'threads_por_worker', alt.Tooltip('vazao_fps:Q', format='.1f'),
+                     alt.Tooltip('p99_pior_stream_ms:Q', format='.1f'), alt.Tooltip('cpu_percentual:Q', format='.0f')]
+        ).properties(title=title)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.altair_chart(line('vazao_fps', 'Vazão agregada (FPS)'))
+    with col2:
+        st.altair_chart(line('p99_pior_stream_ms', 'Latência p99 do pior stream (ms)'))
+    st.altair_chart(line('cpu_percentual', 'Utilização de CPU (%)'))
+    st.caption("A vazão deixa de crescer quando a CPU satura; a partir daí, streams adicionais só aumentam "
+               "a cauda de latência de todos.")
+    st.dataframe(df_run, width='stretch', hide_index=True)
+
+
+def per_class_filename(report_filename: str) -> str:
+    """Nome do Parquet de métricas por classe gravado junto a cada relatório TXT."""
+    return report_filename.replace("relatorio_metricas_absolutas", "relatorio_metricas_por_classe").replace(
+        ".txt", ".parquet")
+
+
+@st.cache_data(show_spinner="Carregando métricas por classe...")
+def load_per_class_data(filenames_to_load: Tuple[str, ...]) -> pd.DataFrame:
+    """
+    Carrega, sob demanda, as tabelas longas de métricas por classe (Parquet) dos relatórios
+    selecionados. Colunas de texto chegam como 'category', o que mantém filtros e agrupamentos
+    rápidos mesmo com milhares de linhas.
+    """
+    report_path = Path(REPORTS_DIR)
+    df_list = []
+    for filename in filenames_to_load:
+        f = report_path / per_class_filename(filename)
+        if f.exists():
+            df_list.append(pd.read_parquet(f))
+    if not df_list:
+        return None
+
+    df = pd.concat(df_list, ignore_index=True)
+    for col in ("nome_run", "dataset_nome", "nome_classe"):
+        df[col] = df[col].astype("category")
+    df['Modelo'] = df['nome_run'].astype(str).str.split('_').str[0].astype("category")
+    return df
+
+
+def render_per_class_tab(filenames_to_load: Tuple[str, ...]):
+    """Renderiza a aba de métricas por classe (carregada apenas quando o usuário a ativa)."""
+    st.header("Métricas por Classe")
+
+    if not st.toggle("Carregar métricas por classe", value=False, key="per_class_toggle",
+                     help="Lê os arquivos 'relatorio_metricas_por_classe_*.parquet' dos relatórios selecionados."):
+        st.info("Ative a opção acima para carregar as métricas por classe.")
+        return
+
+    df = load_per_class_data(filenames_to_load)
+    if df is None or df.empty:
+        st.warning("Nenhum arquivo de métricas por classe encontrado para os relatórios selecionados.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        dataset = st.selectbox("Dataset", sorted(df['dataset_nome'].unique()), key="per_class_dataset")
+    df_dataset = df[df['dataset_nome'] == dataset]
+    with col2:
+        modelos = st.multiselect("Modelos", sorted(df_dataset['Modelo'].unique()), key="per_class_models")
+    with col3:
+        classes = st.multiselect("Classes", sorted(df_dataset['nome_classe'].unique()), key="per_class_classes")
+    metrica = st.radio("Métrica", ["AP50_95", "AP50", "precisao", "recall"], horizontal=True,
+                       key="per_class_metric")
+
+    df_filtered = df_dataset
+    if modelos:
+        df_filtered = df_filtered[df_filtered['Modelo'].isin(modelos)]
+    if classes:
+        df_filtered = df_filtered[df_filtered['nome_classe'].isin(classes)]
+    if df_filtered.empty:
+        st.warning("Nenhum dado para os filtros selecionados.")
+        return
+
+    # Agrega antes de desenhar: os gráficos recebem no máximo (modelos x classes) pontos.
+    df_agg = df_filtered.groupby(['Modelo', 'nome_classe'], observed=True).agg(
+        valor=(metrica, 'mean'), instancias=('instancias', 'max')).reset_index()
+
+    heatmap = alt.Chart(df_agg).mark_rect().encode(
+        x=alt.X('nome_classe:N', title='Classe'),
+        y=alt.Y('Modelo:N'),
+        color=alt.Color('valor:Q', title=metrica, scale=alt.Scale(scheme='viridis')),
+        tooltip=['Modelo', 'nome_classe', alt.Tooltip('valor:Q', format='.3f'), 'instancias']
+    ).properties(title=f'{metrica} por Modelo e Classe ({dataset})')
+    st.altair_chart(heatmap)
+
+    df_classes = df_agg.groupby('nome_classe', observed=True).agg(
+        valor=('valor', 'mean'), instancias=('instancias', 'max')).reset_index()
+    col_a, col_b = st.columns(2)
+    with col_a:
+        bar = alt.Chart(df_classes).mark_bar().encode(
+            x=alt.X('valor:Q', title=f'{metrica} médio'),
+            y=alt.Y('nome_classe:N', sort='x', title='Classe'),
+            tooltip=['nome_classe', alt.Tooltip('valor:Q', format='.3f'), 'instancias']
+        ).properties(title='Classes da pior para a melhor (média dos modelos filtrados)')
+        st.altair_chart(bar)
+    with col_b:
+        scatter = alt.Chart(df_classes).mark_circle(size=80).encode(
+            x=alt.X('instancias:Q', scale=alt.Scale(type='log'), title='Instâncias no teste (log)'),
+            y=alt.Y('valor:Q', title=f'{metrica} médio'),
+            tooltip=['nome_classe', 'instancias', alt.Tooltip('valor:Q', format='.3f')]
+        ).properties(title='Desempenho vs. frequência da classe')
+        st.altair_chart(scatter)
+
+    st.dataframe(df_filtered.drop(columns=['Modelo']), width='stretch', hide_index=True)
+
+
+@st.cache_data(show_spinner="Carregando varredura de limiares...")
+def load_threshold_sweep(filename: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Carrega as curvas P/R/F1 por limiar e o resumo de limiares ótimos de uma varredura."""
+    report_path = Path(REPORTS_DIR)
+    curves = pd.read_parquet(report_path / filename)
+    summary_file = report_path / filename.replace("varredura_limiares_", "limiares_otimos_").replace(".parquet", ".csv")
+    summary = pd.read_csv(summary_file) if summary_file.exists() else None
+    return curves, summary
+
+
+def render_threshold_tab():
+    """Renderiza as curvas da varredura de limiares de confiança (11_confidence_threshold_sweep.py)."""
+    st.header("Limiares de Confiança")
+
+    sweep_files = sorted(Path(REPORTS_DIR).glob('varredura_limiares_*.parquet'), key=lambda f: f.name, reverse=True)
+    if not sweep_files:
+        st.info("Nenhuma varredura encontrada. Execute '11_confidence_threshold_sweep.py' para gerá-la.")
+        return
+    if not st.toggle("Carregar varredura de limiares", value=False, key="threshold_toggle"):
+        return
+
+    selected_file = st.selectbox("Varredura", [f.name for f in sweep_files], key="threshold_file")
+    curves, summary = load_threshold_sweep(selected_file)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        run = st.selectbox("Run", sorted(curves['nome_run'].unique()), key="threshold_run")
+    df_run = curves[curves['nome_run'] == run]
+    with col2:
+        class_names = sorted(df_run['nome_classe'].unique(), key=lambda c: (c != 'todas', c))
+        selected_classes = st.multiselect("Classes", class_names, default=['todas'], key="threshold_classes")
+    df_run = df_run[df_run['nome_classe'].isin(selected_classes)]
+    if df_run.empty:
+        st.warning("Selecione ao menos uma classe.")
+        return
+
+    df_long = df_run.melt(id_vars=['nome_classe', 'limiar'], value_vars=['precisao', 'recall', 'f1'],
+                          var_name='Métrica', value_name='Valor')
+    lines = alt.Chart(df_long).mark_line().encode(
+        x=alt.X('limiar:Q', title='Limiar de confiança'),
+        y=alt.Y('Valor:Q', scale=alt.Scale(domain=[0, 1])),
+        color='Métrica:N',
+        strokeDash='nome_classe:N',
+        tooltip=['nome_classe', 'Métrica', alt.Tooltip('limiar:Q', format='.3f'), alt.Tooltip('Valor:Q', format='.3f')]
+    ).properties(title=f'Precisão, Recall e F1 por limiar ({run})')
+
+    if summary is not None:
+        summary_run = summary[(summary['nome_run'] == run) & (summary['nome_classe'].isin(selected_classes))]
+        rules = alt.Chart(summary_run).mark_rule(strokeDash=[4, 4], color='gray').encode(
+            x='limiar_f1_otimo:Q', tooltip=['nome_classe', 'limiar_f1_otimo', 'f1_max'])
+        st.altair_chart(lines + rules)
+        st.dataframe(summary_run, width='stretch', hide_index=True)
+    else:
+        st.altair_chart(lines)
+
 
 def render_data_table_tab(processed_df, raw_df, pivot_export_df, view_mode, show_details, selection_key):
     """Renderiza todo o conteúdo da aba 'Tabela de Dados'."""
@@ -724,13 +1115,34 @@ def main():
         st.error("Falha no processamento dos dados.")
         st.stop()
 
+    catalog_df = load_run_catalog()
+    processed_df = attach_catalog(processed_df, catalog_df)
+    if catalog_df is not None and catalog_df['data_treino'].notna().any():
+        st.sidebar.header("3. Data de Treino (Catálogo)")
+        dates = pd.to_datetime(catalog_df['data_treino'], errors='coerce').dropna().dt.date
+        full_range = (dates.min(), dates.max())
+        date_range = st.sidebar.date_input("Intervalo de datas", value=full_range, key="catalog_dates")
+        if isinstance(date_range, tuple) and len(date_range) == 2 and tuple(date_range) != full_range:
+            runs_in_range = load_run_catalog(date_range[0].isoformat(), date_range[1].isoformat())['nome_run']
+            processed_df = processed_df[processed_df['nome_run'].isin(runs_in_range)]
+            if processed_df.empty:
+                st.warning("Nenhum run avaliado foi treinado no intervalo selecionado.")
+                st.stop()
+
     _, pivot_export_df = get_pivot_view(processed_df)
 
-    tab_charts, tab_data = st.tabs(["📊 Análise Gráfica", "🗃️ Tabela de Dados"])
+    tab_charts, tab_per_class, tab_thresholds, tab_data = st.tabs(
+        ["📊 Análise Gráfica", "🐟 Por Classe", "🎚️ Limiares", "🗃️ Tabela de Dados"])
 
     with tab_charts:
         render_graphics_tab(processed_df, pivot_export_df)
 
+    with tab_per_class:
+        render_per_class_tab(filenames_to_load)
+
+    with tab_thresholds:
+        render_threshold_tab()
+
     with tab_data:
         render_data_table_tab(
             processed_df=processed_df,
@@ -0,0 +1,102 @@
+import os
+import sys
+import csv
+import time
+import datetime
+from pathlib import Path
+from typing import Dict, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (numpy, pandas, pyarrow).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install numpy pandas pyarrow")
+    sys.exit(1)
+
+from config.paths import EVAL_DIR, REPORTS_DIR
+from config.evaluation_params import RECOMPUTE_CONFIG
+from utils.logger_config import setup_logging
+from utils.detection_metrics import calcular_metricas, LIMIARES_IOU_COCO
+from utils.prediction_store import carregar_predicoes, ARQUIVO_METADADOS
+
+
+class RecalculadorMetricas:
+    """
+    Recalcula as métricas de todos os modelos a partir das predições gravadas pelo
+    07_evaluate_models_on_test_set, sem nova inferência, e confere o resultado com as
+    métricas do Ultralytics quando os parâmetros são os padrões da validação.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.eval_dir = Path(EVAL_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('RecomputeMetricsLogger', __file__)
+        self.limiares = (np.asarray(self.config['IOU_THRESHOLDS'], dtype=float)
+                         if self.config['IOU_THRESHOLDS'] is not None else LIMIARES_IOU_COCO)
+        self.parametros_padrao = (self.config['IOU_THRESHOLDS'] is None and self.config['CONF_THRESHOLD'] == 0.0)
+
+    def _recalcular(self, diretorio: Path) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        predicoes, gabarito, metadados = carregar_predicoes(diretorio)
+        metricas = calcular_metricas(predicoes, gabarito, self.limiares, self.config['CONF_THRESHOLD'],
+                                     metadados['nomes_classes'])
+        linha = {
+            "nome_run": diretorio.parent.name.removesuffix('_EVAL'),
+            "mAP50": metricas['mAP50'], "mAP75": metricas['mAP75'], "mAP50_95": metricas['mAP50_95'],
+            "precisao": metricas['precisao'], "recall": metricas['recall'], "f1_score": metricas['f1_score'],
+            "predicoes": len(predicoes), "tempo_recalculo_s": time.perf_counter() - inicio,
+            "diferenca_mAP50_95_ultralytics": "N/A", "dentro_da_tolerancia": "N/A",
+        }
+        if self.parametros_padrao:
+            diferenca = metricas['mAP50_95'] - metadados['metricas_ultralytics']['mAP50_95']
+            linha["diferenca_mAP50_95_ultralytics"] = diferenca
+            linha["dentro_da_tolerancia"] = abs(diferenca) <= self.config['TOLERANCE']
+            if not linha["dentro_da_tolerancia"]:
+                self.logger.warning(f"  '{linha['nome_run']}': mAP50-95 recalculado difere do Ultralytics em {diferenca:+.4f}.")
+        return linha
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO RECÁLCULO DE MÉTRICAS A PARTIR DAS PREDIÇÕES ARMAZENADAS")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        armazenamentos = sorted(p.parent for p in self.eval_dir.glob(f"*_EVAL/predicoes/{ARQUIVO_METADADOS}"))
+        if not armazenamentos:
+            self.logger.warning(f"Nenhum armazenamento de predições encontrado em '{self.eval_dir}'.")
+            return
+
+        linhas = []
+        for diretorio in armazenamentos:
+            try:
+                linhas.append(self._recalcular(diretorio))
+                self.logger.info(f"  {linhas[-1]['nome_run']}: mAP50-95 {linhas[-1]['mAP50_95']:.4f} "
+                                 f"({linhas[-1]['tempo_recalculo_s']:.2f} s)")
+            except Exception:
+                self.logger.exception(f"Falha ao recalcular as métricas de '{diretorio}'.")
+
+        if not linhas:
+            return
+        caminho = self.reports_dir / f"metricas_recalculadas_{self.timestamp}.csv"
+        with open(caminho, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=linhas[0].keys())
+            writer.writeheader()
+            for linha in linhas:
+                writer.writerow({k: (f"{v:.5f}" if isinstance(v, float) else v) for k, v in linha.items()})
+        self.logger.info(f"Relatório salvo em '{caminho}'.")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    RecalculadorMetricas(RECOMPUTE_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
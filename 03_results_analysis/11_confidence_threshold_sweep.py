@@ -0,0 +1,101 @@
+import os
+import sys
+import csv
+import datetime
+from pathlib import Path
+from typing import Dict, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (numpy, pandas, pyarrow).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install numpy pandas pyarrow")
+    sys.exit(1)
+
+from config.paths import EVAL_DIR, REPORTS_DIR
+from config.evaluation_params import THRESHOLD_SWEEP_CONFIG
+from utils.logger_config import setup_logging
+from utils.detection_metrics import varrer_limiares_confianca, limiares_otimos
+from utils.prediction_store import carregar_predicoes, ARQUIVO_METADADOS
+
+
+class VarreduraLimiares:
+    """
+    Varre limiares de confiança sobre as predições armazenadas pelo avaliador e encontra, por
+    modelo e por classe, o limiar de F1 máximo e o limiar mais alto que respeita o piso de recall.
+    Gera as curvas completas (Parquet, usadas pelo visualizador) e um resumo CSV dos limiares.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.eval_dir = Path(EVAL_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('ThresholdSweepLogger', __file__)
+        inicio, fim, passo = self.config['CONF_GRID']
+        self.grade = np.round(np.arange(inicio, fim + passo / 2, passo), 6)
+
+    def _varrer(self, diretorio: Path):
+        nome_run = diretorio.parent.name.removesuffix('_EVAL')
+        predicoes, gabarito, metadados = carregar_predicoes(diretorio)
+        curvas = varrer_limiares_confianca(predicoes, gabarito, self.grade, self.config['IOU_THRESHOLD'])
+        otimos = limiares_otimos(curvas, self.config['RECALL_FLOOR'])
+
+        nomes = {-1: 'todas', **metadados['nomes_classes']}
+        for df in (curvas, otimos):
+            df.insert(0, 'nome_run', nome_run)
+            df.insert(2, 'nome_classe', df['classe'].map(lambda c: nomes.get(int(c), str(c))))
+
+        geral = otimos[otimos['classe'] == -1].iloc[0]
+        self.logger.info(f"  {nome_run}: limiar de F1 máximo {geral['limiar_f1_otimo']:.3f} "
+                         f"(F1 {geral['f1_max']:.3f}); piso de recall {self.config['RECALL_FLOOR']:.2f} "
+                         f"-> limiar {geral['limiar_piso_recall']:.3f}.")
+        return curvas, otimos
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO VARREDURA DE LIMIARES DE CONFIANÇA")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        armazenamentos = sorted(p.parent for p in self.eval_dir.glob(f"*_EVAL/predicoes/{ARQUIVO_METADADOS}"))
+        if not armazenamentos:
+            self.logger.warning(f"Nenhum armazenamento de predições encontrado em '{self.eval_dir}'.")
+            return
+
+        todas_curvas, todos_otimos = [], []
+        for diretorio in armazenamentos:
+            try:
+                curvas, otimos = self._varrer(diretorio)
+                todas_curvas.append(curvas)
+                todos_otimos.append(otimos)
+            except Exception:
+                self.logger.exception(f"Falha na varredura de '{diretorio}'.")
+
+        if not todas_curvas:
+            return
+        caminho_curvas = self.reports_dir / f"varredura_limiares_{self.timestamp}.parquet"
+        curvas = pd.concat(todas_curvas, ignore_index=True)
+        for coluna in ('nome_run', 'nome_classe'):
+            curvas[coluna] = curvas[coluna].astype('category')
+        curvas.to_parquet(caminho_curvas, index=False, compression='zstd')
+
+        caminho_resumo = self.reports_dir / f"limiares_otimos_{self.timestamp}.csv"
+        otimos = pd.concat(todos_otimos, ignore_index=True)
+        otimos['piso_recall'] = self.config['RECALL_FLOOR']
+        otimos.to_csv(caminho_resumo, index=False, float_format='%.4f', quoting=csv.QUOTE_MINIMAL)
+        self.logger.info(f"Curvas salvas em '{caminho_curvas}'; resumo em '{caminho_resumo}'.")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    VarreduraLimiares(THRESHOLD_SWEEP_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
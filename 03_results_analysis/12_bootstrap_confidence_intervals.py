@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import datetime
+from itertools import permutations
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (numpy, pandas, pyarrow).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install numpy pandas pyarrow")
+    sys.exit(1)
+
+from config.paths import EVAL_DIR, REPORTS_DIR, RUNS_DIR, RUN_CATALOG_PATH
+from config.evaluation_params import BOOTSTRAP_CONFIG
+from utils.logger_config import setup_logging
+from utils.detection_metrics import calcular_metricas, reamostrar_metricas
+from utils.prediction_store import carregar_predicoes, ARQUIVO_METADADOS, ARQUIVO_IMAGENS
+from utils.run_catalog import CatalogoRuns
+
+METRICAS = ['mAP50_95', 'mAP50', 'precisao', 'recall', 'f1_score']
+
+
+class IntervalosBootstrap:
+    """
+    Intervalos de confiança bootstrap para as métricas de teste e probabilidades de vitória entre
+    modelos, a partir das predições armazenadas pelo avaliador (sem nova inferência). Em cada
+    dataset, todos os modelos usam as mesmas reamostragens de imagens (bootstrap pareado), de modo
+    que a probabilidade de vitória compara os modelos sobre exatamente as mesmas amostras.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.eval_dir = Path(EVAL_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('BootstrapLogger', __file__)
+        self.rng = np.random.default_rng(self.config['SEED'])
+
+    @staticmethod
+    def _datasets_por_run() -> Dict[str, str]:
+        """Dataset de cada run segundo o catálogo (metadados gravados pelo treino, ou o nome do run)."""
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(Path(RUNS_DIR))
+        return {r['nome_run']: r['dataset'] for r in catalogo.consultar(somente_com_pesos=False) if r['dataset']}
+
+    def _agrupar_por_dataset(self, armazenamentos: List[Path]) -> Dict[str, List[Path]]:
+        datasets = self._datasets_por_run()
+        grupos: Dict[str, List[Path]] = {}
+        for diretorio in armazenamentos:
+            nome_run = diretorio.parent.name.removesuffix('_EVAL')
+            if nome_run not in datasets:
+                self.logger.warning(f"Run '{nome_run}' ausente do catálogo de runs; dataset desconhecido, ignorado.")
+                continue
+            grupos.setdefault(datasets[nome_run], []).append(diretorio)
+        return grupos
+
+    def _avaliar_dataset(self, dataset: str, diretorios: List[Path]):
+        inicio = time.perf_counter()
+        runs = []
+        for diretorio in diretorios:
+            predicoes, gabarito, metadados = carregar_predicoes(diretorio)
+            arquivos = pd.read_parquet(diretorio / ARQUIVO_IMAGENS).set_index('imagem')['arquivo']
+            runs.append((diretorio.parent.name.removesuffix('_EVAL'), predicoes, gabarito, arquivos))
+
+        # Índice global de imagens do dataset: as reamostragens são sorteadas uma vez e compartilhadas.
+        # Só as imagens avaliadas por todos os runs entram: na união, uma imagem ausente de um run
+        # contaria como sem predições para ele, e o pareamento deixaria de comparar as mesmas amostras.
+        todos_arquivos = sorted(set.intersection(*(set(a) for _, _, _, a in runs)))
+        if not todos_arquivos:
+            self.logger.error(f"  '{dataset}': nenhuma imagem em comum entre os runs; dataset ignorado.")
+            return [], []
+        for nome_run, _, _, arquivos in runs:
+            if len(arquivos) != len(todos_arquivos):
+                self.logger.warning(f"  '{dataset}': {len(arquivos) - len(todos_arquivos)} imagens de '{nome_run}' "
+                                    f"fora da interseção dos runs excluídas ({len(todos_arquivos)} em comum).")
+        indice_global = {arquivo: i for i, arquivo in enumerate(todos_arquivos)}
+        n_imagens = len(todos_arquivos)
+        pesos = self.rng.multinomial(n_imagens, np.full(n_imagens, 1 / n_imagens), size=self.config['N_RESAMPLES'])
+        # A linha 0 (todas as imagens com peso 1) fornece a estimativa pontual no mesmo cálculo.
+        pesos = np.vstack([np.ones((1, n_imagens)), pesos])
+
+        alfa = (1 - self.config['CONFIDENCE']) / 2
+        intervalos, amostras = [], {}
+        for nome_run, predicoes, gabarito, arquivos in runs:
+            mapa = arquivos[arquivos.isin(indice_global)].map(indice_global)
+            predicoes = predicoes[predicoes['imagem'].isin(mapa.index)]
+            gabarito = gabarito[gabarito['imagem'].isin(mapa.index)]
+            predicoes = predicoes.assign(imagem=mapa.loc[predicoes['imagem']].to_numpy())
+            gabarito = gabarito.assign(imagem=mapa.loc[gabarito['imagem']].to_numpy())
+            limiar_f1 = calcular_metricas(predicoes, gabarito)['limiar_conf_f1']
+            resultado = reamostrar_metricas(predicoes, gabarito, pesos, limiar_f1,
+                                            self.config['MAX_ELEMENTS_PER_BATCH'])
+
+            linha = {"nome_run": nome_run, "dataset_nome": dataset, "imagens": n_imagens,
+                     "imagens_excluidas": len(arquivos) - n_imagens, "limiar_conf_f1": limiar_f1}
+            for metrica in METRICAS:
+                valores = resultado[metrica][1:]
+                linha[metrica] = resultado[metrica][0]
+                linha[f"{metrica}_ic_inf"] = np.nanquantile(valores, alfa)
+                linha[f"{metrica}_ic_sup"] = np.nanquantile(valores, 1 - alfa)
+                linha[f"{metrica}_desvio"] = np.nanstd(valores)
+            intervalos.append(linha)
+            amostras[nome_run] = resultado['mAP50_95'][1:]
+            self.logger.info(f"  {nome_run}: mAP50-95 {linha['mAP50_95']:.4f} "
+                             f"[{linha['mAP50_95_ic_inf']:.4f}, {linha['mAP50_95_ic_sup']:.4f}]")
+
+        vitorias = [{
+            "dataset_nome": dataset, "run_a": a, "run_b": b,
+            "prob_a_supera_b": float(np.mean(amostras[a] > amostras[b]) + 0.5 * np.mean(amostras[a] == amostras[b])),
+        } for a, b in permutations(amostras, 2)]
+
+        self.logger.info(f"Dataset '{dataset}': {len(runs)} runs x {self.config['N_RESAMPLES']} reamostragens "
+                         f"em {time.perf_counter() - inicio:.1f}s.")
+        return intervalos, vitorias
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO INTERVALOS DE CONFIANÇA BOOTSTRAP")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        armazenamentos = sorted(p.parent for p in self.eval_dir.glob(f"*_EVAL/predicoes/{ARQUIVO_METADADOS}"))
+        if not armazenamentos:
+            self.logger.warning(f"Nenhum armazenamento de predições encontrado em '{self.eval_dir}'.")
+            return
+
+        todos_intervalos, todas_vitorias = [], []
+        for dataset, diretorios in sorted(self._agrupar_por_dataset(armazenamentos).items()):
+            try:
+                intervalos, vitorias = self._avaliar_dataset(dataset, diretorios)
+                todos_intervalos.extend(intervalos)
+                todas_vitorias.extend(vitorias)
+            except Exception:
+                self.logger.exception(f"Falha no bootstrap do dataset '{dataset}'.")
+
+        if not todos_intervalos:
+            return
+        caminho_intervalos = self.reports_dir / f"intervalos_bootstrap_{self.timestamp}.csv"
+        df = pd.DataFrame(todos_intervalos)
+        df['confianca'] = self.config['CONFIDENCE']
+        df['reamostragens'] = self.config['N_RESAMPLES']
+        df.to_csv(caminho_intervalos, index=False, float_format='%.4f')
+
+        caminho_vitorias = self.reports_dir / f"probabilidades_vitoria_{self.timestamp}.csv"
+        pd.DataFrame(todas_vitorias, columns=['dataset_nome', 'run_a', 'run_b', 'prob_a_supera_b']).to_csv(
+            caminho_vitorias, index=False, float_format='%.4f')
+        self.logger.info(f"Intervalos salvos em '{caminho_intervalos}'; probabilidades de vitória em "
+                         f"'{caminho_vitorias}'.")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    IntervalosBootstrap(BOOTSTRAP_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import datetime
+from pathlib import Path
+from typing import Dict, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import pandas as pd
+    import torch
+    from ultralytics import YOLO
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv, pandas, pyarrow).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics opencv-python pandas pyarrow")
+    sys.exit(1)
+
+from config.paths import VIDEOS_DIR, INFERENCE_DIR, REPORTS_DIR
+from config.inference_params import VIDEO_INFERENCE_CONFIG
+from utils.logger_config import setup_logging
+from utils.model_cache import carregar_modelo
+from utils.run_catalog import resolver_pesos
+from utils.video_inference import GravadorDeteccoes, inferir_video, listar_videos
+
+
+class InferenciaVideo:
+    """
+    Inferência de vídeos longos (ex.: filmagens de ROV) com um 'best.pt' dos treinadores:
+    decodificação em thread dedicada, frames agrupados em lotes por passe do modelo, políticas
+    de passo e de descarte sob carga, detecções gravadas por frame em Parquet ou JSONL e um
+    relatório de FPS sustentado e latência ponta a ponta por vídeo.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.saida_dir = Path(INFERENCE_DIR)
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('VideoInferenceLogger', __file__)
+        self.resultados = []
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO INFERÊNCIA EM VÍDEO")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        pesos = resolver_pesos(self.config)
+        if pesos is None:
+            self.logger.error("Nenhum peso encontrado (WEIGHTS inexistente ou catálogo sem runs com 'best.pt').")
+            return
+        videos = listar_videos(self.config['VIDEO_SOURCES'] or [VIDEOS_DIR])
+        if not videos:
+            self.logger.warning(f"Nenhum vídeo encontrado em {self.config['VIDEO_SOURCES'] or [VIDEOS_DIR]}.")
+            return
+
+        device = self.config['DEVICE'] or ('0' if torch.cuda.is_available() else 'cpu')
+        self.logger.info(f"Pesos: '{pesos['caminho']}' | Dispositivo: {device} | {len(videos)} vídeo(s).")
+        modelo = carregar_modelo(pesos['caminho'])
+
+        for i, video in enumerate(videos):
+            self.logger.info("-" * 80)
+            self.logger.info(f"Vídeo {i + 1}/{len(videos)}: {video}")
+            gravador = GravadorDeteccoes(self.saida_dir / f"{video.stem}_{pesos['nome']}_{self.timestamp}",
+                                         self.config['OUTPUT_FORMAT'])
+            resumo = {"pesos": pesos['caminho'], "nome_pesos": pesos['nome'], "device": device}
+            try:
+                resumo.update(inferir_video(modelo, video, self.config, device, gravador))
+                resumo['status'] = 'Concluído'
+                self.logger.info(f"  {resumo['frames_processados']} frames processados "
+                                 f"({resumo['frames_descartados']} descartados) | "
+                                 f"{resumo['fps_sustentado']:.1f} FPS sustentado | latência p50 "
+                                 f"{resumo['latencia_p50_ms']:.1f} ms, p95 {resumo['latencia_p95_ms']:.1f} ms.")
+            except Exception as e:
+                resumo.update({"video": str(video), "status": f"Falha: {e}"})
+                self.logger.exception(f"Falha na inferência do vídeo '{video}'.")
+            finally:
+                gravador.fechar({**resumo, "parametros": self.config})
+            self.logger.info(f"  Detecções salvas em '{gravador.caminho}'.")
+            self.resultados.append(resumo)
+
+        caminho = self.reports_dir / f"inferencia_video_{self.timestamp}.csv"
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(self.resultados).to_csv(caminho, index=False, float_format='%.3f')
+        self.logger.info("=" * 80)
+        self.logger.info(f"Relatório de desempenho salvo em '{caminho}'.")
+
+
+def main():
+    """Ponto de entrada do script."""
+    InferenciaVideo(VIDEO_INFERENCE_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
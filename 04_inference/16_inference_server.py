@@ -0,0 +1,68 @@
+import os
+import sys
+import asyncio
+from pathlib import Path
+from typing import Dict, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import torch
+    from ultralytics import YOLO  # noqa: F401 (verifica a instalação antes de subir o servidor)
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics opencv-python")
+    sys.exit(1)
+
+from config.paths import RUNS_DIR, RUN_CATALOG_PATH
+from config.inference_params import INFERENCE_SERVER_CONFIG
+from utils.logger_config import setup_logging
+from utils.run_catalog import CatalogoRuns
+from utils.inference_server import ServidorInferencia
+
+
+def modelos_do_catalogo(config: Dict[str, Any]) -> Dict[str, str]:
+    """Nome do run -> caminho do 'best.pt', para os runs do catálogo que passam pelos filtros."""
+    catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+    catalogo.sincronizar(Path(RUNS_DIR))
+    return {r['nome_run']: r['caminho_pesos']
+            for r in catalogo.consultar(modelos=config['FILTER_MODELS'], datasets=config['FILTER_DATASETS'])}
+
+
+class ServicoInferencia:
+    """Sobe o servidor HTTP local de inferência com agrupamento dinâmico e o mantém até Ctrl+C."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = {**config, "DEVICE": config['DEVICE'] or ('0' if torch.cuda.is_available() else 'cpu')}
+        self.logger = setup_logging('InferenceServerLogger', __file__)
+
+    async def _servir(self):
+        modelos = modelos_do_catalogo(self.config)
+        if not modelos:
+            self.logger.warning("Nenhum run com 'best.pt' no catálogo. O servidor sobe sem modelos.")
+        servidor = ServidorInferencia(self.config, modelos, self.logger)
+        await servidor.iniciar()
+        self.logger.info(f"Servidor em http://{self.config['HOST']}:{servidor.porta} | {len(modelos)} modelo(s) | "
+                         f"lote máx. {self.config['MAX_BATCH_SIZE']}, espera máx. {self.config['MAX_WAIT_MS']} ms | "
+                         f"dispositivo {self.config['DEVICE']}.")
+        self.logger.info("Rotas: GET /modelos, POST /modelos/<nome_run>/detectar, GET /metricas. Ctrl+C encerra.")
+        try:
+            await servidor.servidor.serve_forever()
+        finally:
+            await servidor.fechar()
+
+    def executar(self):
+        try:
+            asyncio.run(self._servir())
+        except KeyboardInterrupt:
+            self.logger.info("Servidor encerrado.")
+
+
+def main():
+    """Ponto de entrada do script."""
+    ServicoInferencia(INFERENCE_SERVER_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
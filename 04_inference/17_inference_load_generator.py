@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import asyncio
+import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import pandas as pd
+    from ultralytics.data.utils import IMG_FORMATS
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv, pandas).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics opencv-python pandas")
+    sys.exit(1)
+
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, RUNS_DIR, RUN_CATALOG_PATH
+from config.inference_params import INFERENCE_SERVER_CONFIG, LOAD_GENERATOR_CONFIG
+from utils.logger_config import setup_logging
+from utils.run_catalog import CatalogoRuns
+from utils.inference_server import ServidorInferencia, ClienteInferencia
+from utils.latency_benchmark import resumir_latencias
+from utils.test_tensor_cache import imagens_de_teste
+
+
+class GeradorCarga:
+    """
+    Benchmark das políticas de agrupamento dinâmico do servidor de inferência: para cada política
+    (lote máximo, espera máxima) sobe um servidor local numa porta livre e, para cada nível de
+    concorrência, dispara requisições em laço fechado com imagens reais. Registra vazão, latência
+    vista pelo cliente (p50/p95/p99) e o tamanho médio dos lotes formados pelo servidor.
+    """
+
+    def __init__(self, config: Dict[str, Any], config_servidor: Dict[str, Any]):
+        self.config = config
+        self.config_servidor = {**config_servidor, "PORT": 0, "PRELOAD_MODELS": [], "DEVICE": config['DEVICE']}
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('LoadGeneratorLogger', __file__)
+        self.resultados = []
+
+    def _escolher_modelo(self):
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(Path(RUNS_DIR))
+        registros = catalogo.consultar()
+        if self.config['MODEL']:
+            registros = [r for r in registros if r['nome_run'] == self.config['MODEL']]
+        return max(registros, key=lambda r: r['data_run'] or '') if registros else None
+
+    def _carregar_imagens(self, registro) -> List[bytes]:
+        if self.config['IMAGE_SOURCES']:
+            arquivos = []
+            for fonte in map(Path, self.config['IMAGE_SOURCES']):
+                arquivos.extend(sorted(str(p) for p in fonte.rglob('*') if p.suffix[1:].lower() in IMG_FORMATS)
+                                if fonte.is_dir() else [str(fonte)])
+        else:
+            arquivos = imagens_de_teste(Path(UNZIPPED_DIR) / registro['dataset'] / 'data.yaml')
+        return [Path(a).read_bytes() for a in arquivos[:self.config['MAX_IMAGES']]]
+
+    async def _cliente(self, porta: int, rota: str, imagens: List[bytes], restantes: List[int],
+                       latencias: List[float], falhas: List[int]):
+        cliente = ClienteInferencia(self.config_servidor['HOST'], porta)
+        try:
+            while restantes[0] > 0:
+                restantes[0] -= 1
+                inicio = time.perf_counter()
+                status, _ = await cliente.requisitar('POST', rota, imagens[restantes[0] % len(imagens)])
+                if status == 200:
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                else:
+                    falhas[0] += 1
+        finally:
+            await cliente.fechar()
+
+    async def _disparar(self, porta: int, rota: str, imagens: List[bytes], concorrencia: int, total: int):
+        restantes, latencias, falhas = [total], [], [0]
+        inicio = time.perf_counter()
+        await asyncio.gather(*(self._cliente(porta, rota, imagens, restantes, latencias, falhas)
+                               for _ in range(concorrencia)))
+        return latencias, falhas[0], time.perf_counter() - inicio
+
+    async def _avaliar_politica(self, politica: Dict[str, Any], registro, imagens: List[bytes]):
+        config = {**self.config_servidor, **politica}
+        servidor = ServidorInferencia(config, {registro['nome_run']: registro['caminho_pesos']}, self.logger)
+        await servidor.iniciar()
+        rota = f"/modelos/{registro['nome_run']}/detectar"
+        try:
+            await servidor.carregar(registro['nome_run'])
+            await self._disparar(servidor.porta, rota, imagens, 1, self.config['WARMUP_REQUESTS'])
+            for concorrencia in self.config['CONCURRENCY_LEVELS']:
+                servidor.zerar_metricas()
+                latencias, falhas, duracao = await self._disparar(servidor.porta, rota, imagens, concorrencia,
+                                                                  self.config['REQUESTS_PER_LEVEL'])
+                metricas = servidor.metricas()['modelos'][registro['nome_run']]
+                resultado = {
+                    "nome_run": registro['nome_run'], "device": config['DEVICE'],
+                    "max_lote": politica['MAX_BATCH_SIZE'], "espera_max_ms": politica['MAX_WAIT_MS'],
+                    "concorrencia": concorrencia, "requisicoes": len(latencias), "falhas": falhas,
+                    "vazao_req_s": len(latencias) / duracao if duracao > 0 else float('nan'),
+                    "tamanho_medio_lote": metricas['tamanho_medio_lote'],
+                    **resumir_latencias(latencias),
+                }
+                self.resultados.append(resultado)
+                self.logger.info(f"  Lote {politica['MAX_BATCH_SIZE']:>2} / espera {politica['MAX_WAIT_MS']:>3} ms | "
+                                 f"{concorrencia:>3} cliente(s): {resultado['vazao_req_s']:.1f} req/s, "
+                                 f"p50 {resultado['latencia_p50_ms']:.1f} ms, p99 {resultado['latencia_p99_ms']:.1f} ms, "
+                                 f"lote médio {resultado['tamanho_medio_lote'] or 0:.1f}.")
+        finally:
+            await servidor.fechar()
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO BENCHMARK DE CARGA DO SERVIDOR DE INFERÊNCIA")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        registro = self._escolher_modelo()
+        if registro is None:
+            self.logger.error("Nenhum run com 'best.pt' encontrado no catálogo para o benchmark.")
+            return
+        imagens = self._carregar_imagens(registro)
+        if not imagens:
+            self.logger.error("Nenhuma imagem encontrada para enviar ao servidor.")
+            return
+        self.logger.info(f"Modelo: {registro['nome_run']} | {len(imagens)} imagem(ns) em ciclo.")
+
+        for politica in self.config['POLICIES']:
+            self.logger.info("-" * 80)
+            asyncio.run(self._avaliar_politica(politica, registro, imagens))
+
+        caminho = self.reports_dir / f"benchmark_servidor_inferencia_{self.timestamp}.csv"
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(self.resultados).to_csv(caminho, index=False, float_format='%.3f')
+        self.logger.info("=" * 80)
+        self.logger.info(f"Relatório salvo em '{caminho}'.")
+
+
+def main():
+    """Ponto de entrada do script."""
+    GeradorCarga(LOAD_GENERATOR_CONFIG, INFERENCE_SERVER_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import numpy as np
+    import torch
+    from ultralytics import YOLO
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv, pyarrow).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics opencv-python pyarrow")
+    sys.exit(1)
+
+from config.paths import INFERENCE_DIR
+from config.inference_params import DIRECTORY_INFERENCE_CONFIG
+from config.evaluation_params import SLICED_INFERENCE_CONFIG
+from utils.logger_config import setup_logging
+from utils.model_cache import carregar_modelo
+from utils.file_hashing import hash_arquivo
+from utils.run_catalog import resolver_pesos
+from utils.sliced_inference import inferir_fatiado
+from utils.bulk_inference import (percorrer_imagens, decodificar_em_paralelo, ler_checkpoint, gravar_checkpoint,
+                                  EscritorYOLO, EscritorParquet)
+
+
+class InferenciaDiretorio:
+    """
+    Inferência em lote sobre um diretório de imagens de qualquer tamanho (ex.: 100 mil fotos de
+    levantamento). Os caminhos fluem de um gerador, as imagens são decodificadas em threads com um
+    número limitado de imagens em voo e enviadas ao modelo em lotes; a memória não cresce com o
+    tamanho do diretório. A saída é um .txt no formato YOLO por imagem ou um único Parquet.
+
+    Como a ordem de percurso é determinística, o checkpoint guarda apenas o último arquivo cujas
+    detecções já estão gravadas: após uma interrupção, a execução retoma a partir dele.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = setup_logging('DirectoryInferenceLogger', __file__)
+
+    def _inferir(self, modelo, imagens: List[np.ndarray], device: str):
+        if self.config['SLICED']:
+            fatiado = {**SLICED_INFERENCE_CONFIG, "CONF_THRESHOLD": self.config['CONF_THRESHOLD'],
+                       "NMS_IOU": self.config['NMS_IOU'], "MAX_DETECTIONS": self.config['MAX_DETECTIONS']}
+            return inferir_fatiado(modelo, imagens, fatiado, device)[0]
+        saida = []
+        for resultado in modelo.predict(imagens, imgsz=self.config['IMG_SIZE'], conf=self.config['CONF_THRESHOLD'],
+                                        iou=self.config['NMS_IOU'], max_det=self.config['MAX_DETECTIONS'],
+                                        device=device, verbose=False):
+            caixas = resultado.boxes
+            saida.append((caixas.xyxy.cpu().numpy(), caixas.conf.cpu().numpy(),
+                          caixas.cls.cpu().numpy().astype(np.int64)))
+        return saida
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO INFERÊNCIA EM LOTE SOBRE DIRETÓRIO")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        entrada = Path(self.config['INPUT_DIR']) if self.config['INPUT_DIR'] else None
+        if entrada is None or not entrada.is_dir():
+            self.logger.error(f"Diretório de entrada inválido: '{self.config['INPUT_DIR']}'.")
+            return
+        pesos = resolver_pesos(self.config)
+        if pesos is None:
+            self.logger.error("Nenhum peso encontrado (WEIGHTS inexistente ou catálogo sem runs com 'best.pt').")
+            return
+
+        saida = Path(self.config['OUTPUT_DIR'] or Path(INFERENCE_DIR) / f"{entrada.name}_{pesos['nome']}")
+        saida.mkdir(parents=True, exist_ok=True)
+        hash_pesos = hash_arquivo(pesos['caminho'])
+        checkpoint = ler_checkpoint(saida) if self.config['RESUME'] else None
+        if checkpoint is not None:
+            if checkpoint['hash_pesos'] != hash_pesos or checkpoint['formato'] != self.config['OUTPUT_FORMAT']:
+                self.logger.error(f"O checkpoint em '{saida}' foi gerado com outros pesos ou formato. "
+                                  "Use outro OUTPUT_DIR ou RESUME = False.")
+                return
+            if checkpoint['concluido']:
+                self.logger.info(f"Inferência já concluída em '{saida}' ({checkpoint['processados']} imagens).")
+                return
+            self.logger.info(f"Retomando após '{checkpoint['ultimo_arquivo']}' "
+                             f"({checkpoint['processados']} imagens já processadas).")
+        checkpoint = checkpoint or {"entrada": str(entrada), "pesos": pesos['caminho'], "hash_pesos": hash_pesos,
+                                    "formato": self.config['OUTPUT_FORMAT'], "ultimo_arquivo": None,
+                                    "processados": 0, "ilegiveis": 0, "partes": 0, "concluido": False}
+
+        classe_escritor = EscritorParquet if self.config['OUTPUT_FORMAT'] == 'parquet' else EscritorYOLO
+        escritor = classe_escritor(saida, checkpoint['partes'])
+        device = self.config['DEVICE'] or ('0' if torch.cuda.is_available() else 'cpu')
+        modelo = carregar_modelo(pesos['caminho'])
+        self.logger.info(f"Pesos: '{pesos['caminho']}' | Dispositivo: {device} | Saída: '{saida}'.")
+
+        lote_tamanho = self.config['BATCH_SIZE']
+        imagens_decodificadas = decodificar_em_paralelo(
+            percorrer_imagens(entrada, checkpoint['ultimo_arquivo']), self.config['DECODE_WORKERS'],
+            lote_tamanho * self.config['PREFETCH_BATCHES'])
+
+        inicio, processados_sessao, desde_checkpoint = time.perf_counter(), 0, 0
+        lote_caminhos, lote_imagens = [], []
+
+        def processar_lote():
+            nonlocal processados_sessao, desde_checkpoint
+            for caminho, imagem, (caixas, conf, classes) in zip(
+                    lote_caminhos, lote_imagens, self._inferir(modelo, lote_imagens, device)):
+                escritor.adicionar(caminho.relative_to(entrada).as_posix(), imagem.shape[:2], caixas, conf, classes)
+            processados_sessao += len(lote_imagens)
+            desde_checkpoint += len(lote_imagens)
+
+        def salvar_checkpoint(ultimo: Path):
+            nonlocal desde_checkpoint
+            checkpoint.update(ultimo_arquivo=ultimo.relative_to(entrada).as_posix(), partes=escritor.descarregar(),
+                              processados=checkpoint['processados'] + desde_checkpoint)
+            gravar_checkpoint(saida, checkpoint)
+            desde_checkpoint = 0
+
+        ultimo = None
+        for caminho, imagem in imagens_decodificadas:
+            ultimo = caminho
+            if imagem is None:
+                checkpoint['ilegiveis'] += 1
+                self.logger.warning(f"Imagem ilegível ignorada: '{caminho}'.")
+                continue
+            lote_caminhos.append(caminho)
+            lote_imagens.append(imagem)
+            if len(lote_imagens) == lote_tamanho:
+                processar_lote()
+                lote_caminhos, lote_imagens = [], []
+                if desde_checkpoint >= self.config['CHECKPOINT_EVERY']:
+                    salvar_checkpoint(ultimo)
+                    decorrido = time.perf_counter() - inicio
+                    self.logger.info(f"  {checkpoint['processados']} imagens processadas "
+                                     f"({processados_sessao / decorrido:.1f} imagens/s nesta sessão).")
+        if lote_imagens:
+            processar_lote()
+        if ultimo is not None:
+            salvar_checkpoint(ultimo)
+
+        destino = escritor.finalizar()
+        checkpoint['concluido'] = True
+        checkpoint['concluido_em'] = datetime.datetime.now().isoformat(timespec='seconds')
+        gravar_checkpoint(saida, checkpoint)
+        decorrido = time.perf_counter() - inicio
+        self.logger.info("=" * 80)
+        self.logger.info(f"{checkpoint['processados']} imagens processadas ({checkpoint['ilegiveis']} ilegíveis); "
+                         f"{processados_sessao} nesta sessão em {decorrido:.1f}s. Detecções em '{destino}'.")
+
+
+def main(sobrescritas: Optional[Dict[str, Any]] = None):
+    """Ponto de entrada do script. 'sobrescritas' substitui chaves de DIRECTORY_INFERENCE_CONFIG."""
+    InferenciaDiretorio({**DIRECTORY_INFERENCE_CONFIG, **(sobrescritas or {})}).executar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inferência em lote sobre um diretório de imagens.")
+    parser.add_argument('entrada', nargs='?', help="Diretório de imagens (padrão: INPUT_DIR da configuração)")
+    parser.add_argument('--pesos', help="Caminho de um best.pt (padrão: run mais recente do catálogo)")
+    parser.add_argument('--saida', help="Diretório de saída (padrão: output/inference/<entrada>_<run>)")
+    parser.add_argument('--formato', choices=['yolo', 'parquet'], help="Formato das detecções")
+    parser.add_argument('--lote', type=int, help="Imagens por passe do modelo")
+    parser.add_argument('--fatiado', action='store_true', help="Usa a inferência fatiada (SLICED_INFERENCE_CONFIG)")
+    parser.add_argument('--sem-retomada', action='store_true', help="Ignora um checkpoint existente")
+    args = parser.parse_args()
+    main({chave: valor for chave, valor in {
+        "INPUT_DIR": args.entrada, "WEIGHTS": args.pesos, "OUTPUT_DIR": args.saida, "OUTPUT_FORMAT": args.formato,
+        "BATCH_SIZE": args.lote, "SLICED": args.fatiado or None, "RESUME": False if args.sem_retomada else None,
+    }.items() if valor is not None})
@@ -0,0 +1,93 @@
+import os
+import sys
+import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import pandas as pd
+    import torch
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv, pillow, pandas).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics opencv-python pillow pandas")
+    print("[INFO] Opcional, para comparar a libjpeg-turbo: pip install PyTurboJPEG")
+    sys.exit(1)
+
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, RUNS_DIR, RUN_CATALOG_PATH
+from config.inference_params import LATENCY_PROFILE_CONFIG
+from utils.logger_config import setup_logging
+from utils.model_cache import carregar_modelo
+from utils.run_catalog import CatalogoRuns, mais_recentes
+from utils.latency_profiler import PerfiladorLatencia, ETAPAS
+from utils.test_tensor_cache import imagens_de_teste
+
+
+class PerfilLatencia:
+    """
+    Perfil de latência ponta a ponta, por etapa, do run mais recente de cada (modelo, dataset), em
+    imagens JPEG reais do split de teste. Complementa o 'Latency_ms' dos treinadores (só o forward,
+    sobre um tensor) e o 'speed' do Ultralytics (sem leitura nem decodificação do arquivo).
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('LatencyProfilerLogger', __file__)
+        self.resultados = []
+
+    def _imagens_de_teste(self, nome_dataset: str) -> List[str]:
+        imagens = imagens_de_teste(Path(UNZIPPED_DIR) / nome_dataset / 'data.yaml')
+        jpegs = [i for i in imagens if Path(i).suffix.lower() in ('.jpg', '.jpeg')]
+        if not jpegs:
+            self.logger.warning(f"  Nenhum JPEG no teste de '{nome_dataset}'; usando os formatos disponíveis.")
+        return (jpegs or imagens)[:self.config['MAX_IMAGES']]
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO PERFIL DE LATÊNCIA POR ETAPA")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(Path(RUNS_DIR))
+        candidatos = mais_recentes([r for r in catalogo.consultar(modelos=self.config['FILTER_MODELS'],
+                                                                  datasets=self.config['FILTER_DATASETS'])
+                                    if r['dataset']])
+        if not candidatos:
+            self.logger.warning("Nenhum run com 'best.pt' encontrado no catálogo. Nada a perfilar.")
+            return
+        device = self.config['DEVICE'] if self.config['DEVICE'] == 'cpu' or torch.cuda.is_available() else 'cpu'
+
+        for i, registro in enumerate(candidatos):
+            self.logger.info("-" * 80)
+            self.logger.info(f"Modelo {i + 1}/{len(candidatos)}: {registro['nome_run']}")
+            try:
+                arquivos = self._imagens_de_teste(registro['dataset'])
+                perfilador = PerfiladorLatencia(carregar_modelo(registro['caminho_pesos']), self.config, device)
+                for linha in perfilador.perfilar(arquivos, self.config['WARMUP_IMAGES'], self.config['REPEATS']):
+                    self.resultados.append({"nome_run": registro['nome_run'], "modelo": registro['modelo'],
+                                            "dataset": registro['dataset'], "device": device, **linha})
+                    self.logger.info(f"  [{linha['decodificador']:>9}] total {linha['total_ms']:.1f} ms | " +
+                                     " | ".join(f"{e} {linha[f'{e}_ms']:.2f}" for e in ETAPAS))
+            except Exception:
+                self.logger.exception(f"Falha no perfil de '{registro['nome_run']}'.")
+
+        if self.resultados:
+            caminho = self.reports_dir / f"perfil_latencia_{self.timestamp}.csv"
+            self.reports_dir.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(self.resultados).to_csv(caminho, index=False, float_format='%.4f')
+            self.logger.info(f"Relatório salvo em '{caminho}'.")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    PerfilLatencia(LATENCY_PROFILE_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+try:
+    import pandas as pd
+    import psutil
+    import torch
+except ImportError:
+    print("\n[ERRO] Bibliotecas essenciais não encontradas (torch, ultralytics, opencv, psutil, pandas).")
+    print("[AÇÃO] Por favor, ative seu ambiente e instale as dependências: pip install torch ultralytics opencv-python psutil pandas")
+    sys.exit(1)
+
+from config.paths import UNZIPPED_DIR, REPORTS_DIR, RUNS_DIR, RUN_CATALOG_PATH
+from config.inference_params import MULTISTREAM_BENCHMARK_CONFIG
+from utils.logger_config import setup_logging
+from utils.run_catalog import CatalogoRuns
+from utils.multistream_benchmark import BenchmarkMultiStream, MODOS, nucleos_disponiveis, contagens_de_streams
+from utils.test_tensor_cache import imagens_de_teste
+
+
+class BenchmarkContencao:
+    """
+    Benchmark de contenção com N câmeras num único host: para cada run, modo de execução e número de
+    streams simultâneos (1 até o número de núcleos), mede a latência p99 de cada stream, a vazão
+    agregada e a utilização de CPU. Uma latência de stream único não prevê esse comportamento:
+    a partir de certo N, a vazão satura e a cauda de latência cresce.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.reports_dir = Path(REPORTS_DIR)
+        self.timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.logger = setup_logging('MultiStreamBenchmarkLogger', __file__)
+        self.resultados = []
+
+    def _escolher_runs(self) -> List[Dict[str, Any]]:
+        catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+        catalogo.sincronizar(Path(RUNS_DIR))
+        registros = [r for r in catalogo.consultar() if r['dataset']]
+        if self.config['RUNS']:
+            return [r for r in registros if r['nome_run'] in self.config['RUNS']]
+        return [max(registros, key=lambda r: r['data_run'] or '')] if registros else []
+
+    def _imagens_de_teste(self, nome_dataset: str) -> List[str]:
+        return imagens_de_teste(Path(UNZIPPED_DIR) / nome_dataset / 'data.yaml')[:self.config['MAX_IMAGES']]
+
+    def executar(self):
+        self.logger.info("=" * 80)
+        self.logger.info("INICIANDO BENCHMARK DE CONTENÇÃO MULTI-STREAM")
+        self.logger.info(f"Parâmetros: {self.config}")
+        self.logger.info("=" * 80)
+
+        modos = [m for m in self.config['MODES'] if m in MODOS]
+        if len(modos) != len(self.config['MODES']):
+            self.logger.warning(f"Modos desconhecidos ignorados. Opções: {MODOS}.")
+        nucleos = nucleos_disponiveis()
+        contagens = self.config['STREAM_COUNTS'] or contagens_de_streams(nucleos)
+        device = self.config['DEVICE'] if self.config['DEVICE'] == 'cpu' or torch.cuda.is_available() else 'cpu'
+        config = {**self.config, "DEVICE": device}
+        self.logger.info(f"Núcleos disponíveis: {nucleos} ({psutil.cpu_count(logical=False)} físicos). "
+                         f"Streams: {contagens}. Modos: {modos}.")
+
+        runs = self._escolher_runs()
+        if not runs:
+            self.logger.warning("Nenhum run com 'best.pt' encontrado no catálogo. Nada a medir.")
+            return
+
+        for registro in runs:
+            self.logger.info("-" * 80)
+            self.logger.info(f"Run: {registro['nome_run']}")
+            try:
+                benchmark = BenchmarkMultiStream(registro['caminho_pesos'],
+                                                 self._imagens_de_teste(registro['dataset']), config)
+            except Exception:
+                self.logger.exception(f"Falha ao preparar '{registro['nome_run']}'.")
+                continue
+            for modo in modos:
+                for streams in contagens:
+                    try:
+                        linha = benchmark.executar(modo, streams)
+                    except Exception:
+                        self.logger.exception(f"Falha no cenário {modo} com {streams} streams.")
+                        continue
+                    self.resultados.append({"nome_run": registro['nome_run'], "modelo": registro['modelo'],
+                                            "dataset": registro['dataset'], "device": device,
+                                            "nucleos": nucleos, **linha})
+                    self.logger.info(f"  [{modo:>18}] N={streams:<3} vazão {linha['vazao_fps']:7.1f} FPS | "
+                                     f"p99 médio {linha['p99_medio_ms']:7.1f} ms | pior stream "
+                                     f"{linha['p99_pior_stream_ms']:7.1f} ms | CPU {linha['cpu_percentual']:5.1f}%")
+
+        if self.resultados:
+            caminho = self.reports_dir / f"benchmark_multistream_{self.timestamp}.csv"
+            self.reports_dir.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(self.resultados).to_csv(caminho, index=False, float_format='%.4f')
+            self.logger.info(f"Relatório salvo em '{caminho}'.")
+        self.logger.info("=" * 80)
+
+
+def main():
+    """Ponto de entrada do script."""
+    BenchmarkContencao(MULTISTREAM_BENCHMARK_CONFIG).executar()
+
+
+if __name__ == "__main__":
+    main()
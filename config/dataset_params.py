@@ -0,0 +1,5 @@
+# Fusão de classes equivalentes entre datasets (nome normalizado -> nome canônico).
+# Usada na unificação (04_merge_datasets) e na tradução de classes da avaliação cruzada.
+CLASS_MERGE_MAP = {
+    'stingray': 'ray'
+}
@@ -0,0 +1,167 @@
+EVAL_CONFIG = {
+
+    # Avaliação paralela dos candidatos: 1 = sequencial (comportamento original).
+    # Cada candidato roda num processo próprio ('spawn'); uma falha fatal afeta apenas ele.
+    "PARALLEL_WORKERS": 1,
+
+    # Threads de CPU (torch/OpenMP) por processo avaliador; None = núcleos disponíveis / PARALLEL_WORKERS
+    "THREADS_PER_WORKER": None,
+
+    # Decodificação paralela das imagens do split 'test': workers de processo do DataLoader quando o
+    # dataset é serializável (YOLO) ou pool de threads quando não é (RTDETRDataset). Por processo avaliador.
+    "DATALOADER_WORKERS": 8,
+
+    # Parâmetros de inferência da validação no split 'test' (os mesmos padrões do 'model.val()').
+    # Fixados aqui, e não herdados dos argumentos de treino gravados em cada checkpoint, para que
+    # todos os candidatos sejam avaliados nas mesmas condições; também fazem parte da chave de cache.
+    "IMG_SIZE": 640,
+    "BATCH_SIZE": 16,
+    "CONF_THRESHOLD": 0.001,
+    "NMS_IOU": 0.7,
+    "RECT": True,
+
+    # Reutiliza resultados de avaliações anteriores com o mesmo best.pt, o mesmo split de teste
+    # e as mesmas configurações (cache em output/evaluations/cache); só modelos novos ou alterados são avaliados.
+    "USE_EVAL_CACHE": True,
+
+    # Grava as predições brutas por imagem (caixas, confiança, classe) e o gabarito em Parquet,
+    # em '<run>_EVAL/predicoes', para recálculo de métricas sem nova inferência (script 10).
+    "SAVE_PREDICTIONS": True,
+
+    # Filtros da consulta ao catálogo de runs (output/runs/catalogo_runs.sqlite); None = sem filtro.
+    # Modelos e datasets sem distinção de maiúsculas. Ex.: ["YOLOv8n", "RT-DETR-L"], ["Dataset_Unificado"],
+    # datas ISO "2025-11-01".
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+    "FILTER_SINCE": None,
+    "FILTER_UNTIL": None,
+
+    # Perfil de custo estático de cada candidato (parâmetros, GFLOPs, tamanho dos pesos, pico de RSS
+    # e memória de ativações), em cache por hash dos pesos (output/evaluations/cache_custo)
+    "STATIC_COST_PROFILE": True,
+    "COST_PROFILE_IMG_SIZE": 640,
+}
+
+RECOMPUTE_CONFIG = {
+
+    # Limiares de IoU do recálculo; None = COCO (0.50:0.05:0.95), o mesmo do Ultralytics
+    "IOU_THRESHOLDS": None,
+    # Confiança mínima aplicada às predições armazenadas (0.0 = todas, como no 'model.val()')
+    "CONF_THRESHOLD": 0.0,
+    # Diferença máxima aceita entre o mAP50-95 recalculado e o do Ultralytics (só com os padrões acima)
+    "TOLERANCE": 0.005,
+}
+
+THRESHOLD_SWEEP_CONFIG = {
+
+    # Grade de limiares de confiança varrida (início, fim, passo)
+    "CONF_GRID": (0.0, 1.0, 0.005),
+    # IoU para considerar uma predição verdadeiro positivo
+    "IOU_THRESHOLD": 0.5,
+    # Recall mínimo exigido na implantação; reporta o limiar mais alto que ainda o atinge
+    "RECALL_FLOOR": 0.8,
+}
+
+BOOTSTRAP_CONFIG = {
+
+    # Reamostragens bootstrap das imagens de teste (com reposição), comuns a todos os modelos do dataset
+    "N_RESAMPLES": 2000,
+    # Nível de confiança dos intervalos percentis
+    "CONFIDENCE": 0.95,
+    # Semente do gerador, para intervalos reprodutíveis
+    "SEED": 0,
+    # Limite de elementos por bloco de reamostragens processado de uma vez (controla o uso de memória)
+    "MAX_ELEMENTS_PER_BATCH": 4_000_000,
+}
+
+TEST_TENSOR_CACHE_CONFIG = {
+
+    # Cache compartilhado das imagens de teste já decodificadas e redimensionadas (output/cache/test_tensors),
+    # um por (split, imgsz, tipo de dataset); todos os modelos avaliados leem do mesmo cache via memória mapeada.
+    "ENABLED": True,
+    # Orçamento de disco; ao exceder, os caches usados há mais tempo são removidos
+    "MAX_SIZE_GB": 20,
+    # Threads de decodificação na construção do cache
+    "BUILD_THREADS": 8,
+    # Imagens reais do cache usadas no harness de latência (em vez de um tensor aleatório)
+    "LATENCY_SAMPLES": 16,
+}
+
+MODEL_CACHE_CONFIG = {
+
+    # Cache de modelos do processo (utils/model_cache.py): cada 'best.pt'/modelo base é desserializado
+    # uma vez e reutilizado por verificação de ambiente, treino, latência, avaliação e inferência.
+    "ENABLED": True,
+    # Orçamento de memória dos modelos em cache; ao exceder, os usados há mais tempo são descartados
+    "MAX_MEMORY_GB": 4,
+}
+
+EDGE_PROFILE_CONFIG = {
+
+    # Perfis de hardware embarcado emulados no harness de latência (nomes em PROFILES); vazio = nenhum.
+    # Cada perfil mede a latência num subprocesso limitado e gera a coluna 'Latency_ms_<perfil>'.
+    "ENABLED_PROFILES": ["raspberry_pi_4", "jetson_nano_cpu"],
+
+    # THREADS: threads de inferência; CORES: núcleos aos quais o processo é fixado (os primeiros
+    # disponíveis); CPU_QUOTA: cota de CPU em núcleos via cgroup (systemd-run), None = sem cota.
+    # A cota aproxima núcleos mais lentos que os da estação: é uma triagem, não uma medição no alvo.
+    "PROFILES": {
+        "raspberry_pi_4": {"THREADS": 4, "CORES": 4, "CPU_QUOTA": 1.2},
+        "raspberry_pi_3": {"THREADS": 4, "CORES": 4, "CPU_QUOTA": 0.6},
+        "jetson_nano_cpu": {"THREADS": 4, "CORES": 4, "CPU_QUOTA": 1.6},
+        "single_core": {"THREADS": 1, "CORES": 1, "CPU_QUOTA": None},
+    },
+
+    # Execuções por perfil (menos que no harness completo: cada uma pode levar segundos sob cota)
+    "WARMUPS": 3,
+    "RUNS": 20,
+    "TIMEOUT_S": 900,
+}
+
+CROSS_DATASET_CONFIG = {
+
+    # Datasets (em data/dataset_descompactado) cujos splits de teste formam as colunas da matriz; None = todos
+    "TEST_DATASETS": None,
+    # Filtros do catálogo de runs para as linhas da matriz; None = sem filtro
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+    # Apenas o run mais recente de cada (modelo, dataset de treino)
+    "LATEST_RUN_ONLY": True,
+    # Parâmetros de inferência (os mesmos padrões do 'model.val()')
+    "IMG_SIZE": 640,
+    "BATCH_SIZE": 16,
+    "CONF_THRESHOLD": 0.001,
+    "NMS_IOU": 0.7,
+}
+
+SLICED_INFERENCE_CONFIG = {
+
+    # Tiles quadrados recortados da imagem original, inferidos na resolução nativa (imgsz = TILE_SIZE)
+    "TILE_SIZE": 640,
+    # Fração de sobreposição entre tiles vizinhos
+    "OVERLAP": 0.2,
+    # Tiles (de várias imagens) enviados ao modelo por passe
+    "TILES_PER_BATCH": 32,
+    # Imagens cujos tiles são agrupados antes da inferência
+    "IMAGES_PER_GROUP": 8,
+    # Também infere a imagem inteira (letterbox em FULL_IMAGE_SIZE), para os objetos grandes
+    "INCLUDE_FULL_IMAGE": True,
+    "FULL_IMAGE_SIZE": 640,
+    # Fusão das detecções por classe: 'nms' ou 'wbf' (Weighted Boxes Fusion)
+    "MERGE_METHOD": "nms",
+    "MERGE_IOU": 0.5,
+    "CONF_THRESHOLD": 0.001,
+    "NMS_IOU": 0.7,
+    "MAX_DETECTIONS": 300,
+
+    # --- Avaliação (14_sliced_inference_evaluation.py) ---
+    # Objetos "pequenos" (definição COCO): área do gabarito na imagem original abaixo de SMALL_OBJECT_AREA px²
+    "SMALL_OBJECT_AREA": 32 ** 2,
+    # Ganho mínimo de mAP50-95 em objetos pequenos para recomendar o fatiamento ao modelo
+    "MIN_SMALL_GAIN": 0.01,
+    # Filtros do catálogo de runs; None = sem filtro
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+    # Limite de imagens de teste por dataset (None = todas), para estimativas rápidas
+    "MAX_IMAGES": None,
+}
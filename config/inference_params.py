@@ -0,0 +1,176 @@
+VIDEO_INFERENCE_CONFIG = {
+
+    # Vídeos a processar (arquivos ou diretórios); vazio = todos os vídeos em data/videos
+    "VIDEO_SOURCES": [],
+
+    # Pesos do detector (qualquer 'best.pt' dos treinadores). None = run mais recente do catálogo
+    # de runs que passe pelos filtros abaixo (None = sem filtro).
+    "WEIGHTS": None,
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+
+    # Dispositivo de inferência: None = GPU 0 se disponível, senão CPU
+    "DEVICE": None,
+
+    "IMG_SIZE": 640,
+    "CONF_THRESHOLD": 0.25,
+    "NMS_IOU": 0.7,
+    "MAX_DETECTIONS": 300,
+
+    # Frames por passe do modelo e espera máxima (ms) para completar um lote depois do primeiro frame
+    "BATCH_SIZE": 8,
+    "BATCH_TIMEOUT_MS": 20,
+    # Lotes de aquecimento antes da medição
+    "WARMUP_BATCHES": 2,
+
+    # Processa um a cada FRAME_STRIDE frames (os demais são pulados sem decodificação)
+    "FRAME_STRIDE": 1,
+    # Comportamento sob carga: 'block' = processa todos os frames do passo (offline);
+    # 'drop_oldest' = leitura no ritmo do vídeo, descartando os frames mais antigos da fila (ao vivo)
+    "LOAD_POLICY": "block",
+    # Frames decodificados aguardando inferência
+    "QUEUE_SIZE": 32,
+
+    # Formato das detecções: 'parquet' (uma linha por detecção) ou 'jsonl' (um registro por frame)
+    "OUTPUT_FORMAT": "parquet",
+}
+
+INFERENCE_SERVER_CONFIG = {
+
+    # Apenas endereços de loopback são aceitos (servidor local)
+    "HOST": "127.0.0.1",
+    "PORT": 8765,
+
+    # Modelos servidos: runs do catálogo com 'best.pt' que passam pelos filtros (None = todos),
+    # identificados pelo nome do run. PRELOAD_MODELS são carregados na partida; os demais, no primeiro uso.
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+    "PRELOAD_MODELS": [],
+
+    # Agrupamento dinâmico: um lote é enviado ao modelo com MAX_BATCH_SIZE imagens ou MAX_WAIT_MS
+    # após a chegada da primeira, o que vier antes
+    "MAX_BATCH_SIZE": 8,
+    "MAX_WAIT_MS": 10,
+
+    # Dispositivo de inferência: None = GPU 0 se disponível, senão CPU
+    "DEVICE": None,
+    "IMG_SIZE": 640,
+    "CONF_THRESHOLD": 0.25,
+    "NMS_IOU": 0.7,
+    "MAX_DETECTIONS": 300,
+
+    "MAX_BODY_MB": 32,
+    # Últimas requisições consideradas nos percentis de latência de /metricas
+    "LATENCY_WINDOW": 1000,
+}
+
+LOAD_GENERATOR_CONFIG = {
+
+    # Modelo (nome do run no catálogo); None = run mais recente do catálogo
+    "MODEL": None,
+    # Imagens enviadas em ciclo (arquivos ou diretórios); vazio = split de teste do dataset do modelo
+    "IMAGE_SOURCES": [],
+    "MAX_IMAGES": 64,
+
+    # Políticas de agrupamento comparadas; cada uma sobe um servidor próprio numa porta livre,
+    # com os demais parâmetros de INFERENCE_SERVER_CONFIG
+    "POLICIES": [
+        {"MAX_BATCH_SIZE": 1, "MAX_WAIT_MS": 0},
+        {"MAX_BATCH_SIZE": 4, "MAX_WAIT_MS": 5},
+        {"MAX_BATCH_SIZE": 8, "MAX_WAIT_MS": 10},
+        {"MAX_BATCH_SIZE": 16, "MAX_WAIT_MS": 25},
+    ],
+    # Clientes simultâneos (cada um com uma conexão persistente, enviando em laço fechado)
+    "CONCURRENCY_LEVELS": [1, 4, 16],
+    "REQUESTS_PER_LEVEL": 200,
+    "WARMUP_REQUESTS": 8,
+
+    # O benchmark de políticas é feito na CPU por padrão
+    "DEVICE": "cpu",
+}
+
+DIRECTORY_INFERENCE_CONFIG = {
+
+    # Diretório de imagens (percorrido recursivamente); também aceito como argumento do script
+    "INPUT_DIR": None,
+    # Saída: None = output/inference/<nome do diretório>_<nome do run>
+    "OUTPUT_DIR": None,
+    # 'yolo' = um .txt por imagem ('classe xc yc w h conf', normalizado); 'parquet' = um único arquivo
+    "OUTPUT_FORMAT": "parquet",
+
+    # Pesos (qualquer 'best.pt'); None = run mais recente do catálogo que passe pelos filtros
+    "WEIGHTS": None,
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+
+    # Dispositivo de inferência: None = GPU 0 se disponível, senão CPU
+    "DEVICE": None,
+    "IMG_SIZE": 640,
+    "CONF_THRESHOLD": 0.25,
+    "NMS_IOU": 0.7,
+    "MAX_DETECTIONS": 300,
+    # Inferência fatiada em tiles (parâmetros de SLICED_INFERENCE_CONFIG), para objetos pequenos
+    "SLICED": False,
+
+    "BATCH_SIZE": 16,
+    # Threads de decodificação e lotes decodificados à frente da inferência (limitam a memória)
+    "DECODE_WORKERS": 8,
+    "PREFETCH_BATCHES": 2,
+
+    # Retoma do checkpoint de uma execução interrompida; gravado a cada CHECKPOINT_EVERY imagens
+    "RESUME": True,
+    "CHECKPOINT_EVERY": 2000,
+}
+
+LATENCY_PROFILE_CONFIG = {
+
+    # Modelos perfilados: run mais recente de cada (modelo, dataset) do catálogo; None = sem filtro
+    "FILTER_MODELS": None,
+    "FILTER_DATASETS": None,
+
+    # Perfil voltado a implantação em CPU; "0" para a GPU
+    "DEVICE": "cpu",
+    "IMG_SIZE": 640,
+    "CONF_THRESHOLD": 0.25,
+    "NMS_IOU": 0.7,
+    "MAX_DETECTIONS": 300,
+
+    # Imagens JPEG reais do split de teste do dataset de cada modelo
+    "MAX_IMAGES": 50,
+    "WARMUP_IMAGES": 5,
+    # Passagens completas sobre as imagens (a média de cada etapa usa todas)
+    "REPEATS": 2,
+}
+
+MULTISTREAM_BENCHMARK_CONFIG = {
+
+    # Runs medidos (nomes no catálogo); vazio = run mais recente do catálogo
+    "RUNS": [],
+
+    # Benchmark de implantação em CPU; "0" para a GPU
+    "DEVICE": "cpu",
+    "IMG_SIZE": 640,
+    "CONF_THRESHOLD": 0.25,
+    "NMS_IOU": 0.7,
+    "MAX_DETECTIONS": 300,
+
+    # Imagens reais do split de teste do dataset de cada run, decodificadas antes da medição
+    "MAX_IMAGES": 32,
+
+    # 'threads_shared' = threads sobre uma única instância da rede; 'threads_per_worker' = uma cópia
+    # da rede por thread; 'processes' = um processo por stream, com modelo próprio
+    "MODES": ["threads_shared", "threads_per_worker", "processes"],
+    # Streams simultâneos; None = 1, 2, 4, ... até o número de núcleos
+    "STREAM_COUNTS": None,
+    # Threads de cada stream; None = núcleos / streams
+    "THREADS_PER_WORKER": None,
+
+    # Quadros por segundo de cada câmera; None = laço fechado (vazão máxima). Com FPS definido, um
+    # stream atrasado descarta os quadros intermediários e a latência conta desde a chegada do quadro
+    "STREAM_FPS": None,
+    # Duração da medição de cada cenário e quadros de aquecimento de cada stream antes dela
+    "DURATION_S": 10,
+    "WARMUP_FRAMES": 3,
+    # Espera máxima pela carga dos modelos nos processos
+    "STARTUP_TIMEOUT_S": 300,
+}
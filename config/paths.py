@@ -9,6 +9,8 @@ DOWNLOADS_DIR = os.path.join(DATA_DIR, "downloads")
 
 UNZIPPED_DIR = os.path.join(DATA_DIR, "dataset_descompactado")
 
+VIDEOS_DIR = os.path.join(DATA_DIR, "videos")
+
 YAML_REPO_DIR = os.path.join(ROOT_DIR, 'yamlRepositorio')
 
 OUTPUT_DIR = os.path.join(ROOT_DIR, "output")
@@ -17,10 +19,18 @@ LOGS_DIR = os.path.join(OUTPUT_DIR, 'logs')
 
 RUNS_DIR = os.path.join(OUTPUT_DIR, 'runs', 'detect')
 
+STAGES_DIR = os.path.join(OUTPUT_DIR, 'runs', 'stages')
+
 REPORTS_DIR = os.path.join(OUTPUT_DIR, 'reports')
 
 EVAL_DIR = os.path.join(OUTPUT_DIR, 'evaluations')
 
+CACHE_DIR = os.path.join(OUTPUT_DIR, 'cache')
+
+INFERENCE_DIR = os.path.join(OUTPUT_DIR, 'inference')
+
+RUN_CATALOG_PATH = os.path.join(OUTPUT_DIR, 'runs', 'catalogo_runs.sqlite')
+
 def create_project_structure():
     """
     Garante que toda a estrutura de diretórios necessária para o projeto exista.
@@ -31,8 +41,11 @@ def create_project_structure():
     os.makedirs(UNZIPPED_DIR, exist_ok=True)
     os.makedirs(LOGS_DIR, exist_ok=True)
     os.makedirs(RUNS_DIR, exist_ok=True)
+    os.makedirs(STAGES_DIR, exist_ok=True)
     os.makedirs(REPORTS_DIR, exist_ok=True)
                                    
-    os.makedirs(EVAL_DIR, exist_ok=True)                                       
+    os.makedirs(EVAL_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    os.makedirs(INFERENCE_DIR, exist_ok=True)                                       
                                 
     print("Estrutura de diretórios pronta.")
\ No newline at end of file
@@ -22,11 +22,42 @@ YOLO_CONFIG = {
         {'modelo': 'YOLOv11n', 'base_model': 'yolo11n.pt'},
         {'modelo': 'YOLOv11l', 'base_model': 'yolo11l.pt'},
        {'modelo': 'YOLOv11l', 'base_model': 'yolo11l.pt'},
+        # Exemplo de job com resolução progressiva (comparado ao job de tamanho fixo equivalente):
+        # {'modelo': 'YOLOv8n', 'base_model': 'yolov8n.pt', 'progressive_resize': True},
+        # Exemplo de job com backbone congelado e cache de características:
+        # {'modelo': 'YOLOv8l', 'base_model': 'yolov8l.pt', 'frozen_backbone': True},
+        # Exemplo de destilação: aluno pequeno supervisionado pelo YOLOv8l treinado antes no mesmo dataset
+        # {'modelo': 'YOLOv8n', 'base_model': 'yolov8n.pt', 'teacher': 'YOLOv8l'},
 
     ],
 
     "LATENCY_WARMUPS": 10,
     "LATENCY_RUNS": 100,
+
+    # Interrupção antecipada por extrapolação da curva de aprendizado (mAP50-95 por época)
+    "EARLY_TERMINATION_ENABLED": True,
+    "EARLY_TERMINATION_MIN_EPOCHS": 15,
+    "EARLY_TERMINATION_FRACTION": 0.8,
+
+    # Agenda de validação durante o treino: 'full' (toda época), 'subset' ou 'interval'
+    "VAL_SCHEDULE_MODE": "full",
+    "VAL_SUBSET_FRACTION": 0.2,
+    "VAL_SUBSET_SEED": 42,
+    "VAL_INTERVAL_EPOCHS": 5,
+    "VAL_FULL_LAST_EPOCHS": 10,
+
+    # Agenda de resolução progressiva (imgsz, fração das épocas), usada nos jobs com 'progressive_resize': True
+    "PROGRESSIVE_RESIZE_SCHEDULE": [(320, 0.25), (480, 0.25), (640, 0.5)],
+
+    # Backbone congelado com cache de características (jobs com 'frozen_backbone': True):
+    # NUM_EPOCHS - FROZEN_BACKBONE_FINETUNE_EPOCHS épocas só de pescoço/cabeça, depois ajuste fino completo (0 = nenhum)
+    "FROZEN_BACKBONE_FINETUNE_EPOCHS": 5,
+    "FROZEN_BACKBONE_LR": 0.001,
+
+    # Destilação (jobs com 'teacher'): predições do professor acima da confiança viram pseudo-rótulos
+    # quando não coincidem (IoU >= DISTILLATION_IOU_MATCH, mesma classe) com uma anotação original
+    "DISTILLATION_CONF_THRESHOLD": 0.5,
+    "DISTILLATION_IOU_MATCH": 0.5,
 }
 
 RTDETR_CONFIG = {
@@ -46,4 +77,48 @@ RTDETR_CONFIG = {
 
     "LATENCY_WARMUPS": 10,
     "LATENCY_RUNS": 100,
-}
\ No newline at end of file
+
+    # Interrupção antecipada por extrapolação da curva de aprendizado (mAP50-95 por época)
+    "EARLY_TERMINATION_ENABLED": True,
+    "EARLY_TERMINATION_MIN_EPOCHS": 15,
+    "EARLY_TERMINATION_FRACTION": 0.8,
+
+    # Agenda de validação durante o treino: 'full' (toda época), 'subset' ou 'interval'
+    "VAL_SCHEDULE_MODE": "full",
+    "VAL_SUBSET_FRACTION": 0.2,
+    "VAL_SUBSET_SEED": 42,
+    "VAL_INTERVAL_EPOCHS": 5,
+    "VAL_FULL_LAST_EPOCHS": 10,
+
+    # Agenda de resolução progressiva (imgsz, fração das épocas), usada nos jobs com 'progressive_resize': True
+    "PROGRESSIVE_RESIZE_SCHEDULE": [(320, 0.25), (480, 0.25), (640, 0.5)],
+
+    # Backbone congelado com cache de características (jobs com 'frozen_backbone': True):
+    # NUM_EPOCHS - FROZEN_BACKBONE_FINETUNE_EPOCHS épocas só de pescoço/cabeça, depois ajuste fino completo (0 = nenhum)
+    "FROZEN_BACKBONE_FINETUNE_EPOCHS": 5,
+    "FROZEN_BACKBONE_LR": 0.001,
+}
+
+PRUNING_CONFIG = {
+
+    "IMG_SIZE": 640,
+    "BATCH_SIZE": 16,
+    "OPTIMIZER": "Adam",
+    "FINETUNE_EPOCHS": 10,
+    "FINETUNE_LR0": 0.0005,
+
+    # Modelos (prefixo do nome do run) a podar; vazio = nenhum, o que mantém a etapa inofensiva no pipeline completo.
+    # Para cada (modelo, dataset) é usado o run mais recente. Ex.: ['YOLOv8l', 'YOLOv11l']
+    "MODELS_TO_PRUNE": [],
+
+    # Alvo de latência: valor absoluto em ms ou, se None, fração da latência do modelo original
+    "TARGET_LATENCY_MS": None,
+    "TARGET_LATENCY_FRACTION": 0.7,
+
+    # Busca da razão de poda de canais: incrementos de RATIO_STEP até MAX_RATIO
+    "RATIO_STEP": 0.1,
+    "MAX_RATIO": 0.6,
+
+    "LATENCY_WARMUPS": 10,
+    "LATENCY_RUNS": 100,
+}
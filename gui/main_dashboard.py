@@ -23,10 +23,24 @@ PIPELINE_SCRIPTS = {
     "Módulo 2: Treinamento": [
         "02_model_training/05_train_yolo_models.py",
         "02_model_training/06_train_rtdetr_models.py",
+        "02_model_training/09_prune_trained_models.py",
         "02_model_training/07_evaluate_models_on_test_set.py",
+        "02_model_training/13_cross_dataset_evaluation.py",
+        "02_model_training/14_sliced_inference_evaluation.py",
     ],
     "Módulo 3: Avaliação Final": [
         "03_results_analysis/08_streamlit_results_viewer.py",
+        "03_results_analysis/10_recompute_metrics_from_predictions.py",
+        "03_results_analysis/11_confidence_threshold_sweep.py",
+        "03_results_analysis/12_bootstrap_confidence_intervals.py",
+    ],
+    "Módulo 4: Inferência": [
+        "04_inference/15_video_inference.py",
+        "04_inference/16_inference_server.py",
+        "04_inference/17_inference_load_generator.py",
+        "04_inference/18_directory_inference.py",
+        "04_inference/19_latency_profiler.py",
+        "04_inference/20_multistream_benchmark.py",
     ]
 }
 
@@ -70,7 +84,7 @@ class MainDashboard(tk.Tk):
             for script_path in scripts:
                                            
                 status = 'Pendente'
-                if module == "Módulo 3: Avaliação Final":
+                if script_path.endswith("08_streamlit_results_viewer.py"):
                     status = 'Visualizar'                     
                 self.scripts_tree.insert(module_id, 'end', text=script_path, values=(status,))
         self.scripts_tree.pack(fill=tk.BOTH, expand=True)
@@ -151,12 +165,12 @@ class MainDashboard(tk.Tk):
             messagebox.showerror("Erro ao Copiar", f"Não foi possível copiar o conteúdo:\n{e}")
 
     def get_all_script_ids(self):
-        """Pega todos os IDs de scripts, exceto os do Módulo 3."""
+        """Pega todos os IDs de scripts dos Módulos 1 e 2."""
         script_ids = []
         for module_id in self.scripts_tree.get_children():
             module_text = self.scripts_tree.item(module_id, 'text')
                                                                     
-            if module_text == "Módulo 3: Avaliação Final":
+            if module_text in ("Módulo 3: Avaliação Final", "Módulo 4: Inferência"):
                 continue
             script_ids.extend(self.scripts_tree.get_children(module_id))
         return script_ids
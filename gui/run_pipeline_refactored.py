@@ -30,6 +30,20 @@ try:
     train_yolo_main = importlib.import_module("02_model_training.05_train_yolo_models").main
     train_rtdetr_main = importlib.import_module("02_model_training.06_train_rtdetr_models").main
     evaluate_main = importlib.import_module("02_model_training.07_evaluate_models_on_test_set").main
+    prune_main = importlib.import_module("02_model_training.09_prune_trained_models").main
+    cross_dataset_main = importlib.import_module("02_model_training.13_cross_dataset_evaluation").main
+    sliced_inference_main = importlib.import_module("02_model_training.14_sliced_inference_evaluation").main
+
+    recompute_metrics_main = importlib.import_module("03_results_analysis.10_recompute_metrics_from_predictions").main
+    threshold_sweep_main = importlib.import_module("03_results_analysis.11_confidence_threshold_sweep").main
+    bootstrap_main = importlib.import_module("03_results_analysis.12_bootstrap_confidence_intervals").main
+
+    video_inference_main = importlib.import_module("04_inference.15_video_inference").main
+    inference_server_main = importlib.import_module("04_inference.16_inference_server").main
+    load_generator_main = importlib.import_module("04_inference.17_inference_load_generator").main
+    directory_inference_main = importlib.import_module("04_inference.18_directory_inference").main
+    latency_profiler_main = importlib.import_module("04_inference.19_latency_profiler").main
+    multistream_benchmark_main = importlib.import_module("04_inference.20_multistream_benchmark").main
 
 except ImportError as e:
     print(
@@ -45,11 +59,23 @@ MENU_SCRIPTS = {
     "21": ("(M2) Treinar Modelos YOLO", train_yolo_main),
     "22": ("(M2) Treinar Modelos RT-DETR", train_rtdetr_main),
     "23": ("(M2) Avaliar Modelos no Test Set", evaluate_main),
+    "24": ("(M2) Podar Modelos Treinados (alvo de latência)", prune_main),
+    "25": ("(M2) Avaliação Cruzada entre Datasets", cross_dataset_main),
+    "26": ("(M2) Avaliação com Inferência Fatiada", sliced_inference_main),
+    "32": ("(M3) Recalcular Métricas das Predições Armazenadas", recompute_metrics_main),
+    "33": ("(M3) Varredura de Limiares de Confiança", threshold_sweep_main),
+    "34": ("(M3) Intervalos de Confiança Bootstrap", bootstrap_main),
+    "41": ("(M4) Inferência em Vídeo", video_inference_main),
+    "42": ("(M4) Servidor Local de Inferência", inference_server_main),
+    "43": ("(M4) Benchmark de Carga do Servidor", load_generator_main),
+    "44": ("(M4) Inferência em Lote sobre Diretório", directory_inference_main),
+    "45": ("(M4) Perfil de Latência por Etapa", latency_profiler_main),
+    "46": ("(M4) Benchmark de Contenção Multi-Stream", multistream_benchmark_main),
 }
 
 PIPELINE_COMPLETO = [
     download_main, sync_yamls_main, reduce_datasets_main, merge_datasets_main,
-    train_yolo_main, train_rtdetr_main, evaluate_main
+    train_yolo_main, train_rtdetr_main, prune_main, evaluate_main
 ]
 
 def clear_screen():
@@ -106,9 +132,23 @@ def run_menu():
         print("  [21] 05_train_yolo_models.py")
         print("  [22] 06_train_rtdetr_models.py")
         print("  [23] 07_evaluate_models_on_test_set.py")
+        print("  [24] 09_prune_trained_models.py (Opcional, modelos em PRUNING_CONFIG)")
+        print("  [25] 13_cross_dataset_evaluation.py (Opcional, matriz modelo x dataset)")
+        print("  [26] 14_sliced_inference_evaluation.py (Opcional, tiles para objetos pequenos)")
 
         print("\n--- Módulo 3: Análise de Resultados ---")
         print("  [31] Lançar Visualizador Streamlit")
+        print("  [32] 10_recompute_metrics_from_predictions.py")
+        print("  [33] 11_confidence_threshold_sweep.py")
+        print("  [34] 12_bootstrap_confidence_intervals.py")
+
+        print("\n--- Módulo 4: Inferência ---")
+        print("  [41] 15_video_inference.py (vídeos em data/videos ou VIDEO_SOURCES)")
+        print("  [42] 16_inference_server.py (HTTP local, Ctrl+C encerra)")
+        print("  [43] 17_inference_load_generator.py (políticas de agrupamento na CPU)")
+        print("  [44] 18_directory_inference.py (INPUT_DIR em DIRECTORY_INFERENCE_CONFIG)")
+        print("  [45] 19_latency_profiler.py (leitura, decodificação, ..., NMS por modelo)")
+        print("  [46] 20_multistream_benchmark.py (N streams simultâneos: threads x processos)")
 
         print("\n  [Q] Sair")
         print("================================================================")
@@ -179,6 +219,7 @@ def run_with_flags(args, logger):
             logger.info("\n>>> EXECUTANDO MÓDULO 2: TREINAMENTO DE MODELOS <<<\n")
             train_yolo_main()
             train_rtdetr_main()
+            prune_main()
         else:
             logger.warning("MÓDULO 2: Treinamento de modelos pulado conforme solicitado (--skip-training).")
 
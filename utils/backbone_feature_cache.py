@@ -0,0 +1,280 @@
+import json
+import hashlib
+import logging
+import time
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+import torch
+from ultralytics import __version__ as ultralytics_version
+from ultralytics.cfg import get_cfg
+from ultralytics.data import build_dataloader, build_yolo_dataset
+from ultralytics.data.utils import check_det_dataset, img2label_paths
+from ultralytics.models.rtdetr.val import RTDETRDataset
+from ultralytics.nn.tasks import DetectionModel, RTDETRDetectionModel
+from ultralytics.utils import DEFAULT_CFG
+
+from utils.file_hashing import assinatura_arquivos, hash_arquivo
+from utils.model_cache import carregar_modelo_para_treino
+from utils.test_tensor_cache import listar_imagens
+
+
+def _indices_origem(camada, indice: int) -> List[int]:
+    """Converte o campo 'f' de uma camada em índices absolutos (-1 = saída da camada anterior)."""
+    origens = camada.f if isinstance(camada.f, list) else [camada.f]
+    return [indice - 1 if j == -1 else (j if j >= 0 else indice + j) for j in origens]
+
+
+class TreinadorCabecaComCache:
+    """
+    Treino com backbone congelado: o backbone pré-treinado (COCO) roda uma única vez por
+    imagem sem aumento de dados, os mapas de características multiescala consumidos pelo
+    pescoço/cabeça são gravados em disco como arrays memory-mapped, e somente pescoço e
+    cabeça são treinados a partir desse cache.
+    """
+
+    def __init__(self, base_model: str, data_config: str, imgsz: int, batch: int, device: str,
+                 cache_dir: Path, logger: logging.Logger):
+        self.base_model = base_model
+        self.imgsz = imgsz
+        self.batch = batch
+        self.device = torch.device('cuda:0' if device.isdigit() else device)
+        self.logger = logger
+
+        self.args = get_cfg(DEFAULT_CFG, {'imgsz': imgsz, 'batch': batch, 'data': data_config})
+        self.data = check_det_dataset(data_config)
+
+        pretreinado = carregar_modelo_para_treino(base_model).model
+        self.rtdetr = isinstance(pretreinado, RTDETRDetectionModel)
+        classe_modelo = RTDETRDetectionModel if self.rtdetr else DetectionModel
+        self.modelo = classe_modelo(deepcopy(pretreinado.yaml), nc=self.data['nc'], verbose=False)
+        self.modelo.load(pretreinado)
+        self.modelo.names = self.data['names']
+        self.modelo.args = self.args
+        self.modelo.to(self.device)
+
+        self.n_backbone = len(self.modelo.yaml['backbone'])
+        camadas = list(self.modelo.model)
+        self.camadas_cacheadas = sorted({self.n_backbone - 1} | {
+            j for i in range(self.n_backbone, len(camadas))
+            for j in _indices_origem(camadas[i], i) if j < self.n_backbone})
+
+        self.assinatura = self._assinatura(base_model)
+        nome_cache = f"{Path(data_config).parent.name}_{Path(base_model).stem}_{imgsz}px_{self.assinatura[:16]}"
+        self.cache_dir = Path(cache_dir) / 'backbone_features' / nome_cache
+
+    def _assinatura(self, base_model: str) -> str:
+        """
+        Assinatura das imagens e rótulos do split de treino e dos pesos base: um split reduzido, mesclado
+        ou reanotado, ou pesos base diferentes, geram outro cache em vez de reutilizar um obsoleto.
+        """
+        imagens = listar_imagens(self.data['train'])
+        rotulos = [r for r in img2label_paths(imagens) if Path(r).is_file()]
+        pesos = hash_arquivo(base_model) if Path(base_model).is_file() else base_model
+        return hashlib.sha256(f"{assinatura_arquivos(imagens)}|{assinatura_arquivos(rotulos)}|{pesos}".encode(
+            'utf-8')).hexdigest()
+
+    def _construir_loader(self):
+        stride = max(int(self.modelo.stride.max()), 32)
+        if self.rtdetr:
+            dataset = RTDETRDataset(img_path=self.data['train'], imgsz=self.imgsz, batch_size=self.batch,
+                                    augment=False, hyp=self.args, rect=False, cache=None, data=self.data)
+        else:
+            dataset = build_yolo_dataset(self.args, self.data['train'], self.batch, self.data,
+                                         mode='val', rect=False, stride=stride)
+        return build_dataloader(dataset, self.batch, workers=0, shuffle=False, rank=-1)
+
+    def _forward_backbone(self, img: torch.Tensor) -> Dict[int, torch.Tensor]:
+        saidas, x = {}, img
+        for i, camada in enumerate(self.modelo.model[:self.n_backbone]):
+            if camada.f != -1:
+                x = [x if j == -1 else saidas[j] for j in camada.f] if isinstance(camada.f, list) else saidas[camada.f]
+            x = camada(x)
+            saidas[i] = x
+        return {j: saidas[j] for j in self.camadas_cacheadas}
+
+    def _forward_cabeca(self, caracteristicas: Dict[int, torch.Tensor], alvos=None, modelo=None):
+        saidas = dict(caracteristicas)
+        camadas = list((modelo or self.modelo).model)
+        x = saidas[self.n_backbone - 1]
+        for i in range(self.n_backbone, len(camadas)):
+            camada = camadas[i]
+            if camada.f != -1:
+                origens = _indices_origem(camada, i)
+                x = [saidas[j] for j in origens] if isinstance(camada.f, list) else saidas[origens[0]]
+            x = camada(x, alvos) if (self.rtdetr and i == len(camadas) - 1) else camada(x)
+            saidas[i] = x
+        return x
+
+    def construir_cache(self) -> float:
+        """Gera (ou reaproveita) o cache de características. Retorna o tempo gasto em segundos."""
+        meta_path = self.cache_dir / 'meta.json'
+        meta = json.loads(meta_path.read_text(encoding='utf-8')) if meta_path.is_file() else {}
+        if meta.get('completo') and meta.get('assinatura') == self.assinatura:
+            self.logger.info(f"  Reutilizando cache de características em '{self.cache_dir}'.")
+            return 0.0
+
+        inicio = time.perf_counter()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        loader = self._construir_loader()
+        n_imagens = len(loader.dataset)
+        self.logger.info(f"  Gerando cache do backbone ({n_imagens} imagens, camadas {self.camadas_cacheadas})...")
+
+        self.modelo.eval()
+        mapas, rotulos, posicao = {}, {'indice': [], 'cls': [], 'bboxes': []}, 0
+        with torch.no_grad():
+            for batch in loader:
+                img = batch['img'].to(self.device).float() / 255
+                caracteristicas = self._forward_backbone(img)
+                for j, tensor in caracteristicas.items():
+                    if j not in mapas:
+                        mapas[j] = np.lib.format.open_memmap(
+                            self.cache_dir / f'camada_{j}.npy', mode='w+', dtype=np.float16,
+                            shape=(n_imagens, *tensor.shape[1:]))
+                    mapas[j][posicao:posicao + len(img)] = tensor.half().cpu().numpy()
+                rotulos['indice'].append(batch['batch_idx'].numpy().astype(np.int64) + posicao)
+                rotulos['cls'].append(batch['cls'].numpy().reshape(-1))
+                rotulos['bboxes'].append(batch['bboxes'].numpy().reshape(-1, 4))
+                posicao += len(img)
+
+        for mapa in mapas.values():
+            mapa.flush()
+        np.savez(self.cache_dir / 'rotulos.npz', **{k: np.concatenate(v) for k, v in rotulos.items()})
+        meta_path.write_text(json.dumps({
+            'completo': True, 'n_imagens': n_imagens, 'camadas': self.camadas_cacheadas,
+            'base_model': self.base_model, 'imgsz': self.imgsz, 'assinatura': self.assinatura,
+        }, indent=2), encoding='utf-8')
+
+        duracao = time.perf_counter() - inicio
+        self.logger.info(f"  Cache do backbone gerado em {duracao / 60:.2f} min.")
+        return duracao
+
+    def _carregar_cache(self) -> Tuple[Dict[int, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+        mapas = {j: np.load(self.cache_dir / f'camada_{j}.npy', mmap_mode='r') for j in self.camadas_cacheadas}
+        rotulos = dict(np.load(self.cache_dir / 'rotulos.npz'))
+        n_imagens = len(next(iter(mapas.values())))
+        ordem = np.argsort(rotulos['indice'], kind='stable')
+        rotulos = {k: v[ordem] for k, v in rotulos.items()}
+        inicio_por_imagem = np.searchsorted(rotulos['indice'], np.arange(n_imagens + 1))
+        return mapas, rotulos, inicio_por_imagem
+
+    def _montar_batch(self, indices: np.ndarray, mapas, rotulos, inicio_por_imagem):
+        # Índices ordenados tornam a leitura dos memmaps sequencial no disco.
+        indices = np.sort(indices)
+        caracteristicas = {j: torch.from_numpy(np.ascontiguousarray(mapa[indices])).to(self.device).float()
+                           for j, mapa in mapas.items()}
+        batch_idx, cls, bboxes = [], [], []
+        for posicao, indice in enumerate(indices):
+            fatia = slice(inicio_por_imagem[indice], inicio_por_imagem[indice + 1])
+            batch_idx.append(np.full(fatia.stop - fatia.start, posicao, dtype=np.float32))
+            cls.append(rotulos['cls'][fatia])
+            bboxes.append(rotulos['bboxes'][fatia])
+        batch = {
+            'img': torch.empty((len(indices), 0), device=self.device),
+            'batch_idx': torch.from_numpy(np.concatenate(batch_idx)).to(self.device),
+            'cls': torch.from_numpy(np.concatenate(cls).astype(np.float32)).view(-1, 1).to(self.device),
+            'bboxes': torch.from_numpy(np.concatenate(bboxes).astype(np.float32)).to(self.device),
+        }
+        return caracteristicas, batch
+
+    def _alvos_rtdetr(self, batch) -> Dict[str, Any]:
+        return {
+            'cls': batch['cls'].long().view(-1), 'bboxes': batch['bboxes'],
+            'batch_idx': batch['batch_idx'].long().view(-1),
+            'gt_groups': [int((batch['batch_idx'] == i).sum()) for i in range(batch['img'].shape[0])],
+        }
+
+    def _passo_cabeca(self, caracteristicas, batch, modelo=None) -> torch.Tensor:
+        modelo = modelo or self.modelo
+        alvos = self._alvos_rtdetr(batch) if self.rtdetr else None
+        perda, _ = modelo.loss(batch, self._forward_cabeca(caracteristicas, alvos, modelo))
+        return perda.sum()
+
+    def estimar_razao_por_passo(self, passos: int = 3) -> float:
+        """
+        Razão estimada entre o custo de um passo de treino completo e o de um passo só de pescoço/cabeça,
+        em poucos passos sobre entrada aleatória (não é o tempo total de um ajuste fino completo). Os
+        passos rodam numa cópia do modelo: o modo de treino atualizaria as estatísticas das BatchNorm do
+        backbone com ruído, e o backbone publicado deixaria de produzir as características do cache.
+        """
+        mapas, rotulos, inicio_por_imagem = self._carregar_cache()
+        indices = np.arange(min(self.batch, len(inicio_por_imagem) - 1))
+        caracteristicas, batch = self._montar_batch(indices, mapas, rotulos, inicio_por_imagem)
+        img = torch.rand(len(indices), 3, self.imgsz, self.imgsz, device=self.device)
+        copia = deepcopy(self.modelo).train()
+
+        def cronometrar(passo) -> float:
+            passo()
+            inicio = time.perf_counter()
+            for _ in range(passos):
+                passo()
+            return (time.perf_counter() - inicio) / passos
+
+        def passo_completo():
+            for p in copia.parameters():
+                p.requires_grad_(True)
+            alvos = self._alvos_rtdetr(batch) if self.rtdetr else None
+            preds = copia.predict(img, batch=alvos) if self.rtdetr else copia(img)
+            copia.loss({**batch, 'img': img}, preds)[0].sum().backward()
+            copia.zero_grad(set_to_none=True)
+
+        def passo_cabeca():
+            self._passo_cabeca(caracteristicas, batch, copia).backward()
+            copia.zero_grad(set_to_none=True)
+
+        tempo_completo = cronometrar(passo_completo)
+        for i, camada in enumerate(copia.model):
+            for p in camada.parameters():
+                p.requires_grad_(i >= self.n_backbone)
+        tempo_cabeca = cronometrar(passo_cabeca)
+        del copia
+        return tempo_completo / tempo_cabeca if tempo_cabeca > 0 else 0.0
+
+    def _congelar_backbone(self):
+        for i, camada in enumerate(self.modelo.model):
+            for p in camada.parameters():
+                p.requires_grad_(i >= self.n_backbone)
+
+    def treinar(self, epocas: int, lr: float) -> float:
+        """Treina pescoço e cabeça a partir do cache. Retorna a perda média da última época."""
+        mapas, rotulos, inicio_por_imagem = self._carregar_cache()
+        n_imagens = len(inicio_por_imagem) - 1
+        self._congelar_backbone()
+        self.modelo.train()
+        for camada in self.modelo.model[:self.n_backbone]:
+            camada.eval()
+
+        otimizador = torch.optim.Adam([p for p in self.modelo.parameters() if p.requires_grad], lr=lr)
+        rng = np.random.default_rng(0)
+        perda_media = 0.0
+        for epoca in range(epocas):
+            ordem = rng.permutation(n_imagens)
+            perdas = []
+            for inicio in range(0, n_imagens, self.batch):
+                caracteristicas, batch = self._montar_batch(
+                    ordem[inicio:inicio + self.batch], mapas, rotulos, inicio_por_imagem)
+                perda = self._passo_cabeca(caracteristicas, batch)
+                otimizador.zero_grad(set_to_none=True)
+                perda.backward()
+                torch.nn.utils.clip_grad_norm_(self.modelo.parameters(), max_norm=10.0)
+                otimizador.step()
+                perdas.append(perda.item())
+            perda_media = float(np.mean(perdas)) if perdas else 0.0
+            self.logger.info(f"  [Backbone congelado] Época {epoca + 1}/{epocas} - perda média: {perda_media:.4f}")
+        return perda_media
+
+    def salvar_checkpoint(self, destino: Path) -> Path:
+        """Salva um checkpoint no formato do Ultralytics, carregável por YOLO()/RTDETR() e pelo trainer."""
+        for p in self.modelo.parameters():
+            p.requires_grad_(True)
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            'epoch': -1, 'best_fitness': None, 'model': deepcopy(self.modelo).half(), 'ema': None,
+            'updates': None, 'optimizer': None, 'train_args': vars(self.args),
+            'date': datetime.now().isoformat(), 'version': ultralytics_version,
+        }, destino)
+        return destino
@@ -0,0 +1,159 @@
+import os
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Iterable, Tuple, Optional, Dict, Any
+
+import cv2
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ultralytics.data.utils import IMG_FORMATS
+
+ARQUIVO_CHECKPOINT = 'checkpoint.json'
+ARQUIVO_PARQUET = 'deteccoes.parquet'
+PREFIXO_PARTE = 'parte_'
+
+ESQUEMA_DETECCOES = pa.schema([
+    ('arquivo', pa.string()), ('largura', pa.int32()), ('altura', pa.int32()),
+    ('x1', pa.float32()), ('y1', pa.float32()), ('x2', pa.float32()), ('y2', pa.float32()),
+    ('conf', pa.float32()), ('classe', pa.int16()),
+])
+
+
+def percorrer_imagens(raiz: Path, apos: Optional[str] = None) -> Iterator[Path]:
+    """
+    Gerador das imagens sob 'raiz' em ordem determinística (entradas de cada diretório ordenadas
+    por nome, subdiretórios visitados na sua posição), sem montar a lista completa: a memória
+    depende apenas do maior diretório. Com 'apos' (caminho relativo), retoma logo depois dele.
+    """
+    retomada = tuple(Path(apos).parts) if apos else None
+    pilha = [Path(raiz)]
+    raiz = Path(raiz)
+    while pilha:
+        atual = pilha.pop()
+        if atual.is_dir():
+            with os.scandir(atual) as entradas:
+                filhos = sorted((Path(e.path) for e in entradas), key=lambda p: p.name)
+            pilha.extend(reversed(filhos))
+            continue
+        if atual.suffix[1:].lower() not in IMG_FORMATS:
+            continue
+        if retomada is not None and atual.relative_to(raiz).parts <= retomada:
+            continue
+        yield atual
+
+
+def decodificar_em_paralelo(caminhos: Iterable[Path], workers: int,
+                            em_voo: int) -> Iterator[Tuple[Path, Optional[np.ndarray]]]:
+    """
+    Decodifica as imagens num pool de threads (o OpenCV libera o GIL) e as entrega na ordem de
+    entrada, com no máximo 'em_voo' imagens decodificadas ou em decodificação ao mesmo tempo.
+    Imagens ilegíveis são entregues como None.
+    """
+    with ThreadPoolExecutor(max(1, workers)) as executor:
+        pendentes = deque()
+        for caminho in caminhos:
+            pendentes.append((caminho, executor.submit(cv2.imread, str(caminho))))
+            if len(pendentes) >= em_voo:
+                caminho_pronto, futuro = pendentes.popleft()
+                yield caminho_pronto, futuro.result()
+        while pendentes:
+            caminho_pronto, futuro = pendentes.popleft()
+            yield caminho_pronto, futuro.result()
+
+
+def ler_checkpoint(saida: Path) -> Optional[Dict[str, Any]]:
+    caminho = Path(saida) / ARQUIVO_CHECKPOINT
+    if not caminho.is_file():
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_checkpoint(saida: Path, checkpoint: Dict[str, Any]):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)."""
+    caminho = Path(saida) / ARQUIVO_CHECKPOINT
+    temporario = caminho.with_suffix('.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=4, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+class EscritorYOLO:
+    """Um .txt por imagem, espelhando a árvore de entrada: 'classe xc yc w h conf' normalizados."""
+
+    def __init__(self, saida: Path, partes_existentes: int = 0):
+        self.saida = Path(saida) / 'labels'
+        self.partes = partes_existentes
+
+    def adicionar(self, relativo: str, forma: Tuple[int, int], caixas: np.ndarray, conf: np.ndarray,
+                  classes: np.ndarray):
+        altura, largura = forma
+        destino = (self.saida / relativo).with_suffix('.txt')
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        xywh = np.column_stack([(caixas[:, 0] + caixas[:, 2]) / 2 / largura, (caixas[:, 1] + caixas[:, 3]) / 2 / altura,
+                                (caixas[:, 2] - caixas[:, 0]) / largura, (caixas[:, 3] - caixas[:, 1]) / altura])
+        with open(destino, 'w', encoding='utf-8') as f:
+            for c, caixa, p in zip(classes, xywh, conf):
+                f.write(f"{int(c)} {' '.join(f'{v:.6f}' for v in caixa)} {float(p):.4f}\n")
+
+    def descarregar(self) -> int:
+        """Os .txt já estão gravados; nada a concluir."""
+        return self.partes
+
+    def finalizar(self) -> Path:
+        return self.saida
+
+
+class EscritorParquet:
+    """
+    Detecções acumuladas em memória só até o próximo checkpoint, quando viram um arquivo de parte
+    completo; ao final, as partes são consolidadas em um único 'deteccoes.parquet', grupo de linhas
+    por grupo de linhas, sem carregar tudo na memória.
+    """
+
+    def __init__(self, saida: Path, partes_existentes: int = 0):
+        self.saida = Path(saida)
+        self.partes = partes_existentes
+        self._linhas = {campo.name: [] for campo in ESQUEMA_DETECCOES}
+        # Partes gravadas depois do último checkpoint (execução interrompida) serão refeitas.
+        for parte in self.saida.glob(f"{PREFIXO_PARTE}*.parquet"):
+            if int(parte.stem[len(PREFIXO_PARTE):]) >= partes_existentes:
+                parte.unlink()
+
+    def adicionar(self, relativo: str, forma: Tuple[int, int], caixas: np.ndarray, conf: np.ndarray,
+                  classes: np.ndarray):
+        n = len(conf)
+        self._linhas['arquivo'].extend([relativo] * n)
+        self._linhas['largura'].append(np.full(n, forma[1], dtype=np.int32))
+        self._linhas['altura'].append(np.full(n, forma[0], dtype=np.int32))
+        for i, coluna in enumerate(('x1', 'y1', 'x2', 'y2')):
+            self._linhas[coluna].append(caixas[:, i].astype(np.float32))
+        self._linhas['conf'].append(conf.astype(np.float32))
+        self._linhas['classe'].append(classes.astype(np.int16))
+
+    def descarregar(self) -> int:
+        """Grava as detecções pendentes como uma nova parte e retorna o número de partes."""
+        if not self._linhas['arquivo']:
+            return self.partes
+        colunas = [pa.array(self._linhas['arquivo'], type=pa.string())] + \
+                  [pa.array(np.concatenate(self._linhas[campo.name])) for campo in list(ESQUEMA_DETECCOES)[1:]]
+        pq.write_table(pa.Table.from_arrays(colunas, schema=ESQUEMA_DETECCOES),
+                       self.saida / f"{PREFIXO_PARTE}{self.partes:05d}.parquet", compression='zstd')
+        self.partes += 1
+        self._linhas = {campo.name: [] for campo in ESQUEMA_DETECCOES}
+        return self.partes
+
+    def finalizar(self) -> Path:
+        destino = self.saida / ARQUIVO_PARQUET
+        partes = sorted(self.saida.glob(f"{PREFIXO_PARTE}*.parquet"))
+        with pq.ParquetWriter(destino, ESQUEMA_DETECCOES, compression='zstd') as escritor:
+            for parte in partes:
+                arquivo = pq.ParquetFile(parte)
+                for grupo in range(arquivo.num_row_groups):
+                    escritor.write_table(arquivo.read_row_group(grupo))
+        for parte in partes:
+            parte.unlink()
+        return destino
@@ -0,0 +1,24 @@
+from typing import Dict, Union, List
+
+from config.dataset_params import CLASS_MERGE_MAP
+
+
+def nome_canonico(nome: str) -> str:
+    """Mesma normalização do 04_merge_datasets: minúsculas, sem espaços nas bordas e CLASS_MERGE_MAP."""
+    processado = str(nome).lower().strip()
+    return CLASS_MERGE_MAP.get(processado, processado)
+
+
+def _como_dict(nomes: Union[Dict[int, str], List[str]]) -> Dict[int, str]:
+    return {int(k): v for k, v in nomes.items()} if isinstance(nomes, dict) else dict(enumerate(nomes))
+
+
+def traduzir_classes(nomes_origem: Union[Dict[int, str], List[str]],
+                     nomes_destino: Union[Dict[int, str], List[str]]) -> Dict[int, int]:
+    """
+    Tabela de tradução de ids de classe (origem -> destino) pelos nomes canônicos. Classes sem
+    correspondência no destino ficam de fora da tabela.
+    """
+    destino = {nome_canonico(nome): i for i, nome in _como_dict(nomes_destino).items()}
+    return {i: destino[nome_canonico(nome)] for i, nome in _como_dict(nomes_origem).items()
+            if nome_canonico(nome) in destino}
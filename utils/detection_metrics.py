@@ -0,0 +1,335 @@
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+LIMIARES_IOU_COCO = np.linspace(0.5, 0.95, 10)
+
+
+def iou_caixas(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU entre todas as caixas xyxy de 'a' (N) e 'b' (M), vetorizado: (N, M)."""
+    inter_min = np.maximum(a[:, None, :2], b[None, :, :2])
+    inter_max = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(inter_max - inter_min, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def _casar_predicoes(iou: np.ndarray, limiares: np.ndarray) -> np.ndarray:
+    """
+    Mesmo critério guloso do Ultralytics: para cada limiar, pares (gabarito, predição) da mesma
+    classe são ordenados por IoU e cada gabarito/predição é usado no máximo uma vez.
+    'iou' é (n_gabarito, n_pred) já zerado entre classes diferentes. Retorna (n_pred, n_limiares)
+    com o índice do gabarito casado com cada predição, ou -1 quando ela ficou sem par.
+    """
+    casado = np.full((iou.shape[1], len(limiares)), -1, dtype=np.int64)
+    for j, limiar in enumerate(limiares):
+        pares = np.argwhere(iou >= limiar)
+        if not len(pares):
+            continue
+        if len(pares) > 1:
+            pares = pares[iou[pares[:, 0], pares[:, 1]].argsort()[::-1]]
+            pares = pares[np.unique(pares[:, 1], return_index=True)[1]]
+            pares = pares[np.unique(pares[:, 0], return_index=True)[1]]
+        casado[pares[:, 1], j] = pares[:, 0]
+    return casado
+
+
+def _ap(recall: np.ndarray, precisao: np.ndarray) -> float:
+    """AP por interpolação de 101 pontos sobre o envelope da curva precisão x recall (COCO)."""
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precisao, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    x = np.linspace(0, 1, 101)
+    return float(np.trapezoid(np.interp(x, mrec, mpre), x))
+
+
+def _suavizar(y: np.ndarray, fracao: float) -> np.ndarray:
+    nf = round(len(y) * fracao * 2) // 2 + 1
+    borda = np.ones(nf // 2)
+    yp = np.concatenate((borda * y[0], y, borda * y[-1]), 0)
+    return np.convolve(yp, np.ones(nf) / nf, mode='valid')
+
+
+def casar_com_gabarito(predicoes: pd.DataFrame, gabarito: pd.DataFrame,
+                       limiares_iou: np.ndarray = LIMIARES_IOU_COCO) -> np.ndarray:
+    """
+    Para cada predição (na ordem de 'predicoes') e cada limiar de IoU, a posição em 'gabarito' do
+    objeto casado com ela, ou -1. As duas tabelas são agrupadas por 'imagem' com ordenação +
+    searchsorted, e a IoU é calculada imagem a imagem em forma matricial.
+    """
+    colunas = ['x1', 'y1', 'x2', 'y2']
+    ordem_p = np.argsort(predicoes['imagem'].to_numpy(), kind='stable')
+    ordem_g = np.argsort(gabarito['imagem'].to_numpy(), kind='stable')
+    img_p, img_g = predicoes['imagem'].to_numpy()[ordem_p], gabarito['imagem'].to_numpy()[ordem_g]
+    caixas_p, caixas_g = predicoes[colunas].to_numpy()[ordem_p], gabarito[colunas].to_numpy()[ordem_g]
+    cls_p, cls_g = predicoes['classe'].to_numpy()[ordem_p], gabarito['classe'].to_numpy()[ordem_g]
+
+    casado = np.full((len(predicoes), len(limiares_iou)), -1, dtype=np.int64)
+    imagens = np.unique(img_p)
+    ini_p, fim_p = np.searchsorted(img_p, imagens, 'left'), np.searchsorted(img_p, imagens, 'right')
+    ini_g, fim_g = np.searchsorted(img_g, imagens, 'left'), np.searchsorted(img_g, imagens, 'right')
+    for a, b, c, d in zip(ini_p, fim_p, ini_g, fim_g):
+        if c == d:
+            continue
+        iou = iou_caixas(caixas_g[c:d], caixas_p[a:b]) * (cls_g[c:d, None] == cls_p[None, a:b])
+        local = _casar_predicoes(iou, limiares_iou)
+        casado[ordem_p[a:b]] = np.where(local >= 0, ordem_g[c + np.maximum(local, 0)], -1)
+    return casado
+
+
+def marcar_acertos(predicoes: pd.DataFrame, gabarito: pd.DataFrame,
+                   limiares_iou: np.ndarray = LIMIARES_IOU_COCO) -> np.ndarray:
+    """Marca, para cada predição (na ordem de 'predicoes'), se é verdadeiro positivo em cada limiar de IoU."""
+    return casar_com_gabarito(predicoes, gabarito, limiares_iou) >= 0
+
+
+def calcular_metricas(predicoes: pd.DataFrame, gabarito: pd.DataFrame,
+                      limiares_iou: np.ndarray = LIMIARES_IOU_COCO, conf_minima: float = 0.0,
+                      nomes_classes: Optional[Dict[int, str]] = None) -> Dict[str, Any]:
+    """
+    Recalcula as métricas de detecção a partir do armazenamento de predições, seguindo a
+    definição do Ultralytics (AP de 101 pontos por classe presente no gabarito; P/R/F1 no
+    limiar de confiança que maximiza o F1 médio suavizado).
+
+    predicoes: colunas imagem, x1, y1, x2, y2, conf, classe.
+    gabarito: colunas imagem, x1, y1, x2, y2, classe.
+    """
+    limiares_iou = np.asarray(limiares_iou, dtype=float)
+    predicoes = predicoes[predicoes['conf'] >= conf_minima]
+    acertos = marcar_acertos(predicoes, gabarito, limiares_iou)
+
+    ordem = np.argsort(-predicoes['conf'].to_numpy(), kind='stable')
+    acertos, conf = acertos[ordem], predicoes['conf'].to_numpy()[ordem]
+    cls_pred = predicoes['classe'].to_numpy()[ordem]
+    classes, instancias = np.unique(gabarito['classe'].to_numpy(), return_counts=True)
+
+    eixo = np.linspace(0, 1, 1000)
+    ap = np.zeros((len(classes), len(limiares_iou)))
+    curva_p, curva_r = np.zeros((len(classes), 1000)), np.zeros((len(classes), 1000))
+    for ci, classe in enumerate(classes):
+        mascara = cls_pred == classe
+        if not mascara.any():
+            continue
+        tp_acum = acertos[mascara].cumsum(0)
+        fp_acum = (1 - acertos[mascara]).cumsum(0)
+        recall = tp_acum / (instancias[ci] + 1e-16)
+        precisao = tp_acum / (tp_acum + fp_acum)
+        curva_r[ci] = np.interp(-eixo, -conf[mascara], recall[:, 0], left=0)
+        curva_p[ci] = np.interp(-eixo, -conf[mascara], precisao[:, 0], left=1)
+        ap[ci] = [_ap(recall[:, j], precisao[:, j]) for j in range(len(limiares_iou))]
+
+    curva_f1 = 2 * curva_p * curva_r / (curva_p + curva_r + 1e-16)
+    indice = _suavizar(curva_f1.mean(0), 0.1).argmax() if len(classes) else 0
+    p, r = curva_p[:, indice], curva_r[:, indice]
+    mp, mr = (float(p.mean()), float(r.mean())) if len(classes) else (0.0, 0.0)
+
+    def _ap_no_limiar(valor):
+        posicao = np.flatnonzero(np.isclose(limiares_iou, valor))
+        return ap[:, posicao[0]] if len(posicao) else None
+
+    ap50, ap75 = _ap_no_limiar(0.5), _ap_no_limiar(0.75)
+    nomes_classes = nomes_classes or {}
+    por_classe = pd.DataFrame({
+        'classe': classes.astype(int),
+        'nome_classe': [nomes_classes.get(int(c), str(int(c))) for c in classes],
+        'instancias': instancias,
+        'precisao': p,
+        'recall': r,
+        'AP50': ap50 if ap50 is not None else np.nan,
+        'AP50_95': ap.mean(1) if len(classes) else np.zeros(0),
+    })
+    return {
+        'mAP50': float(ap50.mean()) if ap50 is not None and len(classes) else float('nan'),
+        'mAP75': float(ap75.mean()) if ap75 is not None and len(classes) else float('nan'),
+        'mAP50_95': float(ap.mean()) if len(classes) else 0.0,
+        'precisao': mp,
+        'recall': mr,
+        'f1_score': 2 * mp * mr / (mp + mr) if (mp + mr) > 0 else 0.0,
+        'limiar_conf_f1': float(eixo[indice]) if len(classes) else 0.0,
+        'por_classe': por_classe,
+    }
+
+
+def _areas(tabela: pd.DataFrame) -> np.ndarray:
+    return ((tabela['x2'] - tabela['x1']) * (tabela['y2'] - tabela['y1'])).to_numpy()
+
+
+def calcular_map_faixa_area(predicoes: pd.DataFrame, gabarito: pd.DataFrame, area_maxima: float,
+                            limiares_iou: np.ndarray = LIMIARES_IOU_COCO) -> Dict[str, float]:
+    """
+    mAP50 e mAP50-95 restritos aos objetos com área abaixo de 'area_maxima', como na avaliação
+    por faixa de área do COCO: o casamento usa o gabarito inteiro e, depois, são ignoradas (nem
+    TP nem FP) as predições casadas com objetos fora da faixa e as predições sem par cuja própria
+    área está fora da faixa. Só o gabarito da faixa conta no recall.
+    """
+    limiares_iou = np.asarray(limiares_iou, dtype=float)
+    na_faixa_g = _areas(gabarito) < area_maxima
+    if not na_faixa_g.any():
+        return {'mAP50': float('nan'), 'mAP50_95': float('nan')}
+    casado = casar_com_gabarito(predicoes, gabarito, limiares_iou)
+    acertos = casado >= 0
+    acerto_na_faixa = acertos & na_faixa_g[np.maximum(casado, 0)]
+    ignorada = (acertos & ~acerto_na_faixa) | (~acertos & (_areas(predicoes) >= area_maxima)[:, None])
+
+    ordem = np.argsort(-predicoes['conf'].to_numpy(), kind='stable')
+    acerto_na_faixa, ignorada = acerto_na_faixa[ordem], ignorada[ordem]
+    cls_pred = predicoes['classe'].to_numpy()[ordem]
+    classes, instancias = np.unique(gabarito['classe'].to_numpy()[na_faixa_g], return_counts=True)
+
+    ap = np.zeros((len(classes), len(limiares_iou)))
+    for ci, classe in enumerate(classes):
+        da_classe = cls_pred == classe
+        for j in range(len(limiares_iou)):
+            mascara = da_classe & ~ignorada[:, j]
+            if not mascara.any():
+                continue
+            tp_acum = acerto_na_faixa[mascara, j].cumsum()
+            recall = tp_acum / instancias[ci]
+            precisao = tp_acum / np.arange(1, len(tp_acum) + 1)
+            ap[ci, j] = _ap(recall, precisao)
+
+    posicao = np.flatnonzero(np.isclose(limiares_iou, 0.5))
+    return {'mAP50': float(ap[:, posicao[0]].mean()) if len(posicao) else float('nan'),
+            'mAP50_95': float(ap.mean())}
+
+
+def _ap_reamostrado(pesos: np.ndarray, acertos: np.ndarray, n_gabarito: np.ndarray) -> np.ndarray:
+    """
+    AP de 101 pontos (COCO) de uma classe para um bloco de reamostragens de uma só vez.
+    'pesos' é (B, m) com o peso de cada predição (ordenadas por confiança) em cada reamostragem,
+    'acertos' é (m, T) e 'n_gabarito' é (B,). As B*T curvas viram linhas deslocadas de 2 em 2,
+    o que torna o recall globalmente ordenado e permite um único searchsorted. Retorna (B, T).
+    """
+    m = acertos.shape[0]
+    tp_acum = np.cumsum(pesos[:, :, None] * acertos[None], axis=1)
+    total_acum = np.cumsum(pesos, axis=1)[:, :, None]
+    recall = tp_acum / n_gabarito[:, None, None]
+    precisao = tp_acum / np.maximum(total_acum, 1e-12)
+    envelope = np.flip(np.maximum.accumulate(np.flip(precisao, axis=1), axis=1), axis=1)
+
+    linhas = recall.shape[0] * recall.shape[2]
+    recall = recall.transpose(0, 2, 1).reshape(linhas, m)
+    envelope = envelope.transpose(0, 2, 1).reshape(linhas, m)
+    deslocamento = 2.0 * np.arange(linhas)[:, None]
+    x = np.linspace(0, 1, 101)
+    posicao = np.searchsorted((recall + deslocamento).ravel(), (x[None, :] + deslocamento).ravel(),
+                              side='left').reshape(linhas, len(x))
+    dentro = posicao - np.arange(linhas)[:, None] * m < m
+    valores = np.where(dentro, envelope.ravel()[np.minimum(posicao, envelope.size - 1)], 0.0)
+    return valores.mean(axis=1).reshape(pesos.shape[0], acertos.shape[1])
+
+
+def reamostrar_metricas(predicoes: pd.DataFrame, gabarito: pd.DataFrame, pesos_imagens: np.ndarray,
+                        limiar_conf_f1: float = 0.0, max_elementos: int = 4_000_000) -> Dict[str, np.ndarray]:
+    """
+    Métricas para muitas reamostragens bootstrap das imagens de teste sem repetir inferência nem
+    casamento. 'pesos_imagens' é (B, n_imagens): quantas vezes cada imagem (índice 'imagem' do
+    armazenamento) aparece em cada reamostragem. O casamento é feito uma vez; cada reamostragem
+    apenas repondera predições e instâncias do gabarito pelas contagens da sua imagem.
+
+    O AP usa a interpolação em degraus do COCO (vetorizável sobre as reamostragens), que difere
+    do Ultralytics na terceira casa decimal; a estimativa pontual comparável é a reamostragem com
+    peso 1 em todas as imagens. P/R/F1 são medidos no limiar de confiança fixo 'limiar_conf_f1'.
+    Retorna arrays (B,) com 'mAP50', 'mAP50_95', 'precisao', 'recall' e 'f1_score'.
+    """
+    pesos_imagens = np.asarray(pesos_imagens, dtype=np.float64)
+    n_reamostragens, n_imagens = pesos_imagens.shape
+    acertos = marcar_acertos(predicoes, gabarito, LIMIARES_IOU_COCO)
+    conf, cls = predicoes['conf'].to_numpy(), predicoes['classe'].to_numpy()
+    img = predicoes['imagem'].to_numpy()
+    img_g, cls_g = gabarito['imagem'].to_numpy(), gabarito['classe'].to_numpy()
+    classes = np.unique(cls_g)
+
+    ap = np.full((n_reamostragens, len(classes), len(LIMIARES_IOU_COCO)), np.nan)
+    p = np.full((n_reamostragens, len(classes)), np.nan)
+    r = np.full((n_reamostragens, len(classes)), np.nan)
+    for ci, classe in enumerate(classes):
+        n_gabarito = pesos_imagens @ np.bincount(img_g[cls_g == classe], minlength=n_imagens)
+        presente = n_gabarito > 0
+
+        mascara = cls == classe
+        ordem = np.argsort(-conf[mascara], kind='stable')
+        acertos_c, img_c, conf_c = acertos[mascara][ordem], img[mascara][ordem], conf[mascara][ordem]
+
+        acima = conf_c >= limiar_conf_f1
+        tp = pesos_imagens @ np.bincount(img_c[acima], weights=acertos_c[acima, 0].astype(float),
+                                         minlength=n_imagens)
+        n_pred = pesos_imagens @ np.bincount(img_c[acima], minlength=n_imagens)
+        p[presente, ci] = np.divide(tp, n_pred, out=np.ones(n_reamostragens), where=n_pred > 0)[presente]
+        r[presente, ci] = tp[presente] / n_gabarito[presente]
+
+        if not len(img_c):
+            ap[presente, ci] = 0.0
+            continue
+        bloco = max(1, int(max_elementos // (len(img_c) * len(LIMIARES_IOU_COCO))))
+        for inicio in range(0, n_reamostragens, bloco):
+            fatia = slice(inicio, inicio + bloco)
+            ap[fatia, ci] = _ap_reamostrado(pesos_imagens[fatia][:, img_c], acertos_c,
+                                            np.maximum(n_gabarito[fatia], 1e-12))
+        ap[~presente, ci] = np.nan
+
+    with np.errstate(invalid='ignore'):
+        mp, mr = np.nanmean(p, axis=1), np.nanmean(r, axis=1)
+        return {
+            'mAP50': np.nanmean(ap[:, :, 0], axis=1),
+            'mAP50_95': np.nanmean(ap.mean(axis=2), axis=1),
+            'precisao': mp,
+            'recall': mr,
+            'f1_score': np.divide(2 * mp * mr, mp + mr, out=np.zeros(n_reamostragens), where=(mp + mr) > 0),
+        }
+
+
+def varrer_limiares_confianca(predicoes: pd.DataFrame, gabarito: pd.DataFrame, limiares_conf: np.ndarray,
+                              limiar_iou: float = 0.5) -> pd.DataFrame:
+    """
+    Curvas P/R/F1 em uma grade densa de limiares de confiança, por classe e para o modelo
+    inteiro (classe -1). O casamento é feito uma única vez no limiar de IoU; depois, cada
+    escopo é ordenado por confiança uma vez, e a contagem de predições acima de cada limiar
+    vem de um searchsorted sobre a ordem, com os acertos acumulados lidos nessas posições.
+    """
+    limiares_conf = np.asarray(limiares_conf, dtype=float)
+    acertos = marcar_acertos(predicoes, gabarito, np.array([limiar_iou]))[:, 0]
+    conf, cls = predicoes['conf'].to_numpy(), predicoes['classe'].to_numpy()
+    classes, instancias = np.unique(gabarito['classe'].to_numpy(), return_counts=True)
+
+    escopos = [(-1, np.ones(len(conf), dtype=bool), int(instancias.sum()))]
+    escopos += [(int(c), cls == c, int(n)) for c, n in zip(classes, instancias)]
+
+    curvas = []
+    for classe, mascara, n_gabarito in escopos:
+        ordem = np.argsort(-conf[mascara], kind='stable')
+        conf_ordenada = conf[mascara][ordem]
+        tp_acumulado = np.concatenate(([0], np.cumsum(acertos[mascara][ordem])))
+        n_pred = np.searchsorted(-conf_ordenada, -limiares_conf, side='right')
+        tp = tp_acumulado[n_pred]
+        precisao = np.divide(tp, n_pred, out=np.ones(len(n_pred)), where=n_pred > 0)
+        recall = tp / n_gabarito if n_gabarito else np.zeros(len(n_pred))
+        curvas.append(pd.DataFrame({
+            'classe': classe, 'limiar': limiares_conf, 'predicoes': n_pred,
+            'precisao': precisao, 'recall': recall,
+            'f1': 2 * precisao * recall / (precisao + recall + 1e-16),
+        }))
+    return pd.concat(curvas, ignore_index=True)
+
+
+def limiares_otimos(curvas: pd.DataFrame, piso_recall: float) -> pd.DataFrame:
+    """
+    Para cada classe das curvas: o limiar de F1 máximo e o maior limiar (mais preciso) que
+    ainda mantém o recall acima de 'piso_recall' (NaN quando o piso nunca é atingido).
+    """
+    linhas = []
+    for classe, curva in curvas.groupby('classe', sort=True):
+        otimo = curva.loc[curva['f1'].idxmax()]
+        acima_do_piso = curva[curva['recall'] >= piso_recall]
+        piso = acima_do_piso.loc[acima_do_piso['limiar'].idxmax()] if not acima_do_piso.empty else None
+        linhas.append({
+            'classe': classe,
+            'limiar_f1_otimo': otimo['limiar'], 'f1_max': otimo['f1'],
+            'precisao_f1_otimo': otimo['precisao'], 'recall_f1_otimo': otimo['recall'],
+            'limiar_piso_recall': piso['limiar'] if piso is not None else np.nan,
+            'precisao_piso_recall': piso['precisao'] if piso is not None else np.nan,
+            'recall_piso_recall': piso['recall'] if piso is not None else np.nan,
+        })
+    return pd.DataFrame(linhas)
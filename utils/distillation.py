@@ -0,0 +1,165 @@
+import os
+import hashlib
+import shutil
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import yaml
+from ultralytics.data.utils import check_det_dataset, img2label_paths
+
+from config.paths import RUN_CATALOG_PATH
+from utils.detection_metrics import iou_caixas
+from utils.file_hashing import assinatura_arquivos, hash_curto
+from utils.model_cache import carregar_modelo
+from utils.run_catalog import CatalogoRuns
+from utils.test_tensor_cache import listar_imagens
+
+
+def resolver_pesos_professor(professor: str, dataset_name: str, runs_dir: Path) -> Optional[Path]:
+    """
+    Localiza o 'best.pt' do modelo professor no catálogo de runs: o run 'Completed' mais recente
+    cujo modelo (do 'run_metadata.json') e dataset coincidem exatamente com os pedidos. Os jobs
+    desta execução já entram no catálogo ao terminar.
+    """
+    catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+    catalogo.sincronizar(Path(runs_dir))
+    candidatos = [r for r in catalogo.consultar(modelos=[professor], datasets=[dataset_name])
+                  if r['modelo'] == professor and r['dataset'] == dataset_name and r['status'] == 'Completed']
+    if not candidatos:
+        return None
+    return Path(max(candidatos, key=lambda r: r['data_run'] or '')['caminho_pesos'])
+
+
+def _xywh_para_xyxy(caixas: np.ndarray) -> np.ndarray:
+    xy, wh = caixas[:, :2], caixas[:, 2:4] / 2
+    return np.concatenate([xy - wh, xy + wh], axis=1)
+
+
+class CacheProfessor:
+    """
+    Predições do professor sobre o split de treino, calculadas uma única vez e guardadas em
+    disco (.npz) por (pesos do professor, dataset, imgsz, confiança, assinatura do split de treino).
+    """
+
+    def __init__(self, pesos_professor: Path, data_config: str, imgsz: int, conf: float,
+                 cache_dir: Path, logger: logging.Logger):
+        self.pesos_professor = Path(pesos_professor)
+        self.data = check_det_dataset(data_config)
+        self.imgsz = imgsz
+        self.conf = conf
+        self.logger = logger
+        self.imagens = listar_imagens(self.data['train'])
+        self.assinatura = self._assinatura()
+        nome_dataset = Path(data_config).parent.name
+        self.caminho = (Path(cache_dir) / 'teacher_predictions' /
+                        f"{nome_dataset}_{hash_curto(self.pesos_professor)}_{imgsz}px_conf{conf:.2f}_"
+                        f"{self.assinatura[:16]}.npz")
+
+    def _assinatura(self) -> str:
+        """
+        Assinatura das imagens e rótulos do split de treino: um split reduzido, mesclado ou
+        reanotado com o mesmo nome de dataset gera outro cache em vez de reutilizar um obsoleto.
+        """
+        rotulos = [r for r in img2label_paths(self.imagens) if Path(r).is_file()]
+        return hashlib.sha256(f"{assinatura_arquivos(self.imagens)}|{assinatura_arquivos(rotulos)}".encode(
+            'utf-8')).hexdigest()
+
+    def carregar_ou_gerar(self, batch: int, device: str) -> Dict[str, np.ndarray]:
+        if self.caminho.is_file():
+            cache = dict(np.load(self.caminho, allow_pickle=False))
+            if str(cache.get('assinatura', '')) == self.assinatura:
+                self.logger.info(f"  Reutilizando predições do professor em cache: '{self.caminho}'.")
+                return cache
+            self.logger.info("  Cache de predições do professor com assinatura diferente; gerando novamente.")
+
+        imagens = self.imagens
+        self.logger.info(f"  Gerando predições do professor '{self.pesos_professor}' para {len(imagens)} imagens...")
+        professor = carregar_modelo(self.pesos_professor)
+        indices, classes, confiancas, caixas = [], [], [], []
+        for inicio in range(0, len(imagens), batch):
+            lote = imagens[inicio:inicio + batch]
+            for deslocamento, resultado in enumerate(professor.predict(
+                    lote, imgsz=self.imgsz, conf=self.conf, device=device, verbose=False)):
+                n = len(resultado.boxes)
+                indices.append(np.full(n, inicio + deslocamento, dtype=np.int64))
+                classes.append(resultado.boxes.cls.cpu().numpy().astype(np.int64))
+                confiancas.append(resultado.boxes.conf.cpu().numpy().astype(np.float32))
+                caixas.append(resultado.boxes.xywhn.cpu().numpy().astype(np.float32))
+
+        cache = {
+            'arquivos': np.asarray(imagens),
+            'indice': np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+            'cls': np.concatenate(classes) if classes else np.zeros(0, dtype=np.int64),
+            'conf': np.concatenate(confiancas) if confiancas else np.zeros(0, dtype=np.float32),
+            'xywhn': np.concatenate(caixas) if caixas else np.zeros((0, 4), dtype=np.float32),
+            'assinatura': np.asarray(self.assinatura),
+        }
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(self.caminho, **cache)
+        return cache
+
+
+def montar_dataset_destilacao(data_config: str, cache: Dict[str, np.ndarray], destino: Path,
+                              iou_correspondencia: float, logger: logging.Logger) -> Path:
+    """
+    Cria um dataset derivado cujo split de treino combina as anotações originais com as
+    detecções do professor que não correspondem a nenhuma anotação da mesma classe.
+    As caixas do professor passam pelo mesmo aumento de dados que os rótulos, o que permite
+    reutilizar as predições em cache em todas as épocas. Retorna o caminho do novo data.yaml.
+    """
+    data = check_det_dataset(data_config)
+    destino = Path(destino)
+    if destino.exists():
+        shutil.rmtree(destino)
+    dir_imagens = destino / 'train' / 'images'
+    dir_rotulos = destino / 'train' / 'labels'
+    dir_imagens.mkdir(parents=True)
+    dir_rotulos.mkdir(parents=True)
+
+    ordem = np.argsort(cache['indice'], kind='stable')
+    indice, cls, xywhn = cache['indice'][ordem], cache['cls'][ordem], cache['xywhn'][ordem]
+    limites = np.searchsorted(indice, np.arange(len(cache['arquivos']) + 1))
+
+    caixas_adicionadas = 0
+    for i, (imagem, rotulo) in enumerate(zip(cache['arquivos'], img2label_paths(list(cache['arquivos'])))):
+        imagem = Path(str(imagem))
+        nome_destino = f"{i:07d}_{imagem.name}"
+        try:
+            os.symlink(imagem.resolve(), dir_imagens / nome_destino)
+        except OSError:
+            shutil.copy2(imagem, dir_imagens / nome_destino)
+
+        gt = np.zeros((0, 5), dtype=np.float32)
+        if Path(rotulo).is_file():
+            linhas = [l.split()[:5] for l in Path(rotulo).read_text(encoding='utf-8').splitlines() if l.strip()]
+            if linhas:
+                gt = np.asarray(linhas, dtype=np.float32)
+
+        fatia = slice(limites[i], limites[i + 1])
+        prof_cls, prof_caixas = cls[fatia], xywhn[fatia]
+        if len(prof_cls) and len(gt):
+            iou = iou_caixas(_xywh_para_xyxy(prof_caixas), _xywh_para_xyxy(gt[:, 1:5]))
+            mesma_classe = prof_cls[:, None] == gt[None, :, 0].astype(np.int64)
+            novas = ~np.any((iou >= iou_correspondencia) & mesma_classe, axis=1)
+            prof_cls, prof_caixas = prof_cls[novas], prof_caixas[novas]
+
+        with open(dir_rotulos / f"{Path(nome_destino).stem}.txt", 'w', encoding='utf-8') as f:
+            for linha in gt:
+                f.write(f"{int(linha[0])} {' '.join(f'{v:.6f}' for v in linha[1:5])}\n")
+            for c, caixa in zip(prof_cls, prof_caixas):
+                f.write(f"{int(c)} {' '.join(f'{v:.6f}' for v in caixa)}\n")
+        caixas_adicionadas += len(prof_cls)
+
+    logger.info(f"  Dataset de destilação montado em '{destino}': {caixas_adicionadas} caixas do professor adicionadas.")
+
+    data_yaml = destino / 'data.yaml'
+    with open(data_yaml, 'w', encoding='utf-8') as f:
+        novo_data = {'path': destino.resolve().as_posix(), 'train': 'train/images', 'val': data['val']}
+        if data.get('test'):
+            novo_data['test'] = data['test']
+        novo_data['nc'] = data['nc']
+        novo_data['names'] = list(data['names'].values()) if isinstance(data['names'], dict) else data['names']
+        yaml.dump(novo_data, f, sort_keys=False, default_flow_style=False)
+    return data_yaml
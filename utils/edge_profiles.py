@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import shutil
+import logging
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from config.evaluation_params import EDGE_PROFILE_CONFIG, TEST_TENSOR_CACHE_CONFIG
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+MARCADOR_RESULTADO = 'RESULTADO_PERFIL '
+
+
+def coluna_perfil(nome: str) -> str:
+    return f"Latency_ms_{nome}"
+
+
+def colunas_perfis() -> List[str]:
+    """Colunas de latência dos perfis habilitados, na ordem de ENABLED_PROFILES."""
+    return [coluna_perfil(nome) for nome in EDGE_PROFILE_CONFIG['ENABLED_PROFILES']]
+
+
+def nucleos_do_perfil(perfil: Dict[str, Any]) -> List[int]:
+    """Os primeiros CORES núcleos disponíveis ao processo (todos, se o sistema não expõe afinidade)."""
+    disponiveis = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else \
+        list(range(os.cpu_count() or 1))
+    return disponiveis[:perfil['CORES']] if perfil.get('CORES') else disponiveis
+
+
+# Lê o 'cpu.max' do cgroup v2 do próprio processo: "max ..." (ou arquivo ausente) indica cota não aplicada.
+_LER_CPU_MAX = 'cat "/sys/fs/cgroup$(sed -n "s/^0:://p" /proc/self/cgroup)/cpu.max"'
+
+
+@lru_cache(maxsize=1)
+def cota_cgroup_disponivel() -> bool:
+    """
+    Se a cota de CPU via cgroup é de fato aplicada: um escopo transitório do systemd do usuário
+    ('systemd-run --user --scope') só limita a CPU quando o controlador 'cpu' está delegado ao
+    usuário; sem delegação o escopo é criado normalmente e a cota é ignorada em silêncio. Por isso
+    a verificação lê o 'cpu.max' de dentro de um escopo com cota em vez de confiar no código de saída.
+    """
+    if not sys.platform.startswith('linux') or shutil.which('systemd-run') is None:
+        return False
+    try:
+        processo = subprocess.run(['systemd-run', '--user', '--scope', '--quiet', '-p', 'CPUQuota=50%',
+                                   'sh', '-c', _LER_CPU_MAX], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    campos = processo.stdout.split()
+    return processo.returncode == 0 and bool(campos) and campos[0] != 'max'
+
+
+def _comando_perfil(perfil: Dict[str, Any], argumentos: Dict[str, Any]) -> List[str]:
+    comando = [sys.executable, '-m', 'utils.edge_profiles', json.dumps(argumentos)]
+    if perfil.get('CPU_QUOTA') and cota_cgroup_disponivel():
+        comando = ['systemd-run', '--user', '--scope', '--quiet',
+                   '-p', f"CPUQuota={round(perfil['CPU_QUOTA'] * 100)}%"] + comando
+    return comando
+
+
+def medir_latencia_perfil(nome: str, pesos, classe: str, imgsz: int, data_config: Optional[str],
+                          raiz_cache: Optional[Path]) -> float:
+    """
+    Latência média (ms) do harness do projeto num subprocesso limitado pelo perfil 'nome': threads
+    de inferência, afinidade de núcleos (aplicada antes de o processo carregar o PyTorch) e, quando
+    disponível, cota de CPU do cgroup. Sempre na CPU, como nos computadores embarcados.
+    """
+    perfil = EDGE_PROFILE_CONFIG['PROFILES'][nome]
+    argumentos = {"pesos": str(Path(pesos).resolve()), "classe": classe, "imgsz": imgsz,
+                  "threads": perfil['THREADS'], "nucleos": nucleos_do_perfil(perfil),
+                  "aquecimentos": EDGE_PROFILE_CONFIG['WARMUPS'], "execucoes": EDGE_PROFILE_CONFIG['RUNS'],
+                  "data_config": str(data_config) if data_config else None,
+                  "raiz_cache": str(raiz_cache) if raiz_cache else None}
+    ambiente = {**os.environ, "OMP_NUM_THREADS": str(perfil['THREADS']), "MKL_NUM_THREADS": str(perfil['THREADS'])}
+    nucleos = set(argumentos['nucleos'])
+    processo = subprocess.run(
+        _comando_perfil(perfil, argumentos), cwd=ROOT_DIR, env=ambiente, capture_output=True, text=True,
+        timeout=EDGE_PROFILE_CONFIG['TIMEOUT_S'],
+        preexec_fn=(lambda: os.sched_setaffinity(0, nucleos)) if hasattr(os, 'sched_setaffinity') else None)
+    for linha in reversed(processo.stdout.splitlines()):
+        if linha.startswith(MARCADOR_RESULTADO):
+            return json.loads(linha[len(MARCADOR_RESULTADO):])['latencia_ms']
+    raise RuntimeError(f"Perfil '{nome}' terminou sem resultado (código {processo.returncode}): "
+                       f"{processo.stderr.strip()[-500:]}")
+
+
+def medir_latencia_perfis(pesos, classe: str, imgsz: int, data_config: Optional[str], raiz_cache: Optional[Path],
+                          logger: logging.Logger) -> Dict[str, Any]:
+    """
+    Colunas 'Latency_ms_<perfil>' de todos os perfis habilitados (0.0 para um perfil que falhou) e
+    'Edge_CPU_Quota', que indica se as cotas de CPU puderam ser aplicadas nesta máquina.
+    """
+    perfis = EDGE_PROFILE_CONFIG['ENABLED_PROFILES']
+    if not perfis:
+        return {}
+    colunas: Dict[str, Any] = {}
+    com_cota = any(EDGE_PROFILE_CONFIG['PROFILES'][n].get('CPU_QUOTA') for n in perfis)
+    if com_cota and not cota_cgroup_disponivel():
+        logger.warning("  Cota de CPU via cgroup indisponível ou não aplicada (systemd-run --user sem o "
+                       "controlador 'cpu' delegado); perfis medidos apenas com limite de threads e afinidade.")
+    for nome in perfis:
+        try:
+            colunas[coluna_perfil(nome)] = medir_latencia_perfil(nome, pesos, classe, imgsz, data_config, raiz_cache)
+            logger.info(f"  Latência no perfil '{nome}': {colunas[coluna_perfil(nome)]:.2f} ms.")
+        except Exception as e:
+            logger.error(f"  Falha ao medir a latência no perfil '{nome}': {e}")
+            colunas[coluna_perfil(nome)] = 0.0
+    colunas["Edge_CPU_Quota"] = "cgroup" if com_cota and cota_cgroup_disponivel() else "N/A"
+    return colunas
+
+
+def _executar_perfil(argumentos: Dict[str, Any]):
+    """Lado do subprocesso: mede com o harness do projeto e imprime o resultado numa linha marcada."""
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, argumentos['nucleos'])
+    import torch
+    from ultralytics import YOLO, RTDETR
+    from utils.latency_benchmark import medir_latencia_ms
+    from utils.model_cache import carregar_modelo
+    from utils.test_tensor_cache import entradas_reais_de_teste
+
+    torch.set_num_threads(argumentos['threads'])
+    entradas = None
+    if argumentos['data_config'] and argumentos['raiz_cache'] and TEST_TENSOR_CACHE_CONFIG['ENABLED']:
+        entradas = entradas_reais_de_teste(argumentos['data_config'], argumentos['imgsz'], TEST_TENSOR_CACHE_CONFIG,
+                                           Path(argumentos['raiz_cache']))
+    classe = {'YOLO': YOLO, 'RTDETR': RTDETR}[argumentos['classe']]
+    latencia = medir_latencia_ms(carregar_modelo(argumentos['pesos'], classe), argumentos['imgsz'], 'cpu',
+                                 argumentos['aquecimentos'], argumentos['execucoes'], entradas)
+    print(MARCADOR_RESULTADO + json.dumps({"latencia_ms": latencia}), flush=True)
+
+
+if __name__ == "__main__":
+    _executar_perfil(json.loads(sys.argv[1]))
@@ -0,0 +1,73 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from ultralytics.data.utils import img2label_paths
+
+from utils.file_hashing import hash_arquivo
+from utils.test_tensor_cache import listar_imagens
+
+# Incrementar quando o formato do registro de resultado mudar, invalidando os registros antigos.
+VERSAO_REGISTRO = 3
+
+
+def _para_json(valor):
+    # Métricas do Ultralytics chegam como escalares NumPy; 'item()' os converte em tipos nativos.
+    return valor.item() if hasattr(valor, 'item') else str(valor)
+
+
+class CacheAvaliacao:
+    """
+    Cache de resultados do avaliador, um JSON por chave (hash do best.pt, hash do split de
+    teste, configurações do avaliador). Guarda o registro completo de resultado, de modo
+    que uma reexecução só avalia modelos novos ou alterados.
+    """
+
+    def __init__(self, diretorio: Path, configuracoes: Dict[str, Any]):
+        self.diretorio = Path(diretorio)
+        self.configuracoes = {**configuracoes, "versao_registro": VERSAO_REGISTRO}
+        self._hashes_teste: Dict[str, str] = {}
+
+    def _hash_split_teste(self, split_teste) -> str:
+        """
+        Hash do conteúdo das imagens do split de teste e dos rótulos correspondentes, com o split
+        já resolvido pelo data.yaml (diretório, lista ou .txt). Calculado uma vez por split.
+        """
+        identificador = json.dumps(split_teste, sort_keys=True, default=str)
+        if identificador not in self._hashes_teste:
+            imagens = sorted(listar_imagens(split_teste))
+            raiz = os.path.commonpath(imagens) if len(imagens) > 1 else ''
+            h = hashlib.sha256()
+            for imagem, rotulo in zip(imagens, img2label_paths(imagens)):
+                hash_rotulo = hash_arquivo(rotulo) if Path(rotulo).is_file() else ''
+                h.update(f"{os.path.relpath(imagem, raiz) if raiz else Path(imagem).name}|"
+                         f"{hash_arquivo(imagem)}|{hash_rotulo}\n".encode('utf-8'))
+            self._hashes_teste[identificador] = h.hexdigest()
+        return self._hashes_teste[identificador]
+
+    def chave(self, caminho_pesos: Path, split_teste) -> str:
+        componentes = {
+            "pesos": hash_arquivo(caminho_pesos),
+            "teste": self._hash_split_teste(split_teste),
+            "configuracoes": self.configuracoes,
+        }
+        return hashlib.sha256(json.dumps(componentes, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def ler(self, chave: str) -> Optional[Dict[str, Any]]:
+        caminho = self.diretorio / f"{chave}.json"
+        if not caminho.is_file():
+            return None
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def gravar(self, chave: str, registro: Dict[str, Any]):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.diretorio / f"{chave}.json.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(registro, f, indent=4, ensure_ascii=False, default=_para_json)
+        temporario.replace(self.diretorio / f"{chave}.json")
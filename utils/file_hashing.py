@@ -0,0 +1,43 @@
+import hashlib
+from pathlib import Path
+
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def hash_arquivo(caminho, algoritmo: str = 'sha256') -> str:
+    """Calcula o hash do conteúdo de um arquivo, lendo-o em blocos."""
+    h = hashlib.new(algoritmo)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def hash_curto(caminho, tamanho: int = 12) -> str:
+    """Prefixo do hash SHA-256, usado em nomes de diretórios de cache."""
+    return hash_arquivo(caminho)[:tamanho]
+
+
+def hash_diretorio(caminho, algoritmo: str = 'sha256') -> str:
+    """
+    Hash de uma árvore de arquivos: combina, em ordem, o caminho relativo e o conteúdo de cada
+    arquivo, de modo que adicionar, remover, renomear ou editar qualquer arquivo altera o resultado.
+    """
+    raiz = Path(caminho)
+    h = hashlib.new(algoritmo)
+    for arquivo in sorted(p for p in raiz.rglob('*') if p.is_file()):
+        h.update(arquivo.relative_to(raiz).as_posix().encode('utf-8'))
+        h.update(hash_arquivo(arquivo, algoritmo).encode('ascii'))
+    return h.hexdigest()
+
+
+def assinatura_arquivos(arquivos, algoritmo: str = 'sha256') -> str:
+    """
+    Assinatura barata de um conjunto de arquivos (caminho absoluto, tamanho e data de modificação),
+    independente da ordem: detecta arquivos adicionados, removidos ou regravados sem lê-los.
+    """
+    h = hashlib.new(algoritmo)
+    for arquivo in sorted(str(Path(a).resolve()) for a in arquivos):
+        estado = Path(arquivo).stat()
+        h.update(f"{arquivo}|{estado.st_size}|{estado.st_mtime_ns}\n".encode('utf-8'))
+    return h.hexdigest()
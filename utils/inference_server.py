@@ -0,0 +1,283 @@
+import json
+import math
+import time
+import asyncio
+import logging
+import ipaddress
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+from utils.latency_benchmark import resumir_latencias
+from utils.model_cache import carregar_modelo
+
+MENSAGENS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _sem_nan(valor):
+    """JSON estrito: NaN/inf viram null."""
+    if isinstance(valor, dict):
+        return {k: _sem_nan(v) for k, v in valor.items()}
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+class LoteadorDinamico:
+    """
+    Agrupamento dinâmico das requisições de um modelo: o primeiro pedido da fila abre um lote, que
+    é enviado ao modelo ao atingir 'max_lote' imagens ou após 'espera_max_s', o que vier antes.
+    A inferência roda no executor (fora do event loop), um lote por vez por modelo; cada
+    requisição recebe de volta as próprias detecções e o tamanho do lote em que foi atendida.
+    """
+
+    def __init__(self, modelo, parametros: Dict[str, Any], max_lote: int, espera_max_s: float,
+                 executor: ThreadPoolExecutor, janela_latencias: int):
+        self.modelo = modelo
+        self.parametros = parametros
+        self.max_lote = max(1, max_lote)
+        self.espera_max_s = max(0.0, espera_max_s)
+        self.executor = executor
+        self.fila: asyncio.Queue = asyncio.Queue()
+        self.latencias = deque(maxlen=janela_latencias)
+        self.requisicoes = 0
+        self.lotes = 0
+        self._tarefa = asyncio.get_running_loop().create_task(self._processar())
+
+    def zerar_metricas(self):
+        self.latencias.clear()
+        self.requisicoes = self.lotes = 0
+
+    def metricas(self) -> Dict[str, Any]:
+        return {"fila": self.fila.qsize(), "requisicoes": self.requisicoes, "lotes": self.lotes,
+                "tamanho_medio_lote": self.requisicoes / self.lotes if self.lotes else None,
+                **resumir_latencias(self.latencias)}
+
+    async def detectar(self, imagem: np.ndarray) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], int]:
+        futuro = asyncio.get_running_loop().create_future()
+        await self.fila.put((imagem, futuro))
+        return await futuro
+
+    def _inferir(self, imagens: List[np.ndarray]):
+        saida = []
+        for resultado in self.modelo.predict(imagens, **self.parametros):
+            caixas = resultado.boxes
+            saida.append((caixas.xyxy.cpu().numpy(), caixas.conf.cpu().numpy(),
+                          caixas.cls.cpu().numpy().astype(np.int64)))
+        return saida
+
+    async def _coletar_lote(self) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        lote = [await self.fila.get()]
+        limite = loop.time() + self.espera_max_s
+        while len(lote) < self.max_lote:
+            restante = limite - loop.time()
+            try:
+                lote.append(self.fila.get_nowait() if restante <= 0 else
+                            await asyncio.wait_for(self.fila.get(), restante))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return lote
+
+    async def _processar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._coletar_lote()
+            try:
+                resultados = await loop.run_in_executor(self.executor, self._inferir, [im for im, _ in lote])
+            except Exception as e:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            self.lotes += 1
+            self.requisicoes += len(lote)
+            for (_, futuro), resultado in zip(lote, resultados):
+                if not futuro.done():
+                    futuro.set_result((resultado, len(lote)))
+
+    def fechar(self):
+        self._tarefa.cancel()
+
+
+class ServidorInferencia:
+    """
+    Servidor HTTP/1.1 local (asyncio puro, sem dependências extras) para os 'best.pt' do catálogo
+    de runs. Os modelos são carregados uma vez, no primeiro uso, e mantidos em memória.
+
+    Rotas:
+      GET  /saude                        -> {"status": "ok"}
+      GET  /modelos                      -> runs disponíveis no catálogo
+      POST /modelos/<nome_run>/detectar  -> corpo = bytes da imagem (JPEG/PNG); detecções em pixels
+      GET  /metricas                     -> fila, lotes e latência p50/p99 (ms) por modelo
+    """
+
+    def __init__(self, config: Dict[str, Any], modelos: Dict[str, str], logger: logging.Logger):
+        if not ipaddress.ip_address(config['HOST']).is_loopback:
+            raise ValueError(f"O servidor é apenas local: HOST deve ser um endereço de loopback, não '{config['HOST']}'.")
+        self.config = config
+        self.modelos = modelos
+        self.logger = logger
+        self.parametros = dict(imgsz=config['IMG_SIZE'], conf=config['CONF_THRESHOLD'], iou=config['NMS_IOU'],
+                               max_det=config['MAX_DETECTIONS'], device=config['DEVICE'], verbose=False)
+        # Um único worker: lotes de modelos diferentes não disputam os núcleos entre si.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.loteadores: Dict[str, LoteadorDinamico] = {}
+        self._travas: Dict[str, asyncio.Lock] = {}
+        self.servidor: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def porta(self) -> int:
+        return self.servidor.sockets[0].getsockname()[1]
+
+    async def iniciar(self) -> asyncio.AbstractServer:
+        self.servidor = await asyncio.start_server(self._atender, self.config['HOST'], self.config['PORT'])
+        for nome in self.config['PRELOAD_MODELS']:
+            await self.carregar(nome)
+        return self.servidor
+
+    async def fechar(self):
+        for loteador in self.loteadores.values():
+            loteador.fechar()
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def carregar(self, nome: str) -> LoteadorDinamico:
+        """Carrega (uma única vez, mesmo com requisições simultâneas) e aquece o modelo 'nome'."""
+        if nome in self.loteadores:
+            return self.loteadores[nome]
+        if nome not in self.modelos:
+            raise ErroHTTP(404, f"Modelo '{nome}' não encontrado no catálogo.")
+        async with self._travas.setdefault(nome, asyncio.Lock()):
+            if nome not in self.loteadores:
+                loop = asyncio.get_running_loop()
+                inicio = time.perf_counter()
+                modelo = await loop.run_in_executor(self.executor, carregar_modelo, self.modelos[nome])
+                aquecimento = np.zeros((self.config['IMG_SIZE'], self.config['IMG_SIZE'], 3), dtype=np.uint8)
+                await loop.run_in_executor(self.executor, lambda: modelo.predict([aquecimento], **self.parametros))
+                self.loteadores[nome] = LoteadorDinamico(modelo, self.parametros, self.config['MAX_BATCH_SIZE'],
+                                                         self.config['MAX_WAIT_MS'] / 1000, self.executor,
+                                                         self.config['LATENCY_WINDOW'])
+                self.logger.info(f"Modelo '{nome}' carregado em {time.perf_counter() - inicio:.1f}s.")
+        return self.loteadores[nome]
+
+    def zerar_metricas(self):
+        for loteador in self.loteadores.values():
+            loteador.zerar_metricas()
+
+    def metricas(self) -> Dict[str, Any]:
+        por_modelo = {nome: loteador.metricas() for nome, loteador in self.loteadores.items()}
+        return {"fila_total": sum(m['fila'] for m in por_modelo.values()), "modelos": por_modelo}
+
+    async def _detectar(self, nome: str, corpo: bytes) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        loteador = await self.carregar(nome)
+        imagem = await asyncio.get_running_loop().run_in_executor(
+            None, cv2.imdecode, np.frombuffer(corpo, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if imagem is None:
+            raise ErroHTTP(400, "Corpo da requisição não é uma imagem válida.")
+        (caixas, conf, classes), tamanho_lote = await loteador.detectar(imagem)
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        loteador.latencias.append(latencia_ms)
+        nomes = loteador.modelo.names
+        return {"modelo": nome, "tamanho_lote": tamanho_lote, "latencia_ms": round(latencia_ms, 2),
+                "deteccoes": [{"caixa": np.round(c, 1).tolist(), "conf": round(float(p), 4), "classe": int(k),
+                               "nome_classe": nomes.get(int(k), str(int(k)))}
+                              for c, p, k in zip(caixas, conf, classes)]}
+
+    async def _rotear(self, metodo: str, caminho: str, corpo: bytes) -> Dict[str, Any]:
+        partes = [p for p in urlsplit(caminho).path.split('/') if p]
+        if partes == ['saude']:
+            return {"status": "ok"}
+        if partes == ['modelos']:
+            return {"modelos": [{"nome": nome, "carregado": nome in self.loteadores} for nome in sorted(self.modelos)]}
+        if partes == ['metricas']:
+            return _sem_nan(self.metricas())
+        if len(partes) == 3 and partes[0] == 'modelos' and partes[2] == 'detectar':
+            if metodo != 'POST':
+                raise ErroHTTP(405, "Use POST com os bytes da imagem no corpo.")
+            return await self._detectar(partes[1], corpo)
+        raise ErroHTTP(404, f"Rota inexistente: {caminho}")
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Conexão HTTP/1.1 com keep-alive: várias requisições em sequência na mesma conexão."""
+        limite_corpo = int(self.config['MAX_BODY_MB'] * 1024 * 1024)
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                linhas = cabecalho.decode('latin-1').split('\r\n')
+                metodo, caminho, versao = (linhas[0].split(' ') + ['', ''])[:3]
+                cabecalhos = {k.strip().lower(): v.strip() for k, _, v in
+                              (linha.partition(':') for linha in linhas[1:] if linha)}
+                manter = (cabecalhos.get('connection', '').lower() != 'close' and versao == 'HTTP/1.1')
+
+                status = 200
+                try:
+                    tamanho = int(cabecalhos.get('content-length', 0))
+                    if tamanho > limite_corpo:
+                        manter = False
+                        raise ErroHTTP(413, f"Corpo acima do limite de {self.config['MAX_BODY_MB']} MB.")
+                    corpo = await reader.readexactly(tamanho) if tamanho else b''
+                    resposta = await self._rotear(metodo.upper(), caminho, corpo)
+                except ErroHTTP as e:
+                    status, resposta = e.status, {"erro": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    self.logger.exception(f"Falha ao atender {metodo} {caminho}.")
+                    status, resposta = 500, {"erro": str(e)}
+
+                dados = json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status} {MENSAGENS_HTTP[status]}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(dados)}\r\n"
+                             f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode('latin-1') + dados)
+                await writer.drain()
+                if not manter:
+                    break
+        finally:
+            writer.close()
+
+
+class ClienteInferencia:
+    """Cliente HTTP/1.1 mínimo, com uma conexão persistente, para o servidor acima (gerador de carga)."""
+
+    def __init__(self, host: str, porta: int):
+        self.host = host
+        self.porta = porta
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def requisitar(self, metodo: str, caminho: str, corpo: bytes = b'') -> Tuple[int, Dict[str, Any]]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.porta)
+        self._writer.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Length: {len(corpo)}\r\n\r\n".encode('latin-1') + corpo)
+        await self._writer.drain()
+        linhas = (await self._reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        cabecalhos = {k.strip().lower(): v.strip() for k, _, v in (l.partition(':') for l in linhas[1:] if l)}
+        dados = await self._reader.readexactly(int(cabecalhos.get('content-length', 0)))
+        if cabecalhos.get('connection', '').lower() == 'close':
+            await self.fechar()
+        return int(linhas[0].split(' ')[1]), json.loads(dados) if dados else {}
+
+    async def fechar(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
@@ -0,0 +1,43 @@
+import time
+from typing import List, Dict, Optional
+
+import numpy as np
+import torch
+
+
+def medir_latencia_ms(model, imgsz: int, device: str, aquecimentos: int, execucoes: int,
+                      entradas: Optional[List[torch.Tensor]] = None) -> float:
+    """
+    Harness de latência do projeto: mede a média, em ms, de 'execucoes' inferências de um
+    objeto YOLO/RTDETR após 'aquecimentos' passes. As entradas são imagens reais 1x3ximgszximgsz
+    do cache de tensores de teste quando fornecidas (percorridas em ciclo) ou, senão, um tensor aleatório.
+    """
+    inference_device = int(device) if str(device).isdigit() else device
+
+    model.to(inference_device)
+    entradas = [e.to(inference_device) for e in entradas] if entradas else \
+        [torch.randn(1, 3, imgsz, imgsz).to(inference_device)]
+
+    for i in range(aquecimentos):
+        model(entradas[i % len(entradas)], verbose=False)
+
+    latencies = []
+    for i in range(execucoes):
+        start = time.perf_counter()
+        model(entradas[i % len(entradas)], verbose=False)
+        end = time.perf_counter()
+        latencies.append((end - start) * 1000)
+
+    return sum(latencies) / len(latencies)
+
+
+def resumir_latencias(latencias_ms) -> Dict[str, float]:
+    """Média e percentis (p50, p95, p99, máximo) de uma série de latências em ms."""
+    latencias_ms = np.asarray(latencias_ms, dtype=np.float64)
+    if not len(latencias_ms):
+        return {"latencia_media_ms": np.nan, "latencia_p50_ms": np.nan, "latencia_p95_ms": np.nan,
+                "latencia_p99_ms": np.nan, "latencia_max_ms": np.nan}
+    p50, p95, p99 = np.percentile(latencias_ms, [50, 95, 99])
+    return {"latencia_media_ms": float(latencias_ms.mean()), "latencia_p50_ms": float(p50),
+            "latencia_p95_ms": float(p95), "latencia_p99_ms": float(p99),
+            "latencia_max_ms": float(latencias_ms.max())}
@@ -0,0 +1,186 @@
+import io
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Callable
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from ultralytics.data.augment import LetterBox
+from ultralytics.nn.tasks import RTDETRDetectionModel
+from ultralytics.utils import ops
+
+try:
+    # Binding opcional da libjpeg-turbo (pip install PyTurboJPEG); sem ele, o decodificador é omitido.
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+ETAPAS = ('leitura', 'decodificacao', 'letterbox', 'tensor', 'forward', 'nms', 'reescala')
+
+
+def decodificadores_disponiveis() -> Dict[str, Callable[[bytes], np.ndarray]]:
+    """Decodificadores JPEG comparados; todos entregam uma imagem BGR uint8 (HxWx3), como o OpenCV."""
+    decodificadores = {
+        'opencv': lambda dados: cv2.imdecode(np.frombuffer(dados, dtype=np.uint8), cv2.IMREAD_COLOR),
+        'pil': lambda dados: np.ascontiguousarray(np.asarray(Image.open(io.BytesIO(dados)).convert('RGB'))[..., ::-1]),
+    }
+    if TurboJPEG is not None:
+        try:
+            turbo = TurboJPEG()
+            decodificadores['turbojpeg'] = lambda dados: turbo.decode(dados)
+        except Exception:
+            # Binding instalado, mas a biblioteca nativa não foi encontrada.
+            pass
+    return decodificadores
+
+
+def preparar_rede(modelo, imgsz: int, device: str):
+    """
+    Rede pronta para inferência direta, exatamente como o preditor do Ultralytics a usa (AutoBackend,
+    Conv+BN fundidos, no dispositivo): um predict de aquecimento a prepara.
+    """
+    modelo.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, device=device, verbose=False)
+    return modelo.predictor.model
+
+
+def para_tensor(im: np.ndarray, rede) -> torch.Tensor:
+    """Imagem BGR já em letterbox -> tensor 1x3xHxW RGB em [0, 1], no dispositivo e precisão da rede."""
+    tensor = torch.from_numpy(np.ascontiguousarray(im[..., ::-1].transpose(2, 0, 1))).to(rede.device)
+    return (tensor.half() if rede.fp16 else tensor.float()).div_(255).unsqueeze(0)
+
+
+def criar_letterbox(rede, imgsz: int, rtdetr: bool) -> LetterBox:
+    """
+    O mesmo pré-processamento do preditor do Ultralytics: no RT-DETR, a imagem é esticada para o
+    quadrado imgsz (scale_fill); nos demais, letterbox com padding mínimo até um múltiplo do stride.
+    """
+    if rtdetr:
+        return LetterBox(new_shape=(imgsz, imgsz), auto=False, scale_fill=True)
+    return LetterBox(new_shape=(imgsz, imgsz), auto=rede.pt, stride=rede.stride)
+
+
+def pos_processar(preds, rtdetr: bool, forma_entrada, config: Dict[str, Any]) -> torch.Tensor:
+    """
+    Detecções (n, 6) xyxy-conf-classe no espaço da entrada (altura, largura) da rede: NMS ou, no
+    RT-DETR, seleção por confiança.
+    """
+    if not rtdetr:
+        return ops.non_max_suppression(preds, config['CONF_THRESHOLD'], config['NMS_IOU'],
+                                       max_det=config['MAX_DETECTIONS'])[0]
+    saida = preds[0] if isinstance(preds, (list, tuple)) else preds
+    caixas, pontuacoes = saida[0, :, :4], saida[0, :, 4:]
+    conf, classes = pontuacoes.max(-1, keepdim=True)
+    manter = conf.squeeze(-1) > config['CONF_THRESHOLD']
+    altura, largura = forma_entrada
+    escala = caixas.new_tensor([largura, altura, largura, altura])
+    return torch.cat([ops.xywh2xyxy(caixas) * escala, conf, classes.float()], dim=-1)[manter]
+
+
+def reescalar_caixas(deteccoes: torch.Tensor, forma_entrada, forma_original, rtdetr: bool) -> torch.Tensor:
+    """Caixas xyxy do espaço da entrada da rede para a imagem original, desfazendo o pré-processamento."""
+    caixas = deteccoes[:, :4].clone()
+    if rtdetr:
+        # Entrada esticada: escala independente por eixo e sem padding.
+        altura, largura = forma_entrada
+        altura_original, largura_original = forma_original[:2]
+        return caixas * caixas.new_tensor([largura_original / largura, altura_original / altura] * 2)
+    return ops.scale_boxes(forma_entrada, caixas, forma_original)
+
+
+def _sincronizar(device: torch.device):
+    if device.type == 'cuda':
+        torch.cuda.synchronize(device)
+
+
+class PerfiladorLatencia:
+    """
+    Latência ponta a ponta de um detector, por etapa, em imagens reais: leitura do arquivo,
+    decodificação (cada decodificador disponível, sobre os mesmos bytes), letterbox, conversão para
+    tensor, forward, NMS (ou a seleção por confiança do RT-DETR) e reescala das caixas para a imagem
+    original. As etapas seguintes à decodificação usam a imagem do OpenCV, a mesma do preditor do
+    Ultralytics. A leitura mede o arquivo já no cache de páginas do sistema (após o aquecimento).
+    """
+
+    def __init__(self, modelo, config: Dict[str, Any], device: str):
+        self.config = config
+        self.imgsz = config['IMG_SIZE']
+        self.rede = preparar_rede(modelo, self.imgsz, device)
+        self.device = self.rede.device
+        self.rtdetr = isinstance(modelo.model, RTDETRDetectionModel)
+        self.letterbox = criar_letterbox(self.rede, self.imgsz, self.rtdetr)
+        self.decodificadores = decodificadores_disponiveis()
+
+    def medir_imagem(self, arquivo: str) -> Dict[str, float]:
+        """Tempos (ms) de uma imagem: 'leitura', 'decodificacao_<nome>' por decodificador e as demais etapas."""
+        tempos = {}
+        inicio = time.perf_counter()
+        dados = Path(arquivo).read_bytes()
+        tempos['leitura'] = (time.perf_counter() - inicio) * 1000
+
+        imagem = None
+        for nome, decodificar in self.decodificadores.items():
+            inicio = time.perf_counter()
+            try:
+                decodificada = decodificar(dados)
+            except Exception:
+                decodificada = None
+            tempos[f'decodificacao_{nome}'] = (time.perf_counter() - inicio) * 1000 if decodificada is not None else np.nan
+            if nome == 'opencv':
+                imagem = decodificada
+        if imagem is None:
+            raise ValueError(f"Imagem ilegível: '{arquivo}'.")
+
+        inicio = time.perf_counter()
+        im = self.letterbox(image=imagem)
+        tempos['letterbox'] = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        tensor = para_tensor(im, self.rede)
+        _sincronizar(self.device)
+        tempos['tensor'] = (time.perf_counter() - inicio) * 1000
+
+        with torch.inference_mode():
+            inicio = time.perf_counter()
+            preds = self.rede(tensor)
+            _sincronizar(self.device)
+            tempos['forward'] = (time.perf_counter() - inicio) * 1000
+
+            inicio = time.perf_counter()
+            deteccoes = pos_processar(preds, self.rtdetr, tensor.shape[2:], self.config)
+            _sincronizar(self.device)
+            tempos['nms'] = (time.perf_counter() - inicio) * 1000
+
+            inicio = time.perf_counter()
+            reescalar_caixas(deteccoes, tensor.shape[2:], imagem.shape, self.rtdetr).cpu()
+            tempos['reescala'] = (time.perf_counter() - inicio) * 1000
+        return tempos
+
+    def perfilar(self, arquivos: List[str], aquecimentos: int, repeticoes: int) -> List[Dict[str, Any]]:
+        """
+        Uma linha por decodificador com a média (ms) de cada etapa, o total ponta a ponta (média e
+        p95, somando a decodificação daquele decodificador) e a fração do total fora do forward.
+        """
+        for i in range(min(aquecimentos, len(arquivos))):
+            self.medir_imagem(arquivos[i])
+        medidas = [self.medir_imagem(a) for _ in range(repeticoes) for a in arquivos]
+
+        linhas = []
+        demais = [e for e in ETAPAS if e != 'decodificacao']
+        for nome in self.decodificadores:
+            decodificacao = np.array([m[f'decodificacao_{nome}'] for m in medidas])
+            validas = ~np.isnan(decodificacao)
+            if not validas.any():
+                continue
+            totais = decodificacao[validas] + np.array([sum(m[e] for e in demais) for m in medidas])[validas]
+            linha = {"decodificador": nome, "medicoes": int(validas.sum())}
+            for etapa in ETAPAS:
+                valores = decodificacao[validas] if etapa == 'decodificacao' else \
+                    np.array([m[etapa] for m in medidas])[validas]
+                linha[f"{etapa}_ms"] = float(valores.mean())
+            linha["total_ms"] = float(totais.mean())
+            linha["total_p95_ms"] = float(np.percentile(totais, 95))
+            linha["fracao_fora_forward"] = 1 - linha["forward_ms"] / linha["total_ms"] if linha["total_ms"] else np.nan
+            linhas.append(linha)
+        return linhas
@@ -0,0 +1,109 @@
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from utils.file_hashing import hash_arquivo
+
+METRICA_MAP = 'metrics/mAP50-95(B)'
+
+
+def ajustar_lei_de_potencia(epocas: List[int], valores: List[float]) -> Optional[Tuple[float, float, float]]:
+    """
+    Ajusta a curva de aprendizado y(t) = a - b * t^(-c) ao histórico de mAP.
+    O expoente 'c' é buscado em grade e, para cada valor, 'a' e 'b' saem de
+    mínimos quadrados lineares. Retorna (a, b, c) ou None se o ajuste não for possível.
+    """
+    t = np.asarray(epocas, dtype=np.float64)
+    y = np.asarray(valores, dtype=np.float64)
+    if t.size < 3 or np.any(t <= 0):
+        return None
+
+    melhor = None
+    for c in np.linspace(0.05, 3.0, 60):
+        base = np.stack([np.ones_like(t), -np.power(t, -c)], axis=1)
+        coeficientes, _, _, _ = np.linalg.lstsq(base, y, rcond=None)
+        a, b = coeficientes
+        if b < 0:
+            continue
+        erro = float(np.sum((base @ coeficientes - y) ** 2))
+        if melhor is None or erro < melhor[0]:
+            melhor = (erro, float(a), float(b), float(c))
+
+    if melhor is None:
+        return None
+    return melhor[1], melhor[2], melhor[3]
+
+
+def projetar_valor_final(epocas: List[int], valores: List[float], epoca_final: int) -> Optional[float]:
+    """Extrapola o histórico até 'epoca_final'. Curvas sem tendência de melhora projetam o melhor valor já visto."""
+    parametros = ajustar_lei_de_potencia(epocas, valores)
+    if parametros is None:
+        return max(valores) if valores else None
+    a, b, c = parametros
+    return max(a - b * epoca_final ** (-c), max(valores))
+
+
+def melhor_map_referencia(resultados: List[Dict[str, Any]], dataset_name: str, data_config: Path,
+                          catalogo) -> float:
+    """
+    Retorna o maior mAP50-95 de um job concluído no dataset, entre os jobs da execução atual e os
+    runs 'Completed' do catálogo treinados com o mesmo data.yaml (mesmo hash). Runs de outra versão
+    do dataset, interrompidos ou com falha não servem de referência.
+    """
+    candidatos = [r.get('mAP50_95', 0.0) for r in resultados
+                  if r.get('Dataset') == dataset_name and r.get('Status') == 'Completed']
+
+    hash_atual = hash_arquivo(data_config) if Path(data_config).is_file() else None
+    for registro in catalogo.consultar(datasets=[dataset_name], somente_com_pesos=False):
+        metadados = registro['metadados']
+        if registro['status'] != 'Completed' or hash_atual is None or metadados.get('hash_data_yaml') != hash_atual:
+            continue
+        try:
+            candidatos.append(float((metadados.get('resultado') or {}).get('mAP50_95') or 0.0))
+        except (TypeError, ValueError):
+            continue
+
+    return max(candidatos, default=0.0)
+
+
+class InterrupcaoPorCurvaAprendizado:
+    """
+    Callback 'on_fit_epoch_end' do Ultralytics que interrompe jobs sem chance
+    de alcançar uma fração do melhor mAP50-95 já obtido no mesmo dataset.
+    """
+
+    def __init__(self, referencia_map: float, config: Dict[str, Any], logger: logging.Logger):
+        self.referencia_map = referencia_map
+        self.fracao_alvo = config['EARLY_TERMINATION_FRACTION']
+        self.epocas_minimas = config['EARLY_TERMINATION_MIN_EPOCHS']
+        self.logger = logger
+        self.epocas: List[int] = []
+        self.historico_map: List[float] = []
+        self.motivo: Optional[str] = None
+
+    def __call__(self, trainer):
+        # Épocas sem validação completa (agenda de validação) repetem métricas antigas ou medem um
+        # subconjunto, cujo mAP não é comparável ao do split completo; ambas são ignoradas.
+        if not getattr(trainer, 'validacao_completa_nesta_epoca', True):
+            return
+        valor = (trainer.metrics or {}).get(METRICA_MAP)
+        epoca = trainer.epoch + 1
+        if valor is None or (self.epocas and epoca <= self.epocas[-1]):
+            return
+
+        self.epocas.append(epoca)
+        self.historico_map.append(float(valor))
+
+        if self.referencia_map <= 0 or epoca < self.epocas_minimas or epoca >= trainer.epochs:
+            return
+
+        projecao = projetar_valor_final(self.epocas, self.historico_map, trainer.epochs)
+        alvo = self.fracao_alvo * self.referencia_map
+        if projecao is not None and projecao < alvo:
+            self.motivo = (f"Curva de aprendizado projeta mAP50-95 de {projecao:.4f} na época {trainer.epochs}, "
+                           f"abaixo do alvo de {alvo:.4f} ({self.fracao_alvo:.0%} do melhor job, "
+                           f"{self.referencia_map:.4f}). Interrompido na época {epoca}.")
+            self.logger.warning(f"  [INTERRUPÇÃO ANTECIPADA] {self.motivo}")
+            trainer.stop = True
@@ -0,0 +1,161 @@
+import copy
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from ultralytics import YOLO
+from ultralytics.utils import callbacks
+
+from config.evaluation_params import MODEL_CACHE_CONFIG
+from utils.file_hashing import hash_arquivo
+
+
+def _bytes_modelo(modelo) -> int:
+    """Memória dos parâmetros e buffers da rede (estimativa do custo de manter o modelo em cache)."""
+    return sum(t.numel() * t.element_size() for t in modelo.model.state_dict().values())
+
+
+class CacheModelos:
+    """
+    Cache de modelos do processo, chaveado por (classe, caminho, hash dos pesos), com orçamento de
+    memória e descarte LRU. Cada pesos é desserializado uma vez; o hash é calculado só na primeira
+    carga de cada versão do arquivo (tamanho e data de modificação), de modo que as cargas seguintes
+    custam um 'stat'. Nomes de modelos oficiais (ex.: 'yolov8n.pt') são chaveados pelo arquivo que o
+    Ultralytics resolveu ou baixou na primeira carga ('ckpt_path'), o mesmo do caminho explícito.
+
+    Cada entrada guarda uma instância intocada e, sob demanda, a instância compartilhada de inferência
+    (o preditor do Ultralytics funde Conv+BN na rede recebida). Treino, poda e qualquer alteração
+    da rede recebem uma cópia profunda da instância intocada.
+    """
+
+    def __init__(self, limite_bytes: int, habilitado: bool = True):
+        self.limite_bytes = limite_bytes
+        self.habilitado = habilitado
+        self._entradas: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self._hashes: Dict[tuple, str] = {}
+        self._resolvidos: Dict[tuple, Path] = {}
+        self._trava = threading.RLock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def _chave(self, pesos, classe) -> Optional[tuple]:
+        caminho = Path(str(pesos))
+        if not caminho.is_file():
+            # Nome de um modelo oficial: chave do arquivo resolvido pelo Ultralytics numa carga anterior.
+            caminho = self._resolvidos.get((classe.__name__, str(pesos)))
+            if caminho is None or not caminho.is_file():
+                return None
+        caminho = caminho.resolve()
+        estado = caminho.stat()
+        assinatura = (str(caminho), estado.st_size, estado.st_mtime_ns)
+        if assinatura not in self._hashes:
+            self._hashes[assinatura] = hash_arquivo(caminho)
+        return classe.__name__, str(caminho), self._hashes[assinatura]
+
+    def _entrada(self, pesos, classe) -> Dict[str, Any]:
+        chave = self._chave(pesos, classe) or (classe.__name__, str(pesos), None)
+        if chave in self._entradas:
+            self.acertos += 1
+            self._entradas.move_to_end(chave)
+            return self._entradas[chave]
+        self.faltas += 1
+        intocado = classe(str(pesos))
+        if chave[2] is None:
+            # Só depois da carga o arquivo existe (baixado pelo Ultralytics se necessário) e tem hash.
+            ckpt_path = getattr(intocado, 'ckpt_path', None)
+            if ckpt_path and Path(ckpt_path).is_file():
+                self._resolvidos[(classe.__name__, str(pesos))] = Path(ckpt_path)
+            chave = self._chave(pesos, classe) or (classe.__name__, str(pesos), None)
+            if chave in self._entradas:
+                # Os mesmos pesos já estavam em cache pelo caminho explícito.
+                self._entradas.move_to_end(chave)
+                return self._entradas[chave]
+        entrada = {"intocado": intocado, "inferencia": None, "bytes": _bytes_modelo(intocado)}
+        self._entradas[chave] = entrada
+        self._aplicar_orcamento()
+        return entrada
+
+    def _aplicar_orcamento(self):
+        """Descarta as entradas usadas há mais tempo até caber no orçamento (a mais recente sempre fica)."""
+        while len(self._entradas) > 1 and self.bytes_em_uso() > self.limite_bytes:
+            self._entradas.popitem(last=False)
+
+    def bytes_em_uso(self) -> int:
+        return sum(e['bytes'] * (2 if e['inferencia'] is not None else 1) for e in self._entradas.values())
+
+    def precarregar(self, pesos, classe=YOLO):
+        """Carrega os pesos no cache sem criar instâncias adicionais (ex.: verificação de ambiente)."""
+        if not self.habilitado:
+            classe(str(pesos))
+            return
+        with self._trava:
+            self._entrada(pesos, classe)
+
+    def registrar(self, pesos, modelo, classe=YOLO):
+        """
+        Registra como instância intocada de 'pesos' um modelo já em memória com exatamente esses pesos
+        (ex.: o objeto do treino, que ao final recarrega o 'best.pt'), evitando lê-lo de novo do disco.
+        """
+        if not self.habilitado or not Path(str(pesos)).is_file():
+            return
+        with self._trava:
+            # Cópia rasa só para descartar o estado do treino (trainer, preditor e callbacks do job) sem
+            # alterar o objeto do chamador; a cópia profunda seguinte deixa a rede sem nenhum tensor em
+            # comum com ele, que pode continuar a ser modificado depois do registro.
+            intocado = copy.copy(modelo)
+            intocado.trainer = None
+            intocado.predictor = None
+            intocado.callbacks = callbacks.get_default_callbacks()
+            intocado = copy.deepcopy(intocado)
+            chave = self._chave(pesos, classe)
+            self._entradas[chave] = {"intocado": intocado, "inferencia": None, "bytes": _bytes_modelo(intocado)}
+            self._entradas.move_to_end(chave)
+            self._aplicar_orcamento()
+
+    def obter(self, pesos, classe=YOLO):
+        """Instância compartilhada para inferência, validação e latência. Não deve ser treinada nem alterada."""
+        if not self.habilitado:
+            return classe(str(pesos))
+        with self._trava:
+            entrada = self._entrada(pesos, classe)
+            if entrada['inferencia'] is None:
+                entrada['inferencia'] = copy.deepcopy(entrada['intocado'])
+                self._aplicar_orcamento()
+            return entrada['inferencia']
+
+    def obter_copia(self, pesos, classe=YOLO):
+        """Cópia independente dos pesos recém-carregados, para treino, poda ou outra alteração da rede."""
+        if not self.habilitado:
+            return classe(str(pesos))
+        with self._trava:
+            return copy.deepcopy(self._entrada(pesos, classe)['intocado'])
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {"modelos": len(self._entradas), "acertos": self.acertos, "faltas": self.faltas,
+                "memoria_mb": self.bytes_em_uso() / 1024 ** 2}
+
+
+_CACHE: Optional[CacheModelos] = None
+
+
+def cache_modelos() -> CacheModelos:
+    """Cache único do processo, configurado por MODEL_CACHE_CONFIG."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = CacheModelos(int(MODEL_CACHE_CONFIG['MAX_MEMORY_GB'] * 1024 ** 3), MODEL_CACHE_CONFIG['ENABLED'])
+    return _CACHE
+
+
+def carregar_modelo(pesos, classe=YOLO):
+    """Modelo compartilhado (somente inferência/validação) do cache do processo."""
+    return cache_modelos().obter(pesos, classe)
+
+
+def carregar_modelo_para_treino(pesos, classe=YOLO):
+    """Cópia própria do modelo, do cache do processo, para treino ou alteração da rede."""
+    return cache_modelos().obter_copia(pesos, classe)
@@ -0,0 +1,149 @@
+import sys
+import json
+import multiprocessing
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import psutil
+import torch
+from ultralytics import YOLO, RTDETR
+from ultralytics.nn.tasks import RTDETRDetectionModel
+from ultralytics.utils.torch_utils import get_flops
+
+from utils.file_hashing import hash_arquivo
+from utils.model_cache import carregar_modelo_para_treino
+
+# Incrementar quando a forma de medir mudar, invalidando os perfis em cache.
+VERSAO_PERFIL = 1
+
+COLUNAS_CUSTO = ("parametros_m", "gflops", "tamanho_pesos_mb", "rss_pico_mb", "rss_incremento_mb", "ativacoes_mb")
+
+
+def _bytes_tensores(saida) -> int:
+    if isinstance(saida, torch.Tensor):
+        return saida.numel() * saida.element_size()
+    if isinstance(saida, (list, tuple)):
+        return sum(_bytes_tensores(s) for s in saida)
+    if isinstance(saida, dict):
+        return sum(_bytes_tensores(s) for s in saida.values())
+    return 0
+
+
+def memoria_ativacoes(rede, imgsz: int) -> int:
+    """
+    Pico de memória de ativações (bytes) de um forward com 1 imagem imgsz x imgsz em fp32, seguindo o
+    laço de inferência do Ultralytics: a cada camada ficam vivas a entrada, a saída e as saídas
+    anteriores guardadas para camadas posteriores ('save'). Ignora temporários internos das camadas.
+    """
+    tamanhos: Dict[int, int] = {}
+    ganchos = [camada.register_forward_hook(lambda m, e, s: tamanhos.__setitem__(m.i, _bytes_tensores(s)))
+               for camada in rede.model]
+    entrada = torch.zeros(1, 3, imgsz, imgsz, device=next(rede.parameters()).device)
+    try:
+        with torch.inference_mode():
+            rede(entrada)
+    finally:
+        for gancho in ganchos:
+            gancho.remove()
+
+    guardadas, anterior, pico = 0, _bytes_tensores(entrada), 0
+    for camada in rede.model:
+        atual = tamanhos.get(camada.i, 0)
+        pico = max(pico, guardadas + anterior + atual)
+        if camada.i in rede.save:
+            guardadas += atual
+        anterior = atual
+    return pico
+
+
+def _rss_pico_bytes() -> int:
+    """Maior RSS atingido pelo processo até agora."""
+    if sys.platform == 'win32':
+        return psutil.Process().memory_info().peak_wset
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+def _medir_rss_em_processo(pesos: str, classe: str, imgsz: int, conexao):
+    """Alvo do processo isolado: RSS antes da carga e pico após carga e inferência na CPU."""
+    try:
+        base = psutil.Process().memory_info().rss
+        modelo = {'YOLO': YOLO, 'RTDETR': RTDETR}[classe](pesos)
+        modelo.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, device='cpu', verbose=False)
+        conexao.send({"rss_pico": _rss_pico_bytes(), "rss_base": base})
+    except Exception as e:
+        conexao.send({"erro": f"{type(e).__name__}: {e}"})
+    conexao.close()
+
+
+def rss_pico_inferencia(pesos, classe: str, imgsz: int) -> Dict[str, int]:
+    """
+    Pico de RSS de uma inferência num processo 'spawn' novo, para que o valor não dependa do que o
+    processo chamador já carregou; o incremento desconta o RSS do interpretador com PyTorch já importado.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    leitor, escritor = contexto.Pipe(duplex=False)
+    processo = contexto.Process(target=_medir_rss_em_processo, args=(str(pesos), classe, imgsz, escritor))
+    processo.start()
+    escritor.close()
+    try:
+        resultado = leitor.recv()
+    except EOFError:
+        resultado = {"erro": f"processo terminou sem resultado (código de saída {processo.exitcode})"}
+    finally:
+        leitor.close()
+        processo.join()
+    if 'erro' in resultado:
+        raise RuntimeError(f"Falha ao medir o RSS de '{pesos}': {resultado['erro']}")
+    return resultado
+
+
+def perfilar_custo(pesos, imgsz: int) -> Dict[str, float]:
+    """
+    Custos independentes do hardware de um 'best.pt': parâmetros (milhões), GFLOPs a imgsz,
+    tamanho serializado dos pesos, pico de RSS da inferência (total e incremento) e memória de ativações.
+    """
+    modelo = carregar_modelo_para_treino(pesos)
+    rede = modelo.model.eval()
+    classe = 'RTDETR' if isinstance(rede, RTDETRDetectionModel) else 'YOLO'
+    rss = rss_pico_inferencia(pesos, classe, imgsz)
+    return {
+        "parametros_m": sum(p.numel() for p in rede.parameters()) / 1e6,
+        "gflops": get_flops(rede, imgsz),
+        "tamanho_pesos_mb": Path(pesos).stat().st_size / 1024 ** 2,
+        "rss_pico_mb": rss['rss_pico'] / 1024 ** 2,
+        "rss_incremento_mb": (rss['rss_pico'] - rss['rss_base']) / 1024 ** 2,
+        "ativacoes_mb": memoria_ativacoes(rede, imgsz) / 1024 ** 2,
+    }
+
+
+class CacheCustoModelos:
+    """
+    Perfis de custo estático em cache, um JSON por (hash dos pesos, imgsz): o mesmo 'best.pt' só é
+    perfilado uma vez, mesmo que seja movido, renomeado ou reavaliado em outro split de teste.
+    """
+
+    def __init__(self, diretorio: Path):
+        self.diretorio = Path(diretorio)
+
+    def _caminho(self, pesos, imgsz: int) -> Path:
+        return self.diretorio / f"{hash_arquivo(pesos)}_{imgsz}px_v{VERSAO_PERFIL}.json"
+
+    def obter(self, pesos, imgsz: int) -> Dict[str, float]:
+        """Perfil do cache ou recém-medido (e gravado)."""
+        caminho = self._caminho(pesos, imgsz)
+        if caminho.is_file():
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+        perfil = perfilar_custo(pesos, imgsz)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_suffix('.json.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(perfil, f, indent=4)
+        temporario.replace(caminho)
+        return perfil
@@ -0,0 +1,227 @@
+import os
+import copy
+import time
+import queue
+import threading
+import multiprocessing
+from typing import List, Dict, Any, Optional, Callable
+
+import cv2
+import numpy as np
+import psutil
+import torch
+from ultralytics.nn.tasks import RTDETRDetectionModel
+
+from utils.latency_benchmark import resumir_latencias
+from utils.latency_profiler import preparar_rede, para_tensor, pos_processar, criar_letterbox, reescalar_caixas
+from utils.model_cache import carregar_modelo
+
+MODOS = ('threads_shared', 'threads_per_worker', 'processes')
+
+
+def nucleos_disponiveis() -> int:
+    """Núcleos que este processo pode usar (respeita a afinidade de CPU, quando o sistema a expõe)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def contagens_de_streams(maximo: int) -> List[int]:
+    """Potências de 2 até 'maximo', mais o próprio 'maximo': 1, 2, 4, ..., núcleos."""
+    contagens, n = [], 1
+    while n < maximo:
+        contagens.append(n)
+        n *= 2
+    return contagens + [maximo]
+
+
+def _decodificar(arquivos: List[str]) -> List[np.ndarray]:
+    imagens = [cv2.imread(str(a)) for a in arquivos]
+    imagens = [i for i in imagens if i is not None]
+    if not imagens:
+        raise ValueError("Nenhuma imagem legível para o benchmark.")
+    return imagens
+
+
+def _laco_stream(rede, rtdetr: bool, imagens: List[np.ndarray], config: Dict[str, Any], deslocamento: int,
+                 barreira) -> Dict[str, Any]:
+    """
+    Um stream: aquece, espera todos os streams na barreira e processa quadros por DURATION_S. Cada quadro
+    passa por letterbox, tensor, forward e NMS (a decodificação não entra: uma câmera entrega quadros
+    decodificados). Sem STREAM_FPS, o laço é fechado (próximo quadro assim que o anterior termina);
+    com STREAM_FPS, os quadros chegam no ritmo da câmera e, atrasado, o stream pula para o mais recente
+    (os intermediários são descartados), medindo a latência a partir da chegada do quadro.
+    """
+    letterbox = criar_letterbox(rede, config['IMG_SIZE'], rtdetr)
+
+    def processar(imagem):
+        with torch.inference_mode():
+            tensor = para_tensor(letterbox(image=imagem), rede)
+            deteccoes = pos_processar(rede(tensor), rtdetr, tensor.shape[2:], config)
+            reescalar_caixas(deteccoes, tensor.shape[2:], imagem.shape, rtdetr).cpu()
+
+    for i in range(config['WARMUP_FRAMES']):
+        processar(imagens[(deslocamento + i) % len(imagens)])
+    barreira.wait()
+
+    intervalo = 1.0 / config['STREAM_FPS'] if config['STREAM_FPS'] else None
+    inicio = time.perf_counter()
+    fim_previsto = inicio + config['DURATION_S']
+    latencias, descartados, quadro = [], 0, 0
+    agora = inicio
+    while agora < fim_previsto:
+        if intervalo is None:
+            chegada = agora
+        else:
+            # Quadro mais recente já entregue pela câmera; se nenhum novo chegou, espera o próximo.
+            disponivel = int((agora - inicio) / intervalo)
+            if disponivel < quadro:
+                time.sleep(inicio + quadro * intervalo - agora)
+                disponivel = quadro
+            descartados += disponivel - quadro
+            quadro = disponivel
+            chegada = inicio + quadro * intervalo
+        processar(imagens[(deslocamento + len(latencias)) % len(imagens)])
+        agora = time.perf_counter()
+        latencias.append((agora - chegada) * 1000)
+        quadro += 1
+    return {"latencias_ms": latencias, "descartados": descartados, "duracao_s": agora - inicio}
+
+
+def _stream_em_thread(rede, rtdetr, imagens, config, deslocamento, barreira, threads, resultados, indice):
+    try:
+        torch.set_num_threads(threads)
+        resultados[indice] = _laco_stream(rede, rtdetr, imagens, config, deslocamento, barreira)
+    except Exception as e:
+        barreira.abort()
+        resultados[indice] = e
+
+
+def _stream_em_processo(pesos, arquivos, config, deslocamento, barreira, threads, fila, indice):
+    """Processo 'spawn' com modelo e imagens próprios (nada é compartilhado com os demais streams)."""
+    try:
+        torch.set_num_threads(threads)
+        modelo = carregar_modelo(pesos)
+        rede = preparar_rede(modelo, config['IMG_SIZE'], config['DEVICE'])
+        rtdetr = isinstance(modelo.model, RTDETRDetectionModel)
+        fila.put((indice, _laco_stream(rede, rtdetr, _decodificar(arquivos), config, deslocamento, barreira)))
+    except Exception as e:
+        barreira.abort()
+        fila.put((indice, f"{type(e).__name__}: {e}"))
+
+
+class BenchmarkMultiStream:
+    """
+    N streams de inferência simultâneos sobre o mesmo modelo e as mesmas imagens reais, em três modos:
+    'threads_shared' (threads sobre uma única instância da rede), 'threads_per_worker' (uma cópia
+    da rede por thread) e 'processes' (um processo por stream, com modelo próprio). As threads de
+    cada stream são limitadas a THREADS_PER_WORKER (None = núcleos / N), para que N streams não
+    disputem mais núcleos que os existentes. A utilização de CPU é a do sistema durante a medição.
+    """
+
+    def __init__(self, pesos: str, arquivos: List[str], config: Dict[str, Any]):
+        self.pesos = str(pesos)
+        self.arquivos = [str(a) for a in arquivos]
+        self.config = config
+        self._rede = None
+        self._rtdetr = False
+        self._imagens: Optional[List[np.ndarray]] = None
+
+    def _preparar(self):
+        if self._rede is None:
+            modelo = carregar_modelo(self.pesos)
+            self._rede = preparar_rede(modelo, self.config['IMG_SIZE'], self.config['DEVICE'])
+            self._rtdetr = isinstance(modelo.model, RTDETRDetectionModel)
+            self._imagens = _decodificar(self.arquivos)
+
+    def _threads_por_stream(self, streams: int) -> int:
+        return self.config['THREADS_PER_WORKER'] or max(1, nucleos_disponiveis() // streams)
+
+    def _iniciar_threads(self, streams: int, threads: int, por_worker: bool, barreira) -> Callable[[], List[Any]]:
+        self._preparar()
+        resultados: List[Any] = [None] * streams
+        threads_originais = torch.get_num_threads()
+        torch.set_num_threads(threads)
+        workers = [threading.Thread(target=_stream_em_thread, daemon=True,
+                                    args=(copy.deepcopy(self._rede) if por_worker else self._rede, self._rtdetr,
+                                          self._imagens, self.config, i, barreira, threads, resultados, i))
+                   for i in range(streams)]
+        for worker in workers:
+            worker.start()
+
+        def coletar():
+            for worker in workers:
+                worker.join()
+            torch.set_num_threads(threads_originais)
+            return resultados
+        return coletar
+
+    def _iniciar_processos(self, streams: int, threads: int, barreira, contexto) -> Callable[[], List[Any]]:
+        fila = contexto.Queue()
+        processos = [contexto.Process(target=_stream_em_processo, daemon=True,
+                                      args=(self.pesos, self.arquivos, self.config, i, barreira, threads, fila, i))
+                     for i in range(streams)]
+        for processo in processos:
+            processo.start()
+
+        def coletar():
+            resultados: List[Any] = [None] * streams
+            try:
+                for _ in range(streams):
+                    indice, resultado = fila.get(timeout=self.config['DURATION_S'] + self.config['STARTUP_TIMEOUT_S'])
+                    resultados[indice] = resultado
+            except queue.Empty:
+                pass
+            finally:
+                for processo in processos:
+                    processo.join(timeout=5)
+                    if processo.is_alive():
+                        processo.terminate()
+            return resultados
+        return coletar
+
+    def executar(self, modo: str, streams: int) -> Dict[str, Any]:
+        """Mede um cenário (modo, N streams) e retorna uma linha de resultados agregados."""
+        if modo not in MODOS:
+            raise ValueError(f"Modo '{modo}' inválido. Opções: {MODOS}.")
+        threads = self._threads_por_stream(streams)
+        if modo == 'processes':
+            contexto = multiprocessing.get_context('spawn')
+            barreira = contexto.Barrier(streams + 1)
+            coletar = self._iniciar_processos(streams, threads, barreira, contexto)
+        else:
+            barreira = threading.Barrier(streams + 1)
+            coletar = self._iniciar_threads(streams, threads, modo == 'threads_per_worker', barreira)
+
+        try:
+            barreira.wait(timeout=self.config['STARTUP_TIMEOUT_S'])
+        except threading.BrokenBarrierError:
+            # Algum stream falhou antes de começar; o erro dele é reportado abaixo.
+            pass
+        psutil.cpu_percent(interval=None)
+        inicio = time.perf_counter()
+        resultados = coletar()
+        duracao = time.perf_counter() - inicio
+        cpu = psutil.cpu_percent(interval=None)
+
+        falhas = [r for r in resultados if not isinstance(r, dict)]
+        if falhas:
+            motivo = next((r for r in falhas if r is not None), "processo terminou sem resultado")
+            raise RuntimeError(f"{len(falhas)} de {streams} streams falharam: {motivo}")
+
+        quadros = sum(len(r['latencias_ms']) for r in resultados)
+        por_stream = [resumir_latencias(r['latencias_ms']) for r in resultados]
+        p99 = [s['latencia_p99_ms'] for s in por_stream]
+        return {
+            "modo": modo, "streams": streams, "threads_por_worker": threads,
+            "fps_alvo": self.config['STREAM_FPS'] or np.nan,
+            "duracao_s": duracao, "quadros": quadros,
+            "vazao_fps": quadros / duracao if duracao > 0 else 0.0,
+            "fps_medio_stream": float(np.mean([len(r['latencias_ms']) / r['duracao_s'] for r in resultados])),
+            "taxa_descarte": sum(r['descartados'] for r in resultados) /
+                             max(1, quadros + sum(r['descartados'] for r in resultados)),
+            "p50_medio_ms": float(np.mean([s['latencia_p50_ms'] for s in por_stream])),
+            "p99_medio_ms": float(np.mean(p99)),
+            "p99_pior_stream_ms": float(np.max(p99)),
+            "cpu_percentual": cpu,
+        }
@@ -0,0 +1,73 @@
+import math
+import pickle
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from ultralytics.data import build_dataloader
+
+
+def dataset_serializavel(dataset) -> bool:
+    """Workers do DataLoader exigem que o dataset seja serializável (obrigatório com 'spawn')."""
+    try:
+        pickle.dumps(dataset)
+        return True
+    except Exception:
+        return False
+
+
+class CarregadorEmThreads:
+    """
+    Substituto do DataLoader para datasets não serializáveis (ex.: RTDETRDataset): as amostras
+    de cada lote são decodificadas num pool de threads (o OpenCV libera o GIL na decodificação
+    e no redimensionamento), mantendo 'prefetch' lotes adiantados.
+    """
+
+    def __init__(self, dataset, batch_size: int, num_threads: int, prefetch: int = 2):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.num_threads = max(1, num_threads)
+        self.num_workers = 0
+        self.prefetch = prefetch
+
+    def __len__(self):
+        return math.ceil(len(self.dataset) / self.batch_size)
+
+    def __iter__(self):
+        total = len(self.dataset)
+        with ThreadPoolExecutor(self.num_threads) as executor:
+            em_andamento = deque()
+            for inicio in range(0, total, self.batch_size):
+                indices = range(inicio, min(inicio + self.batch_size, total))
+                em_andamento.append([executor.submit(self.dataset.__getitem__, i) for i in indices])
+                if len(em_andamento) > self.prefetch:
+                    yield self.dataset.collate_fn([f.result() for f in em_andamento.popleft()])
+            while em_andamento:
+                yield self.dataset.collate_fn([f.result() for f in em_andamento.popleft()])
+
+
+class CarregamentoParaleloMixin:
+    """
+    Mixin para validators do Ultralytics: usa workers de processo quando o dataset é
+    serializável e, caso contrário, o carregador em threads. Em ambos os casos a
+    decodificação das imagens deixa de ser sequencial.
+    """
+
+    carregamento_config: Dict[str, Any] = {}
+    descricao_carregador = "N/A"
+
+    def get_dataloader(self, dataset_path, batch_size):
+        dataset = self.build_dataset(dataset_path, batch=batch_size, mode="val")
+        workers = self.carregamento_config['DATALOADER_WORKERS']
+        if workers > 0 and dataset_serializavel(dataset):
+            self.descricao_carregador = f"processos({workers})"
+            return build_dataloader(dataset, batch_size, workers, shuffle=False, rank=-1)
+        self.descricao_carregador = f"threads({max(1, workers)})"
+        return CarregadorEmThreads(dataset, batch_size, workers)
+
+
+def criar_validador_paralelo(model, config: Dict[str, Any]):
+    """Cria, a partir do validator padrão da tarefa do modelo, uma subclasse com carregamento paralelo."""
+    validador_base = model.task_map[model.task]['validator']
+    return type(f"{validador_base.__name__}CarregamentoParalelo", (CarregamentoParaleloMixin, validador_base),
+                {'carregamento_config': dict(config)})
@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+ARQUIVO_PREDICOES = 'predicoes.parquet'
+ARQUIVO_GABARITO = 'gabarito.parquet'
+ARQUIVO_IMAGENS = 'imagens.parquet'
+ARQUIVO_METADADOS = 'metadados.json'
+
+
+def _para_numpy(valor) -> np.ndarray:
+    return valor.detach().cpu().numpy() if hasattr(valor, 'detach') else np.asarray(valor)
+
+
+def _separar_predicao(pred) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Caixas xyxy, confiança e classe, tanto no formato de dicionário quanto no tensor (N, 6)."""
+    if isinstance(pred, dict):
+        return _para_numpy(pred['bboxes']), _para_numpy(pred['conf']), _para_numpy(pred['cls'])
+    pred = _para_numpy(pred)
+    return pred[:, :4], pred[:, 4], pred[:, 5]
+
+
+class ArmazenamentoPredicoesMixin:
+    """
+    Mixin para validators do Ultralytics que grava as predições brutas por imagem e o gabarito
+    correspondente em Parquet ('<save_dir>/predicoes'), no mesmo espaço de coordenadas usado
+    pelo Ultralytics no cálculo das métricas. Com isso, novas métricas (outros limiares de IoU
+    ou de confiança) são recalculadas com 'utils.detection_metrics' sem repetir a inferência.
+    """
+
+    def _iniciar_armazenamento(self):
+        if not hasattr(self, '_lotes_predicoes'):
+            self._lotes_predicoes, self._lotes_gabarito, self._imagens = [], [], []
+            self._pendentes_batch, self._pendentes_pred = [], []
+
+    def _prepare_batch(self, si, batch):
+        pbatch = super()._prepare_batch(si, batch)
+        self._iniciar_armazenamento()
+        self._pendentes_batch.append((pbatch, batch['im_file'][si], batch['ori_shape'][si]))
+        return pbatch
+
+    def _prepare_pred(self, *args, **kwargs):
+        predn = super()._prepare_pred(*args, **kwargs)
+        self._iniciar_armazenamento()
+        self._pendentes_pred.append(predn)
+        return predn
+
+    def update_metrics(self, preds, batch):
+        self._iniciar_armazenamento()
+        super().update_metrics(preds, batch)
+        if len(self._pendentes_pred) != len(self._pendentes_batch):
+            # Versões que pulam '_prepare_pred' em imagens sem predições: usa as predições do lote.
+            self._pendentes_pred = list(preds)
+        for (pbatch, arquivo, ori_shape), predn in zip(self._pendentes_batch, self._pendentes_pred):
+            imagem = len(self._imagens)
+            self._imagens.append((imagem, str(arquivo), int(ori_shape[0]), int(ori_shape[1])))
+
+            caixas, conf, classes = _separar_predicao(predn)
+            self._lotes_predicoes.append(np.column_stack([
+                np.full(len(conf), imagem), caixas.reshape(-1, 4), conf, classes]).astype(np.float32))
+
+            caixas_gt = _para_numpy(pbatch['bboxes']).reshape(-1, 4)
+            classes_gt = _para_numpy(pbatch['cls']).reshape(-1)
+            self._lotes_gabarito.append(np.column_stack([
+                np.full(len(classes_gt), imagem), caixas_gt, classes_gt]).astype(np.float32))
+        self._pendentes_batch, self._pendentes_pred = [], []
+
+    def finalize_metrics(self, *args, **kwargs):
+        super().finalize_metrics(*args, **kwargs)
+        self._iniciar_armazenamento()
+        salvar_predicoes(Path(self.save_dir) / 'predicoes', self._lotes_predicoes, self._lotes_gabarito,
+                         self._imagens, {
+                             "nomes_classes": {int(k): v for k, v in self.names.items()},
+                             "metricas_ultralytics": {
+                                 "mAP50": float(self.metrics.box.map50),
+                                 "mAP75": float(self.metrics.box.map75),
+                                 "mAP50_95": float(self.metrics.box.map),
+                                 "precisao": float(self.metrics.box.mp),
+                                 "recall": float(self.metrics.box.mr),
+                             },
+                         })
+
+
+def salvar_predicoes(diretorio: Path, lotes_predicoes, lotes_gabarito, imagens, metadados: Dict[str, Any]):
+    """Grava as três tabelas (predições, gabarito, imagens) e os metadados do armazenamento."""
+    diretorio.mkdir(parents=True, exist_ok=True)
+    colunas = ['imagem', 'x1', 'y1', 'x2', 'y2']
+    predicoes = np.concatenate(lotes_predicoes) if lotes_predicoes else np.zeros((0, 7), dtype=np.float32)
+    gabarito = np.concatenate(lotes_gabarito) if lotes_gabarito else np.zeros((0, 6), dtype=np.float32)
+
+    df_pred = pd.DataFrame(predicoes, columns=colunas + ['conf', 'classe'])
+    df_gab = pd.DataFrame(gabarito, columns=colunas + ['classe'])
+    for df in (df_pred, df_gab):
+        df['imagem'] = df['imagem'].astype(np.int32)
+        df['classe'] = df['classe'].astype(np.int16)
+
+    df_pred.to_parquet(diretorio / ARQUIVO_PREDICOES, index=False, compression='zstd')
+    df_gab.to_parquet(diretorio / ARQUIVO_GABARITO, index=False, compression='zstd')
+    pd.DataFrame(imagens, columns=['imagem', 'arquivo', 'altura', 'largura']).to_parquet(
+        diretorio / ARQUIVO_IMAGENS, index=False, compression='zstd')
+    with open(diretorio / ARQUIVO_METADADOS, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=4, ensure_ascii=False)
+
+
+def carregar_predicoes(diretorio: Path):
+    """Retorna (predicoes, gabarito, metadados) de um armazenamento gravado pelo avaliador."""
+    diretorio = Path(diretorio)
+    with open(diretorio / ARQUIVO_METADADOS, 'r', encoding='utf-8') as f:
+        metadados = json.load(f)
+    metadados['nomes_classes'] = {int(k): v for k, v in metadados.get('nomes_classes', {}).items()}
+    return (pd.read_parquet(diretorio / ARQUIVO_PREDICOES), pd.read_parquet(diretorio / ARQUIVO_GABARITO),
+            metadados)
+
+
+def criar_validador_com_predicoes(validador_base):
+    """Subclasse de um validator (padrão ou já estendido) que também grava o armazenamento de predições."""
+    return type(f"{validador_base.__name__}Predicoes", (ArmazenamentoPredicoesMixin, validador_base), {})
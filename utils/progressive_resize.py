@@ -0,0 +1,83 @@
+from typing import List, Dict, Any, Tuple
+
+
+def calcular_estagios(agenda: List[Tuple[int, float]], num_epocas: int) -> List[Tuple[int, int]]:
+    """
+    Converte a agenda [(imgsz, fração das épocas), ...] em [(imgsz, épocas), ...].
+    O último estágio recebe as épocas restantes, garantindo que a soma seja 'num_epocas'.
+    """
+    if not agenda:
+        raise ValueError("PROGRESSIVE_RESIZE_SCHEDULE está vazio.")
+
+    estagios = []
+    restantes = num_epocas
+    for imgsz, fracao in agenda[:-1]:
+        epocas = max(1, round(fracao * num_epocas))
+        epocas = min(epocas, restantes - 1)
+        if epocas <= 0:
+            break
+        estagios.append((int(imgsz), epocas))
+        restantes -= epocas
+    estagios.append((int(agenda[-1][0]), restantes))
+    return estagios
+
+
+def taxas_do_estagio(estagios: List[Tuple[int, int]], indice: int, lr0: float, lrf: float) -> Tuple[float, float]:
+    """
+    (lr0, lrf) do estágio 'indice' para que a sequência de estágios siga a mesma agenda linear
+    de taxa de aprendizado de um treino único de sum(épocas) épocas: cada estágio começa na taxa
+    em que o anterior terminou e o último termina em lr0 * lrf.
+    """
+    total = sum(epocas for _, epocas in estagios)
+    inicio = sum(epocas for _, epocas in estagios[:indice])
+    fim = inicio + estagios[indice][1]
+
+    def fator(epoca: int) -> float:
+        return (1 - epoca / total) * (1.0 - lrf) + lrf
+
+    return lr0 * fator(inicio), fator(fim) / fator(inicio)
+
+
+def descrever_agenda(estagios: List[Tuple[int, int]]) -> str:
+    """Representação compacta usada no relatório, ex.: '320x25>480x25>640x50'."""
+    return '>'.join(f"{imgsz}x{epocas}" for imgsz, epocas in estagios)
+
+
+def eh_job_padrao(resultado: Dict[str, Any]) -> bool:
+    """Job de referência: tamanho fixo, sem backbone congelado e sem destilação."""
+    return (resultado.get('Resize_Schedule') == 'fixed'
+            and resultado.get('Frozen_Backbone_Step_Ratio_Est', 'N/A') == 'N/A'
+            and resultado.get('Teacher', 'N/A') == 'N/A')
+
+
+def comparar_com_tamanho_fixo(resultados: List[Dict[str, Any]], chave_nome: str) -> List[Dict[str, Any]]:
+    """
+    Emparelha cada job de resolução progressiva com o job de tamanho fixo do mesmo
+    modelo base e dataset, comparando tempo de parede e mAP50-95 final. Só entram jobs
+    'Completed': um job interrompido antecipadamente pararia num ponto arbitrário da curva.
+    """
+    concluidos = [r for r in resultados if r.get('Status') == 'Completed']
+    fixos = {(r['Base_Model'], r['Dataset']): r for r in concluidos if eh_job_padrao(r)}
+
+    comparativo = []
+    for progressivo in concluidos:
+        if progressivo.get('Resize_Schedule') == 'fixed' or progressivo.get('Teacher', 'N/A') != 'N/A':
+            continue
+        fixo = fixos.get((progressivo['Base_Model'], progressivo['Dataset']))
+        if fixo is None:
+            continue
+        tempo_fixo = fixo['Training_Time_Min']
+        tempo_progressivo = progressivo['Training_Time_Min']
+        comparativo.append({
+            "Fixed_Job": fixo[chave_nome],
+            "Progressive_Job": progressivo[chave_nome],
+            "Dataset": progressivo['Dataset'],
+            "Resize_Schedule": progressivo['Resize_Schedule'],
+            "Fixed_mAP50_95": fixo['mAP50_95'],
+            "Progressive_mAP50_95": progressivo['mAP50_95'],
+            "Delta_mAP50_95": progressivo['mAP50_95'] - fixo['mAP50_95'],
+            "Fixed_Time_Min": tempo_fixo,
+            "Progressive_Time_Min": tempo_progressivo,
+            "Time_Saved_Pct": 100.0 * (tempo_fixo - tempo_progressivo) / tempo_fixo if tempo_fixo > 0 else 0.0,
+        })
+    return comparativo
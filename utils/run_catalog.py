@@ -0,0 +1,197 @@
+import os
+import re
+import json
+import sqlite3
+import datetime
+from contextlib import closing
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+from config.paths import RUNS_DIR, RUN_CATALOG_PATH
+from utils.file_hashing import hash_arquivo
+
+ARQUIVO_METADADOS_RUN = 'run_metadata.json'
+VERSAO_METADADOS = 1
+
+PADRAO_RUN = re.compile(
+    r'^(?P<modelo>[^_]+)_(?P<parametros>.+)_on_(?P<dataset>.+)_(?P<timestamp>\d{2}-\d{2}-\d{4}_\d{2}-\d{2}-\d{2})$')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    nome_run TEXT PRIMARY KEY,
+    caminho TEXT NOT NULL,
+    modelo TEXT,
+    dataset TEXT,
+    data_run TEXT,
+    status TEXT,
+    caminho_pesos TEXT,
+    hash_pesos TEXT,
+    origem TEXT NOT NULL,
+    assinatura TEXT NOT NULL,
+    metadados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_modelo ON runs (modelo);
+CREATE INDEX IF NOT EXISTS idx_runs_dataset ON runs (dataset);
+CREATE INDEX IF NOT EXISTS idx_runs_data ON runs (data_run);
+"""
+
+
+def gravar_metadados_run(run_dir: Path, metadados: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Grava o 'run_metadata.json' de um run (modelo, dataset, configuração, datas e hashes do
+    'best.pt' e do data.yaml). Chamado pelos scripts de treino ao final de cada job.
+    """
+    run_dir = Path(run_dir)
+    pesos = run_dir / 'weights' / 'best.pt'
+    data_config = metadados.get('data_config')
+    metadados = {
+        "versao": VERSAO_METADADOS,
+        "nome_run": run_dir.name,
+        **metadados,
+        "hash_pesos": hash_arquivo(pesos) if pesos.is_file() else None,
+        "hash_data_yaml": hash_arquivo(data_config) if data_config and Path(data_config).is_file() else None,
+        "gravado_em": datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    run_dir.mkdir(parents=True, exist_ok=True)
+    with open(run_dir / ARQUIVO_METADADOS_RUN, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=4, ensure_ascii=False, default=str)
+    return metadados
+
+
+def _metadados_pelo_nome(run_dir: Path) -> Dict[str, Any]:
+    """Runs anteriores ao sidecar: modelo, dataset e data inferidos do nome do diretório."""
+    partes = PADRAO_RUN.match(run_dir.name)
+    if not partes:
+        return {"nome_run": run_dir.name, "modelo": None, "dataset": None, "inicio": None}
+    data_run = datetime.datetime.strptime(partes['timestamp'], '%d-%m-%Y_%H-%M-%S')
+    return {"nome_run": run_dir.name, "modelo": partes['modelo'], "parametros": partes['parametros'],
+            "dataset": partes['dataset'], "inicio": data_run.isoformat(timespec='seconds')}
+
+
+def _assinatura(run_dir: Path) -> str:
+    """Muda quando o sidecar ou o 'best.pt' mudam; só runs com assinatura nova são relidos."""
+    partes = []
+    for arquivo in (run_dir / ARQUIVO_METADADOS_RUN, run_dir / 'weights' / 'best.pt'):
+        try:
+            estado = arquivo.stat()
+            partes.append(f"{estado.st_mtime_ns}:{estado.st_size}")
+        except FileNotFoundError:
+            partes.append('-')
+    return '|'.join(partes)
+
+
+class CatalogoRuns:
+    """
+    Catálogo SQLite dos runs de treino, indexado por modelo, dataset e data. Cada run entra a
+    partir do seu 'run_metadata.json' (ou, em runs antigos, do nome do diretório) e só é relido
+    quando o sidecar ou os pesos mudam; consultas não percorrem nem interpretam RUNS_DIR.
+    """
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.executescript(ESQUEMA)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        conexao.row_factory = sqlite3.Row
+        return conexao
+
+    @staticmethod
+    def _linha(run_dir: Path, assinatura: str) -> tuple:
+        arquivo = run_dir / ARQUIVO_METADADOS_RUN
+        if arquivo.is_file():
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                metadados, origem = json.load(f), 'metadados'
+        else:
+            metadados, origem = _metadados_pelo_nome(run_dir), 'nome'
+        pesos = run_dir / 'weights' / 'best.pt'
+        return (run_dir.name, str(run_dir), metadados.get('modelo'), metadados.get('dataset'),
+                metadados.get('inicio'), metadados.get('status'), str(pesos) if pesos.is_file() else None,
+                metadados.get('hash_pesos'), origem, assinatura, json.dumps(metadados, ensure_ascii=False))
+
+    def _gravar(self, conexao: sqlite3.Connection, linhas: Iterable[tuple]):
+        conexao.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas)
+
+    def registrar(self, run_dir: Path):
+        """Insere ou atualiza um único run (usado pelos treinos logo após gravar o sidecar)."""
+        run_dir = Path(run_dir)
+        with closing(self._conectar()) as conexao, conexao:
+            self._gravar(conexao, [self._linha(run_dir, _assinatura(run_dir))])
+
+    def sincronizar(self, runs_dir: Path) -> Dict[str, int]:
+        """
+        Atualização incremental a partir de RUNS_DIR: uma listagem do diretório e um 'stat' por
+        run; apenas runs novos ou alterados são lidos, e runs removidos saem do catálogo.
+        """
+        runs_dir = Path(runs_dir)
+        atuais = {e.name: Path(e.path) for e in os.scandir(runs_dir) if e.is_dir()} if runs_dir.is_dir() else {}
+        with closing(self._conectar()) as conexao, conexao:
+            conhecidos = dict(conexao.execute("SELECT nome_run, assinatura FROM runs").fetchall())
+            alterados = []
+            for nome, run_dir in atuais.items():
+                assinatura = _assinatura(run_dir)
+                if conhecidos.get(nome) != assinatura:
+                    alterados.append(self._linha(run_dir, assinatura))
+            self._gravar(conexao, alterados)
+            removidos = [(nome,) for nome in conhecidos if nome not in atuais]
+            conexao.executemany("DELETE FROM runs WHERE nome_run = ?", removidos)
+        return {"runs": len(atuais), "atualizados": len(alterados), "removidos": len(removidos)}
+
+    def consultar(self, modelos: Optional[List[str]] = None, datasets: Optional[List[str]] = None,
+                  desde: Optional[str] = None, ate: Optional[str] = None,
+                  somente_com_pesos: bool = True) -> List[Dict[str, Any]]:
+        """
+        Runs filtrados por modelo e dataset (sem distinção de maiúsculas, ex.: 'yolov8n' encontra
+        'YOLOv8n') e por intervalo de datas (ISO, ex.: '2025-11-01'), em ordem de nome. Cada item
+        traz as colunas do catálogo e o dicionário completo de 'metadados'.
+        """
+        condicoes, parametros = [], []
+        for coluna, valores in (('modelo', modelos), ('dataset', datasets)):
+            if valores:
+                condicoes.append(f"LOWER({coluna}) IN ({', '.join('?' * len(valores))})")
+                parametros.extend(v.lower() for v in valores)
+        if desde:
+            condicoes.append("data_run >= ?")
+            parametros.append(desde)
+        if ate:
+            # Datas sem horário incluem o dia inteiro.
+            condicoes.append("data_run <= ?")
+            parametros.append(ate if 'T' in ate else f"{ate}T23:59:59")
+        if somente_com_pesos:
+            condicoes.append("caminho_pesos IS NOT NULL")
+        sql = "SELECT * FROM runs" + (f" WHERE {' AND '.join(condicoes)}" if condicoes else "") + " ORDER BY nome_run"
+
+        with closing(self._conectar()) as conexao:
+            linhas = conexao.execute(sql, parametros).fetchall()
+        return [{**dict(linha), "metadados": json.loads(linha['metadados'])} for linha in linhas]
+
+
+def mais_recentes(registros: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Apenas o run mais recente de cada (modelo, dataset) de uma consulta ao catálogo, em ordem de nome."""
+    escolhidos: Dict[tuple, Dict[str, Any]] = {}
+    for registro in registros:
+        chave = (registro['modelo'], registro['dataset'])
+        if chave not in escolhidos or (registro['data_run'] or '') > (escolhidos[chave]['data_run'] or ''):
+            escolhidos[chave] = registro
+    return sorted(escolhidos.values(), key=lambda r: r['nome_run'])
+
+
+def resolver_pesos(config: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Pesos de um script de inferência: 'WEIGHTS' do config, se existir, ou o run mais recente do catálogo
+    que passa por FILTER_MODELS/FILTER_DATASETS. Retorna {"caminho", "nome"} ou None.
+    """
+    if config['WEIGHTS']:
+        pesos = Path(config['WEIGHTS'])
+        nome = pesos.parent.parent.name if pesos.parent.name == 'weights' else pesos.stem
+        return {"caminho": str(pesos), "nome": nome} if pesos.is_file() else None
+
+    catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+    catalogo.sincronizar(Path(RUNS_DIR))
+    registros = catalogo.consultar(modelos=config['FILTER_MODELS'], datasets=config['FILTER_DATASETS'])
+    if not registros:
+        return None
+    registro = max(registros, key=lambda r: r['data_run'] or '')
+    return {"caminho": registro['caminho_pesos'], "nome": registro['nome_run']}
@@ -0,0 +1,122 @@
+import time
+from typing import List, Tuple, Dict, Any
+
+import numpy as np
+import torch
+from torchvision.ops import batched_nms
+
+from utils.detection_metrics import iou_caixas
+
+
+def gerar_janelas(altura: int, largura: int, tamanho: int, sobreposicao: float) -> List[Tuple[int, int, int, int]]:
+    """
+    Janelas (x0, y0, x1, y1) de 'tamanho' pixels que cobrem a imagem com a sobreposição pedida.
+    A última janela de cada eixo é encostada na borda, de modo que todas têm o mesmo tamanho
+    (quando a imagem é menor que o tile, a janela é a própria imagem).
+    """
+    passo = max(1, int(tamanho * (1 - sobreposicao)))
+
+    def inicios(total):
+        if total <= tamanho:
+            return [0]
+        posicoes = list(range(0, total - tamanho, passo))
+        return posicoes + [total - tamanho]
+
+    return [(x0, y0, min(x0 + tamanho, largura), min(y0 + tamanho, altura))
+            for y0 in inicios(altura) for x0 in inicios(largura)]
+
+
+def fundir_wbf(caixas: np.ndarray, conf: np.ndarray, classes: np.ndarray,
+               limiar_iou: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Weighted Boxes Fusion por classe: em ordem decrescente de confiança, cada caixa entra no
+    grupo cuja caixa fundida tem IoU >= limiar (ou inicia um novo); a caixa fundida é a média
+    das coordenadas ponderada pela confiança e a confiança é a média do grupo.
+    """
+    saida_caixas, saida_conf, saida_classes = [], [], []
+    for classe in np.unique(classes):
+        mascara = classes == classe
+        ordem = np.argsort(-conf[mascara])
+        c_caixas, c_conf = caixas[mascara][ordem], conf[mascara][ordem]
+        fundidas, somas, pesos, membros = [], [], [], []
+        for caixa, confianca in zip(c_caixas, c_conf):
+            if fundidas:
+                iou = iou_caixas(caixa[None], np.asarray(fundidas))[0]
+                melhor = int(iou.argmax())
+                if iou[melhor] >= limiar_iou:
+                    somas[melhor] += caixa * confianca
+                    pesos[melhor] += confianca
+                    membros[melhor].append(confianca)
+                    fundidas[melhor] = somas[melhor] / pesos[melhor]
+                    continue
+            fundidas.append(caixa.astype(np.float64))
+            somas.append(caixa * confianca)
+            pesos.append(confianca)
+            membros.append([confianca])
+        saida_caixas.extend(fundidas)
+        saida_conf.extend(float(np.mean(m)) for m in membros)
+        saida_classes.extend([classe] * len(fundidas))
+    return (np.asarray(saida_caixas, dtype=np.float32).reshape(-1, 4), np.asarray(saida_conf, dtype=np.float32),
+            np.asarray(saida_classes))
+
+
+def fundir_deteccoes(caixas: np.ndarray, conf: np.ndarray, classes: np.ndarray, metodo: str,
+                     limiar_iou: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Funde as detecções de todos os tiles (e da imagem inteira) com NMS ou WBF, ambos por classe."""
+    if not len(caixas):
+        return caixas, conf, classes
+    if metodo == 'wbf':
+        return fundir_wbf(caixas, conf, classes, limiar_iou)
+    manter = batched_nms(torch.from_numpy(caixas).float(), torch.from_numpy(conf).float(),
+                         torch.from_numpy(classes).long(), limiar_iou).numpy()
+    return caixas[manter], conf[manter], classes[manter]
+
+
+def _extrair(resultado) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    caixas = resultado.boxes
+    return (caixas.xyxy.cpu().numpy(), caixas.conf.cpu().numpy(), caixas.cls.cpu().numpy().astype(np.int64))
+
+
+def inferir_fatiado(modelo, imagens: List[np.ndarray], config: Dict[str, Any],
+                    device: str) -> Tuple[List[Tuple[np.ndarray, np.ndarray, np.ndarray]], Dict[str, float]]:
+    """
+    Inferência fatiada de um grupo de imagens (BGR, resolução original). Os tiles de todas as
+    imagens do grupo são enfileirados juntos e enviados ao modelo em lotes de TILES_PER_BATCH
+    (um passe por lote, não por tile); opcionalmente a imagem inteira também é inferida, para
+    os objetos grandes. As detecções voltam às coordenadas originais e são fundidas por imagem.
+    Retorna, por imagem, (caixas xyxy, confiança, classe) e um resumo com número de tiles e tempo.
+    """
+    inicio = time.perf_counter()
+    parametros = dict(conf=config['CONF_THRESHOLD'], iou=config['NMS_IOU'], device=device, verbose=False)
+    tiles, origem = [], []
+    for indice, imagem in enumerate(imagens):
+        for x0, y0, x1, y1 in gerar_janelas(imagem.shape[0], imagem.shape[1], config['TILE_SIZE'], config['OVERLAP']):
+            tiles.append(imagem[y0:y1, x0:x1])
+            origem.append((indice, x0, y0))
+
+    deteccoes = [([], [], []) for _ in imagens]
+    lote = config['TILES_PER_BATCH']
+    for inicio_lote in range(0, len(tiles), lote):
+        resultados = modelo.predict(tiles[inicio_lote:inicio_lote + lote], imgsz=config['TILE_SIZE'], **parametros)
+        for (indice, x0, y0), resultado in zip(origem[inicio_lote:inicio_lote + lote], resultados):
+            caixas, conf, classes = _extrair(resultado)
+            deteccoes[indice][0].append(caixas + np.array([x0, y0, x0, y0], dtype=caixas.dtype))
+            deteccoes[indice][1].append(conf)
+            deteccoes[indice][2].append(classes)
+
+    if config['INCLUDE_FULL_IMAGE']:
+        for indice, resultado in enumerate(modelo.predict(imagens, imgsz=config['FULL_IMAGE_SIZE'], **parametros)):
+            for lista, valores in zip(deteccoes[indice], _extrair(resultado)):
+                lista.append(valores)
+
+    fundidas = []
+    for caixas, conf, classes in deteccoes:
+        caixas, conf, classes = fundir_deteccoes(
+            np.concatenate(caixas).astype(np.float32) if caixas else np.zeros((0, 4), dtype=np.float32),
+            np.concatenate(conf).astype(np.float32) if conf else np.zeros(0, dtype=np.float32),
+            np.concatenate(classes) if classes else np.zeros(0, dtype=np.int64),
+            config['MERGE_METHOD'], config['MERGE_IOU'])
+        # Mesmo teto de detecções por imagem do Ultralytics ('max_det').
+        ordem = np.argsort(-conf, kind='stable')[:config['MAX_DETECTIONS']]
+        fundidas.append((caixas[ordem], conf[ordem], classes[ordem]))
+    return fundidas, {"tiles": len(tiles), "tempo_s": time.perf_counter() - inicio}
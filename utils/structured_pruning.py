@@ -0,0 +1,47 @@
+import copy
+
+import torch
+import torch_pruning as tp
+from ultralytics.nn.modules import Detect, RTDETRDecoder, AIFI
+
+# Camadas preservadas na poda: cabeças de detecção (a saída precisa manter nc/reg_max)
+# e a atenção do RT-DETR, cujas projeções de Q/K/V não são podadas de forma consistente.
+CAMADAS_PRESERVADAS = (Detect, RTDETRDecoder, AIFI)
+
+
+def contar_parametros(modulo: torch.nn.Module) -> int:
+    return sum(p.numel() for p in modulo.parameters())
+
+
+def podar_modulo(modulo_base: torch.nn.Module, razao: float, imgsz: int, device) -> torch.nn.Module:
+    """
+    Poda estrutural de canais (magnitude L2) de uma cópia do modelo. As dependências entre
+    camadas (concatenações, splits, resíduos) são resolvidas pelo grafo do torch-pruning.
+    """
+    modulo = copy.deepcopy(modulo_base).float().to(device).eval()
+    for parametro in modulo.parameters():
+        parametro.requires_grad_(True)
+
+    exemplo = torch.randn(1, 3, imgsz, imgsz, device=device)
+    ignoradas = [m for m in modulo.modules() if isinstance(m, CAMADAS_PRESERVADAS)]
+    podador = tp.pruner.MagnitudePruner(
+        modulo, exemplo,
+        importance=tp.importance.MagnitudeImportance(p=2),
+        pruning_ratio=razao,
+        ignored_layers=ignoradas,
+        round_to=8,
+    )
+    podador.step()
+    return modulo
+
+
+def _get_model_podado(self, cfg=None, weights=None, verbose=True):
+    # O módulo podado já chega pronto em 'weights'; reconstruí-lo a partir do YAML
+    # restauraria a arquitetura original e descartaria a poda.
+    return weights
+
+
+def criar_trainer_podado(model):
+    """Subclasse do trainer padrão da tarefa que ajusta o módulo podado em vez de reconstruí-lo."""
+    trainer_base = model.task_map[model.task]['trainer']
+    return type(f"{trainer_base.__name__}Podado", (trainer_base,), {'get_model': _get_model_podado})
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import shutil
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import torch
+from ultralytics.cfg import get_cfg
+from ultralytics.data import build_yolo_dataset
+from ultralytics.data.augment import LetterBox
+from ultralytics.data.utils import check_det_dataset, IMG_FORMATS
+from ultralytics.utils import __version__ as ultralytics_version
+
+from utils.file_hashing import assinatura_arquivos
+
+ARQUIVO_TENSORES = 'tensores.u8'
+ARQUIVO_INDICE = 'indice.npz'
+ARQUIVO_METADADOS = 'metadados.json'
+
+
+def _ler_metadados(diretorio: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(diretorio / ARQUIVO_METADADOS, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class LeitorTensores:
+    """
+    Acesso às imagens pré-processadas de um cache via memória mapeada. Serializável: apenas o
+    diretório é enviado aos workers do DataLoader, que reabrem o mapeamento sob demanda.
+    """
+
+    def __init__(self, diretorio: Path):
+        self.diretorio = Path(diretorio)
+        self._dados = None
+        self._indice = None
+
+    def __getstate__(self):
+        return {"diretorio": self.diretorio, "_dados": None, "_indice": None}
+
+    def _abrir(self):
+        if self._dados is None:
+            indice = np.load(self.diretorio / ARQUIVO_INDICE, allow_pickle=False)
+            self._indice = {
+                "posicao": {str(a): i for i, a in enumerate(indice['arquivos'])},
+                "deslocamentos": indice['deslocamentos'], "formas": indice['formas'],
+                "formas_originais": indice['formas_originais'],
+            }
+            self._dados = np.memmap(self.diretorio / ARQUIVO_TENSORES, dtype=np.uint8, mode='r')
+
+    def __len__(self):
+        self._abrir()
+        return len(self._indice['formas'])
+
+    def imagem(self, posicao: int) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]:
+        """Mesmo retorno de 'BaseDataset.load_image': (imagem BGR, (h0, w0), (h, w))."""
+        self._abrir()
+        forma = tuple(int(v) for v in self._indice['formas'][posicao])
+        inicio = int(self._indice['deslocamentos'][posicao])
+        # Cópia: as transformações do Ultralytics podem escrever na imagem e o mapeamento é somente leitura.
+        im = np.array(self._dados[inicio:inicio + int(np.prod(forma))]).reshape(forma)
+        h0, w0 = (int(v) for v in self._indice['formas_originais'][posicao])
+        return im, (h0, w0), forma[:2]
+
+    def posicao(self, arquivo: str) -> Optional[int]:
+        self._abrir()
+        return self._indice['posicao'].get(str(Path(arquivo).resolve()))
+
+
+class CarregarImagemDoCache:
+    """
+    Substitui 'load_image' de uma instância de dataset: imagens presentes no cache vêm da memória
+    mapeada, as demais (ou chamadas com argumentos não padrão) seguem pelo método original.
+    """
+
+    def __init__(self, leitor: LeitorTensores, dataset):
+        self.leitor = leitor
+        self.dataset = dataset
+        # Função da classe, não o método ligado: após a serialização, 'dataset.load_image' seria este objeto.
+        self.original = type(dataset).load_image
+
+    def __call__(self, i, *args, **kwargs):
+        posicao = None if (args or kwargs) else self.leitor.posicao(self.dataset.im_files[i])
+        if posicao is None:
+            return self.original(self.dataset, i, *args, **kwargs)
+        return self.leitor.imagem(posicao)
+
+
+class CacheTensoresTeste:
+    """
+    Cache em disco, compartilhado por todos os modelos, das imagens de teste já decodificadas e
+    redimensionadas pelo próprio dataset do Ultralytics, um por (arquivos do split, imgsz, classe
+    do dataset, versão do Ultralytics). As imagens ficam concatenadas num único arquivo uint8 lido
+    por memória mapeada. Ao criar um cache novo, os mais antigos (pelo último uso) são removidos
+    até que o total caiba no orçamento de disco.
+    """
+
+    def __init__(self, raiz: Path, limite_bytes: int):
+        self.raiz = Path(raiz)
+        self.limite_bytes = limite_bytes
+
+    @staticmethod
+    def _nome(dataset) -> str:
+        assinatura = assinatura_arquivos(dataset.im_files)[:16]
+        nome_dataset = Path(dataset.im_files[0]).resolve().parents[2].name if dataset.im_files else 'vazio'
+        return f"{nome_dataset}_{assinatura}_{dataset.imgsz}px_{type(dataset).__name__}"
+
+    def preparar(self, dataset, num_threads: int) -> Tuple[LeitorTensores, Dict[str, Any]]:
+        """
+        Garante o cache do dataset e instala o carregamento a partir dele. Retorna o leitor e um
+        resumo com 'reutilizado' e 'tempo_decodificacao_economizado_s' (o tempo de decodificação
+        registrado na construção, que esta avaliação deixa de gastar).
+        """
+        diretorio = self.raiz / self._nome(dataset)
+        metadados = _ler_metadados(diretorio)
+        reutilizado = metadados is not None and metadados.get('versao_ultralytics') == ultralytics_version
+        if not reutilizado:
+            metadados = self._construir(dataset, diretorio, num_threads)
+        self._registrar_uso(diretorio, metadados)
+        self._aplicar_orcamento(manter=diretorio)
+
+        leitor = LeitorTensores(diretorio)
+        dataset.load_image = CarregarImagemDoCache(leitor, dataset)
+        return leitor, {
+            "diretorio": str(diretorio),
+            "reutilizado": reutilizado,
+            "tempo_construcao_s": 0.0 if reutilizado else metadados['tempo_construcao_s'],
+            "tempo_decodificacao_economizado_s": metadados['tempo_decodificacao_s'] if reutilizado else 0.0,
+        }
+
+    def _construir(self, dataset, diretorio: Path, num_threads: int) -> Dict[str, Any]:
+        """Decodifica as imagens em paralelo (o OpenCV libera o GIL) e grava tudo num único arquivo."""
+        inicio = time.perf_counter()
+        temporario = diretorio.with_name(f"{diretorio.name}.tmp{os.getpid()}")
+        shutil.rmtree(temporario, ignore_errors=True)
+        temporario.mkdir(parents=True)
+
+        def decodificar(i):
+            t0 = time.perf_counter()
+            im, forma_original, _ = dataset.load_image(i)
+            return np.ascontiguousarray(im), forma_original, time.perf_counter() - t0
+
+        deslocamentos, formas, formas_originais, tempo_decodificacao, posicao = [], [], [], 0.0, 0
+        with open(temporario / ARQUIVO_TENSORES, 'wb') as f, ThreadPoolExecutor(max(1, num_threads)) as executor:
+            for im, forma_original, duracao in executor.map(decodificar, range(len(dataset.im_files))):
+                if im.ndim == 2:
+                    im = im[:, :, None]
+                f.write(im.tobytes())
+                deslocamentos.append(posicao)
+                formas.append(im.shape)
+                formas_originais.append(forma_original)
+                posicao += im.nbytes
+                tempo_decodificacao += duracao
+
+        np.savez(temporario / ARQUIVO_INDICE,
+                 arquivos=np.asarray([str(Path(a).resolve()) for a in dataset.im_files]),
+                 deslocamentos=np.asarray(deslocamentos, dtype=np.int64),
+                 formas=np.asarray(formas, dtype=np.int32).reshape(-1, 3),
+                 formas_originais=np.asarray(formas_originais, dtype=np.int32).reshape(-1, 2))
+        metadados = {
+            "imagens": len(deslocamentos),
+            "imgsz": dataset.imgsz,
+            "classe_dataset": type(dataset).__name__,
+            "versao_ultralytics": ultralytics_version,
+            "bytes": posicao,
+            "tempo_decodificacao_s": tempo_decodificacao,
+            "tempo_construcao_s": time.perf_counter() - inicio,
+            "criado_em": datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(temporario / ARQUIVO_METADADOS, 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, indent=4, ensure_ascii=False)
+
+        if _ler_metadados(diretorio) is not None:
+            # Outro processo concluiu o mesmo cache primeiro (e pode estar lendo-o); o conteúdo é equivalente.
+            shutil.rmtree(temporario, ignore_errors=True)
+            return metadados
+        shutil.rmtree(diretorio, ignore_errors=True)
+        try:
+            temporario.replace(diretorio)
+        except OSError:
+            shutil.rmtree(temporario, ignore_errors=True)
+        return metadados
+
+    @staticmethod
+    def _registrar_uso(diretorio: Path, metadados: Dict[str, Any]):
+        metadados = {**metadados, "ultimo_uso": time.time()}
+        temporario = diretorio / f"{ARQUIVO_METADADOS}.tmp{os.getpid()}"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, indent=4, ensure_ascii=False)
+        temporario.replace(diretorio / ARQUIVO_METADADOS)
+
+    def _aplicar_orcamento(self, manter: Path):
+        """Remove os caches menos usados recentemente até o total caber em 'limite_bytes'."""
+        caches = []
+        for diretorio in self.raiz.iterdir():
+            # Diretórios '.tmp<pid>' são caches ainda em construção por algum processo.
+            metadados = _ler_metadados(diretorio) if diretorio.is_dir() and '.tmp' not in diretorio.name else None
+            if metadados is not None:
+                caches.append((metadados.get('ultimo_uso', 0.0), metadados.get('bytes', 0), diretorio))
+        total = sum(tamanho for _, tamanho, _ in caches)
+        for _, tamanho, diretorio in sorted(caches, key=lambda c: c[0]):
+            if total <= self.limite_bytes:
+                break
+            if diretorio == manter:
+                continue
+            shutil.rmtree(diretorio, ignore_errors=True)
+            total -= tamanho
+
+
+def criar_cache_tensores(config: Dict[str, Any], raiz: Path) -> CacheTensoresTeste:
+    return CacheTensoresTeste(raiz, int(config['MAX_SIZE_GB'] * 1024 ** 3))
+
+
+def listar_imagens(caminho_split) -> List[str]:
+    """Resolve um split de um data.yaml já verificado (diretório, lista ou .txt) em arquivos de imagem."""
+    caminhos = caminho_split if isinstance(caminho_split, list) else [caminho_split]
+    imagens = []
+    for caminho in caminhos:
+        caminho = Path(caminho)
+        if caminho.is_dir():
+            imagens.extend(str(p) for p in sorted(caminho.rglob('*')) if p.suffix[1:].lower() in IMG_FORMATS)
+        elif caminho.suffix == '.txt' and caminho.is_file():
+            with open(caminho, 'r', encoding='utf-8') as f:
+                imagens.extend(linha.strip() for linha in f if linha.strip())
+    return imagens
+
+
+def imagens_de_teste(data_config: str) -> List[str]:
+    """Arquivos de imagem do split 'test' (ou 'val', se o data.yaml não define 'test')."""
+    data = check_det_dataset(str(data_config))
+    return listar_imagens(data.get('test') or data['val'])
+
+
+def dataset_de_teste(data_config: str, imgsz: int):
+    """YOLODataset do split 'test' (ou 'val') em modo de validação, como o validator o constrói."""
+    data = check_det_dataset(data_config)
+    cfg = get_cfg(overrides={"imgsz": imgsz, "mode": "val"})
+    return build_yolo_dataset(cfg, data.get('test') or data['val'], batch=1, data=data, mode='val', stride=32)
+
+
+def entradas_de_latencia(leitor: LeitorTensores, imgsz: int, quantidade: int) -> List[torch.Tensor]:
+    """Tensores 1x3ximgszximgsz (RGB, 0-1) de imagens reais do cache, para o harness de latência."""
+    letterbox = LetterBox(new_shape=(imgsz, imgsz), auto=False)
+    entradas = []
+    for posicao in range(min(quantidade, len(leitor))):
+        im = letterbox(image=leitor.imagem(posicao)[0])
+        im = np.ascontiguousarray(im[..., ::-1].transpose(2, 0, 1))
+        entradas.append(torch.from_numpy(im).float().div(255).unsqueeze(0))
+    return entradas
+
+
+class CacheTensoresMixin:
+    """
+    Mixin para validators do Ultralytics: o dataset de validação passa a ler as imagens do cache
+    compartilhado de tensores de teste, construído na primeira avaliação do split.
+    """
+
+    cache_tensores_config: Dict[str, Any] = {}
+    resumo_cache_tensores: Dict[str, Any] = {}
+
+    def build_dataset(self, img_path, mode="val", batch=None):
+        dataset = super().build_dataset(img_path, mode=mode, batch=batch)
+        config = self.cache_tensores_config
+        _, self.resumo_cache_tensores = criar_cache_tensores(config, config['ROOT']).preparar(
+            dataset, config['BUILD_THREADS'])
+        return dataset
+
+
+def criar_validador_com_cache_tensores(validador_base, config: Dict[str, Any], raiz: Path):
+    """Subclasse de um validator (padrão ou já estendido) que lê o split de teste do cache de tensores."""
+    return type(f"{validador_base.__name__}CacheTensores", (CacheTensoresMixin, validador_base),
+                {'cache_tensores_config': {**config, 'ROOT': Path(raiz)}})
+
+
+def entradas_reais_de_teste(data_config: str, imgsz: int, config: Dict[str, Any], raiz: Path) -> List[torch.Tensor]:
+    """Entradas do harness de latência a partir do cache do split de teste (construído se ainda não existir)."""
+    dataset = dataset_de_teste(data_config, imgsz)
+    leitor, _ = criar_cache_tensores(config, raiz).preparar(dataset, config['BUILD_THREADS'])
+    return entradas_de_latencia(leitor, imgsz, config['LATENCY_SAMPLES'])
@@ -0,0 +1,198 @@
+import csv
+import datetime
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from config.paths import RUN_CATALOG_PATH
+from utils.edge_profiles import colunas_perfis
+from utils.learning_curve import InterrupcaoPorCurvaAprendizado, melhor_map_referencia
+from utils.progressive_resize import comparar_com_tamanho_fixo, eh_job_padrao
+from utils.run_catalog import gravar_metadados_run, CatalogoRuns
+
+
+def nomes_do_job(job: Dict[str, Any], config: Dict[str, Any], dataset_name: str, timestamp: str,
+                 professor: Optional[str] = None):
+    """
+    Nome do modelo com o sufixo da variante de treino ('-PR', '-FB', '-KD'), nome do job
+    ('<modelo>_<imgsz>px_<épocas>e') e nome do run ('<job>_on_<dataset>_<timestamp>').
+    """
+    sufixo = '-PR' if job.get('progressive_resize', False) else ('-FB' if job.get('frozen_backbone', False) else '')
+    if professor:
+        sufixo += '-KD'
+    modelo = f"{job['modelo']}{sufixo}"
+    job_name = f"{modelo}_{config['IMG_SIZE']}px_{config['NUM_EPOCHS']}e"
+    return modelo, job_name, f"{job_name}_on_{dataset_name}_{timestamp}"
+
+
+def resultado_inicial(job: Dict[str, Any], job_name: str, dataset_name: str,
+                      professor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Linha do relatório de um job antes da execução. O conjunto de colunas é o mesmo em todas as
+    famílias de modelos; recursos que não se aplicam ao job ficam como 'N/A'.
+    """
+    return {
+        "Job_Name": job_name, "Dataset": dataset_name, "Base_Model": job['base_model'],
+        "Status": "Failed", "mAP50_95": 0.0, "mAP50": 0.0, "Precision": 0.0,
+        "Recall": 0.0, "F1_Score": 0.0, "Latency_ms": 0.0, "Training_Time_Min": 0.0,
+        **{coluna: 0.0 for coluna in colunas_perfis()}, "Edge_CPU_Quota": "N/A",
+        "Resize_Schedule": "fixed", "Frozen_Backbone_Step_Ratio_Est": "N/A", "Teacher": professor or "N/A",
+        "Validation_Time_Saved_Min": 0.0,
+        "Output_Dir": "N/A", "Stop_Reason": "N/A", "Error": "N/A"
+    }
+
+
+def registrar_interrupcao_antecipada(model, config: Dict[str, Any], dataset_name: str, data_config: Path,
+                                     resultados: List[Dict[str, Any]], runs_dir: Path,
+                                     logger: logging.Logger) -> Optional[InterrupcaoPorCurvaAprendizado]:
+    """Anexa ao modelo o callback de interrupção por curva de aprendizado, se habilitado."""
+    if not config.get('EARLY_TERMINATION_ENABLED', False):
+        return None
+    if config.get('VAL_SCHEDULE_MODE') == 'subset':
+        # O callback só usa validações no split completo, que no modo 'subset' ficam restritas às
+        # últimas VAL_FULL_LAST_EPOCHS épocas: não haveria curva para extrapolar.
+        logger.warning("  Interrupção antecipada desativada: incompatível com VAL_SCHEDULE_MODE='subset'.")
+        return None
+    catalogo = CatalogoRuns(RUN_CATALOG_PATH)
+    catalogo.sincronizar(Path(runs_dir))
+    referencia = melhor_map_referencia(resultados, dataset_name, data_config, catalogo)
+    if referencia <= 0:
+        logger.info("  Nenhum job concluído nesta versão do dataset ainda; interrupção antecipada desativada "
+                    "para este job.")
+        return None
+    logger.info(f"  Interrupção antecipada ativa (referência mAP50-95: {referencia:.4f}).")
+    interrupcao = InterrupcaoPorCurvaAprendizado(referencia, config, logger)
+    model.add_callback("on_fit_epoch_end", interrupcao)
+    return interrupcao
+
+
+def registrar_conclusao(resultado_job: Dict[str, Any], results, model, interrupcao,
+                        latencias: Dict[str, Any], config: Dict[str, Any], logger: logging.Logger):
+    """Preenche a linha do relatório de um job concluído: métricas de validação, latências e status."""
+    final_metrics = results.results_dict
+    precision = final_metrics.get('metrics/precision(B)', 0)
+    recall = final_metrics.get('metrics/recall(B)', 0)
+    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+
+    tempo_economizado = (model.trainer.tempo_validacao_economizado() if model.trainer else None) or 0.0
+    if config['VAL_SCHEDULE_MODE'] != 'full':
+        logger.info(f"  Agenda de validação '{config['VAL_SCHEDULE_MODE']}': "
+                    f"{tempo_economizado / 60:.2f} min de validação economizados.")
+
+    status = "Completed"
+    if interrupcao is not None and interrupcao.motivo:
+        status = "Early_Terminated"
+        resultado_job["Stop_Reason"] = interrupcao.motivo
+
+    resultado_job.update({
+        "Status": status,
+        "mAP50_95": final_metrics.get('metrics/mAP50-95(B)', 0),
+        "mAP50": final_metrics.get('metrics/mAP50(B)', 0),
+        "Precision": precision,
+        "Recall": recall,
+        "F1_Score": f1_score,
+        **latencias,
+        "Validation_Time_Saved_Min": tempo_economizado / 60,
+        "Output_Dir": results.save_dir,
+    })
+
+
+def registrar_run(run_dir: Path, familia: str, job: Dict[str, Any], modelo: str, dataset_name: str,
+                  data_config: Path, resultado_job: Dict[str, Any], start_time: float,
+                  config: Dict[str, Any], logger: logging.Logger):
+    """Grava o 'run_metadata.json' do run e o registra no catálogo de runs (avaliador e visualizador)."""
+    run_dir = Path(run_dir)
+    if not run_dir.is_dir():
+        return
+    try:
+        gravar_metadados_run(run_dir, {
+            "modelo": modelo,
+            "familia": familia,
+            "modelo_base": job['base_model'],
+            "dataset": dataset_name,
+            "data_config": str(data_config),
+            "parametros": f"{config['IMG_SIZE']}px_{config['NUM_EPOCHS']}e",
+            "status": resultado_job["Status"],
+            "inicio": datetime.datetime.fromtimestamp(start_time).isoformat(timespec='seconds'),
+            "fim": datetime.datetime.now().isoformat(timespec='seconds'),
+            "resultado": resultado_job,
+            "job": job,
+            "config": config,
+        })
+        CatalogoRuns(RUN_CATALOG_PATH).registrar(run_dir)
+    except Exception:
+        logger.warning(f"Não foi possível gravar os metadados do run '{run_dir.name}'.", exc_info=True)
+
+
+def escrever_csv(caminho: Path, linhas: List[Dict[str, Any]], logger: logging.Logger, descricao: str):
+    """Grava as linhas em CSV (floats com 4 casas), com o cabeçalho da primeira linha."""
+    logger.info(f"Gerando {descricao} em '{caminho}'...")
+    try:
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with open(caminho, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=linhas[0].keys())
+            writer.writeheader()
+            for row in linhas:
+                writer.writerow({k: (f"{v:.4f}" if isinstance(v, float) else v) for k, v in row.items()})
+        return True
+    except Exception as e:
+        logger.error(f"Não foi possível gerar o {descricao}: {e}")
+        return False
+
+
+def comparar_backbone_congelado(resultados: List[Dict[str, Any]], chave_nome: str) -> List[Dict[str, Any]]:
+    """
+    Emparelha cada job de backbone congelado ('-FB') com o job padrão (ajuste fino completo) do
+    mesmo modelo base e dataset, comparando o tempo de parede medido e o mAP50-95 final. A razão
+    por passo estimada no início do job fica só como coluna secundária.
+    """
+    concluidos = [r for r in resultados if r.get('Status') == 'Completed']
+    completos = {(r['Base_Model'], r['Dataset']): r for r in concluidos if eh_job_padrao(r)}
+
+    comparativo = []
+    for congelado in concluidos:
+        if congelado.get('Frozen_Backbone_Step_Ratio_Est', 'N/A') == 'N/A' or congelado.get('Teacher', 'N/A') != 'N/A':
+            continue
+        completo = completos.get((congelado['Base_Model'], congelado['Dataset']))
+        if completo is None:
+            continue
+        tempo_completo = completo['Training_Time_Min']
+        tempo_congelado = congelado['Training_Time_Min']
+        comparativo.append({
+            "Full_Job": completo[chave_nome],
+            "Frozen_Job": congelado[chave_nome],
+            "Dataset": congelado['Dataset'],
+            "Full_Time_Min": tempo_completo,
+            "Frozen_Time_Min": tempo_congelado,
+            "Wall_Time_Speedup": tempo_completo / tempo_congelado if tempo_congelado > 0 else 0.0,
+            "Full_mAP50_95": completo['mAP50_95'],
+            "Frozen_mAP50_95": congelado['mAP50_95'],
+            "Delta_mAP50_95": congelado['mAP50_95'] - completo['mAP50_95'],
+            "Step_Ratio_Est": congelado['Frozen_Backbone_Step_Ratio_Est'],
+        })
+    return comparativo
+
+
+def gerar_relatorios(prefixo: str, resultados: List[Dict[str, Any]], reports_dir: Path, timestamp: str,
+                     logger: logging.Logger):
+    """
+    Relatório de resumo de todos os jobs ('<prefixo>_resumo_comparativo_<timestamp>.csv') e os
+    comparativos das variantes de treino com os jobs padrão equivalentes.
+    """
+    if not resultados:
+        logger.warning("Nenhum resultado para gerar relatório.")
+        return
+    reports_dir = Path(reports_dir)
+    if escrever_csv(reports_dir / f"{prefixo}_resumo_comparativo_{timestamp}.csv", resultados, logger,
+                    "relatório de resumo"):
+        logger.info("Relatório de resumo gerado com sucesso.")
+
+    comparativo = comparar_com_tamanho_fixo(resultados, "Job_Name")
+    if comparativo:
+        escrever_csv(reports_dir / f"{prefixo}_comparativo_resolucao_progressiva_{timestamp}.csv", comparativo,
+                     logger, "comparativo de resolução progressiva")
+
+    comparativo = comparar_backbone_congelado(resultados, "Job_Name")
+    if comparativo:
+        escrever_csv(reports_dir / f"{prefixo}_comparativo_backbone_congelado_{timestamp}.csv", comparativo,
+                     logger, "comparativo de backbone congelado")
@@ -0,0 +1,163 @@
+import math
+import random
+import shutil
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from ultralytics.data.utils import img2label_paths
+
+from utils.test_tensor_cache import listar_imagens
+
+MODOS_AGENDA = ('full', 'subset', 'interval')
+
+
+def gerar_subconjunto_estratificado(imagens: List[str], fracao: float, semente: int) -> List[str]:
+    """
+    Seleciona uma fração fixa das imagens de validação preservando a presença de todas as classes.
+    Cada classe contribui com ceil(fracao * n) das imagens em que aparece; imagens sem
+    anotação são amostradas na mesma fração. A semente torna o subconjunto reprodutível.
+    """
+    rng = random.Random(semente)
+    imagens_por_classe: Dict[int, List[str]] = {}
+    sem_anotacao = []
+
+    for imagem, label in zip(imagens, img2label_paths(imagens)):
+        classes = set()
+        if Path(label).is_file():
+            with open(label, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        classes.add(int(linha.split()[0]))
+                    except (ValueError, IndexError):
+                        continue
+        if not classes:
+            sem_anotacao.append(imagem)
+        for classe in classes:
+            imagens_por_classe.setdefault(classe, []).append(imagem)
+
+    selecionadas = set()
+    for classe in sorted(imagens_por_classe):
+        grupo = imagens_por_classe[classe]
+        selecionadas.update(rng.sample(grupo, max(1, math.ceil(fracao * len(grupo)))))
+    if sem_anotacao:
+        selecionadas.update(rng.sample(sem_anotacao, math.ceil(fracao * len(sem_anotacao))))
+
+    return [imagem for imagem in imagens if imagem in selecionadas]
+
+
+class AgendaValidacaoMixin:
+    """
+    Mixin para trainers do Ultralytics que reduz o custo da validação por época.
+
+    Modos ('VAL_SCHEDULE_MODE'):
+      - 'full': comportamento padrão, split 'valid' completo em toda época;
+      - 'subset': valida num subconjunto estratificado fixo do split 'valid';
+      - 'interval': valida o split completo apenas a cada 'VAL_INTERVAL_EPOCHS' épocas.
+
+    Nas últimas 'VAL_FULL_LAST_EPOCHS' épocas a validação é sempre completa. Apenas
+    validações no split completo atualizam o 'best_fitness', de modo que o 'best.pt'
+    continua sendo escolhido pelo split 'valid' inteiro.
+    """
+
+    agenda_config: Dict[str, Any] = {}
+
+    def _iniciar_agenda(self):
+        if hasattr(self, 'tempos_validacao_completa'):
+            return
+        self.tempos_validacao_completa: List[float] = []
+        self.tempo_validacao_reduzida = 0.0
+        self.epocas_validacao_reduzida = 0
+        self.epocas_sem_validacao = 0
+        self.validacao_completa_nesta_epoca = True
+        self.best_validado_completo = False
+        self.loader_subconjunto = None
+        self.imagens_subconjunto = 0
+
+    def _validacao_completa_obrigatoria(self) -> bool:
+        epoca = self.epoch + 1
+        return (self.agenda_config['VAL_SCHEDULE_MODE'] == 'full'
+                or epoca > self.epochs - self.agenda_config['VAL_FULL_LAST_EPOCHS']
+                or self.stopper.possible_stop)
+
+    def _obter_loader_subconjunto(self):
+        if self.loader_subconjunto is None:
+            imagens = listar_imagens(self.data.get('val'))
+            subconjunto = gerar_subconjunto_estratificado(
+                imagens, self.agenda_config['VAL_SUBSET_FRACTION'], self.agenda_config['VAL_SUBSET_SEED'])
+            caminho_lista = Path(self.save_dir) / 'val_subset.txt'
+            with open(caminho_lista, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(subconjunto) + '\n')
+            self.imagens_subconjunto = len(subconjunto)
+            self.loader_subconjunto = self.get_dataloader(
+                str(caminho_lista), self.test_loader.batch_size, rank=-1, mode='val')
+        return self.loader_subconjunto
+
+    def validate(self):
+        self._iniciar_agenda()
+        modo = self.agenda_config['VAL_SCHEDULE_MODE']
+        obrigatoria = self._validacao_completa_obrigatoria()
+
+        if modo == 'interval' and not obrigatoria and (self.epoch + 1) % self.agenda_config['VAL_INTERVAL_EPOCHS']:
+            self.epocas_sem_validacao += 1
+            self.validacao_completa_nesta_epoca = False
+            return self.metrics, None
+
+        self.validacao_completa_nesta_epoca = obrigatoria or modo == 'interval'
+        if self.validacao_completa_nesta_epoca:
+            self.validator.dataloader = self.test_loader
+            inicio = time.perf_counter()
+            metrics, fitness = super().validate()
+            self.tempos_validacao_completa.append(time.perf_counter() - inicio)
+            if fitness is not None and self.best_fitness == fitness:
+                self.best_validado_completo = True
+            return metrics, fitness
+
+        # Validação no subconjunto: alimenta as curvas, mas não disputa o 'best.pt' nem a interrupção antecipada.
+        self.validator.dataloader = self._obter_loader_subconjunto()
+        inicio = time.perf_counter()
+        metrics = self.validator(self)
+        self.tempo_validacao_reduzida += time.perf_counter() - inicio
+        self.epocas_validacao_reduzida += 1
+        if metrics is not None:
+            metrics.pop('fitness', None)
+        return metrics, None
+
+    def final_eval(self):
+        self._iniciar_agenda()
+        self.validator.dataloader = self.test_loader
+        if not self.best_validado_completo and self.last.exists():
+            # O treino terminou antes da janela de validação completa: o último checkpoint passa a
+            # ser o 'best.pt', validado no split completo pelo final_eval padrão.
+            shutil.copy(self.last, self.best)
+        super().final_eval()
+
+    def save_model(self):
+        if self.fitness is None and self.best_fitness is None:
+            # Época sem validação completa antes da primeira completa: no trainer padrão, None == None
+            # gravaria o 'best.pt' com pesos que não disputaram o split completo.
+            self.best_fitness = float('-inf')
+            try:
+                super().save_model()
+            finally:
+                self.best_fitness = None
+            return
+        super().save_model()
+
+    def tempo_validacao_economizado(self) -> Optional[float]:
+        """Estima, em segundos, o tempo de validação poupado em relação à validação completa por época."""
+        self._iniciar_agenda()
+        if not self.tempos_validacao_completa:
+            return None
+        media_completa = sum(self.tempos_validacao_completa) / len(self.tempos_validacao_completa)
+        epocas_reduzidas = self.epocas_validacao_reduzida + self.epocas_sem_validacao
+        return epocas_reduzidas * media_completa - self.tempo_validacao_reduzida
+
+
+def criar_trainer_agendado(model, config: Dict[str, Any]):
+    """Cria, a partir do trainer padrão da tarefa do modelo, uma subclasse com a agenda de validação."""
+    if config.get('VAL_SCHEDULE_MODE', 'full') not in MODOS_AGENDA:
+        raise ValueError(f"VAL_SCHEDULE_MODE inválido: {config.get('VAL_SCHEDULE_MODE')}. Use um de {MODOS_AGENDA}.")
+    trainer_base = model.task_map[model.task]['trainer']
+    return type(f"{trainer_base.__name__}AgendaValidacao", (AgendaValidacaoMixin, trainer_base),
+                {'agenda_config': dict(config)})
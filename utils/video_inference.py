@@ -0,0 +1,293 @@
+import json
+import time
+import queue
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import cv2
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.latency_benchmark import resumir_latencias
+
+EXTENSOES_VIDEO = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.mpg', '.mpeg', '.wmv')
+
+ARQUIVO_DETECCOES = 'deteccoes'
+ARQUIVO_QUADROS = 'quadros.parquet'
+ARQUIVO_RESUMO = 'resumo.json'
+
+ESQUEMA_DETECCOES = pa.schema([
+    ('frame', pa.int32()), ('tempo_s', pa.float32()),
+    ('x1', pa.float32()), ('y1', pa.float32()), ('x2', pa.float32()), ('y2', pa.float32()),
+    ('conf', pa.float32()), ('classe', pa.int16()),
+])
+
+
+@dataclass
+class Quadro:
+    """Frame decodificado: índice e instante no vídeo, imagem BGR e o relógio de quando sua leitura começou."""
+    indice: int
+    tempo_s: float
+    imagem: np.ndarray
+    inicio_leitura: float
+
+
+def listar_videos(fontes: List[str]) -> List[Path]:
+    """Arquivos de vídeo das fontes indicadas (arquivos ou diretórios, estes percorridos recursivamente)."""
+    videos = []
+    for fonte in map(Path, fontes):
+        if fonte.is_dir():
+            videos.extend(sorted(p for p in fonte.rglob('*') if p.suffix.lower() in EXTENSOES_VIDEO))
+        elif fonte.is_file():
+            videos.append(fonte)
+    return videos
+
+
+class DecodificadorVideo(threading.Thread):
+    """
+    Decodifica um vídeo numa thread própria e entrega os frames por uma fila limitada, de modo que
+    a decodificação (que libera o GIL no OpenCV) se sobrepõe à inferência. Só um a cada 'passo'
+    frames é decodificado; os demais são apenas avançados com 'grab()', sem custo de conversão.
+
+    Políticas sob carga (fila cheia):
+      - 'block': o decodificador espera; todos os frames do passo são processados (uso offline).
+      - 'drop_oldest': a leitura segue o ritmo do vídeo, como uma câmera ao vivo, e o frame mais
+        antigo da fila é descartado; a latência fica limitada e o FPS processado se adapta à carga.
+    """
+
+    FIM = None
+
+    def __init__(self, caminho: Path, passo: int, politica: str, capacidade: int):
+        super().__init__(daemon=True)
+        if politica not in ('block', 'drop_oldest'):
+            raise ValueError(f"Política de carga desconhecida: '{politica}'. Use 'block' ou 'drop_oldest'.")
+        self.caminho = Path(caminho)
+        self.passo = max(1, int(passo))
+        self.politica = politica
+        self.fila: queue.Queue = queue.Queue(maxsize=max(1, capacidade))
+        self.parar = threading.Event()
+        self.lidos = 0
+        self.descartados = 0
+        self.erro: Optional[BaseException] = None
+
+        captura = cv2.VideoCapture(str(self.caminho))
+        if not captura.isOpened():
+            raise IOError(f"Não foi possível abrir o vídeo '{self.caminho}'.")
+        self.fps = captura.get(cv2.CAP_PROP_FPS) or 30.0
+        self.total_frames = int(captura.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.altura = int(captura.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.largura = int(captura.get(cv2.CAP_PROP_FRAME_WIDTH))
+        captura.release()
+
+    def _enfileirar(self, quadro: Quadro):
+        if self.politica == 'block':
+            while not self.parar.is_set():
+                try:
+                    self.fila.put(quadro, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+        while True:
+            try:
+                self.fila.put_nowait(quadro)
+                return
+            except queue.Full:
+                try:
+                    self.fila.get_nowait()
+                    self.descartados += 1
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        captura = cv2.VideoCapture(str(self.caminho))
+        inicio = time.perf_counter()
+        indice = 0
+        try:
+            while not self.parar.is_set():
+                if indice % self.passo:
+                    if not captura.grab():
+                        break
+                    indice += 1
+                    continue
+                if self.politica == 'drop_oldest':
+                    # Ritmo de fonte ao vivo: o frame só "chega" no seu instante no vídeo.
+                    atraso = indice / self.fps - (time.perf_counter() - inicio)
+                    if atraso > 0:
+                        time.sleep(atraso)
+                inicio_leitura = time.perf_counter()
+                ok, imagem = captura.read()
+                if not ok:
+                    break
+                self.lidos += 1
+                self._enfileirar(Quadro(indice, indice / self.fps, imagem, inicio_leitura))
+                indice += 1
+        except BaseException as e:
+            self.erro = e
+        finally:
+            captura.release()
+            self.fila.put(self.FIM)
+
+    def encerrar(self):
+        """Interrompe a decodificação e esvazia a fila, liberando o decodificador bloqueado em 'put'."""
+        self.parar.set()
+        while self.is_alive():
+            try:
+                self.fila.get_nowait()
+            except queue.Empty:
+                self.join(timeout=0.05)
+
+    def proximo_lote(self, tamanho: int, espera_s: float) -> Optional[List[Quadro]]:
+        """
+        Até 'tamanho' frames: espera o primeiro e, depois, no máximo 'espera_s' pelos demais, o que
+        limita a latência acrescentada pelo agrupamento. Retorna None ao fim do vídeo.
+        """
+        quadro = self.fila.get()
+        if quadro is self.FIM:
+            return None
+        lote = [quadro]
+        limite = time.perf_counter() + espera_s
+        while len(lote) < tamanho:
+            try:
+                quadro = self.fila.get(timeout=max(0.0, limite - time.perf_counter()))
+            except queue.Empty:
+                break
+            if quadro is self.FIM:
+                # Devolve o marcador para encerrar na próxima chamada.
+                self.fila.put(self.FIM)
+                break
+            lote.append(quadro)
+        return lote
+
+
+class GravadorDeteccoes:
+    """
+    Grava as detecções de um vídeo de forma incremental em 'diretorio': 'deteccoes.parquet'
+    (uma linha por detecção, gravada em blocos) mais 'quadros.parquet' (uma linha por frame
+    processado, inclusive os sem detecções), ou 'deteccoes.jsonl' com um registro por frame.
+    """
+
+    def __init__(self, diretorio: Path, formato: str, linhas_por_bloco: int = 50_000):
+        if formato not in ('parquet', 'jsonl'):
+            raise ValueError(f"Formato de saída desconhecido: '{formato}'. Use 'parquet' ou 'jsonl'.")
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.formato = formato
+        self.linhas_por_bloco = linhas_por_bloco
+        self.caminho = self.diretorio / f"{ARQUIVO_DETECCOES}.{formato}"
+        self.total_deteccoes = 0
+        self._blocos: List[np.ndarray] = []
+        self._linhas_pendentes = 0
+        self._quadros: List[tuple] = []
+        if formato == 'parquet':
+            self._escritor = pq.ParquetWriter(self.caminho, ESQUEMA_DETECCOES, compression='zstd')
+        else:
+            self._escritor = open(self.caminho, 'w', encoding='utf-8')
+
+    def adicionar(self, quadro: Quadro, caixas: np.ndarray, conf: np.ndarray, classes: np.ndarray,
+                  latencia_ms: float):
+        self.total_deteccoes += len(conf)
+        if self.formato == 'jsonl':
+            registro = {"frame": quadro.indice, "tempo_s": round(quadro.tempo_s, 3),
+                        "latencia_ms": round(latencia_ms, 2),
+                        "deteccoes": [[*np.round(c, 1).tolist(), round(float(p), 4), int(k)]
+                                      for c, p, k in zip(caixas, conf, classes)]}
+            self._escritor.write(json.dumps(registro, separators=(',', ':')) + '\n')
+            return
+        self._quadros.append((quadro.indice, quadro.tempo_s, latencia_ms, len(conf)))
+        if len(conf):
+            self._blocos.append(np.column_stack([np.full(len(conf), quadro.indice), np.full(len(conf), quadro.tempo_s),
+                                                 caixas, conf, classes]))
+            self._linhas_pendentes += len(conf)
+            if self._linhas_pendentes >= self.linhas_por_bloco:
+                self._descarregar()
+
+    def _descarregar(self):
+        if not self._blocos:
+            return
+        dados = np.concatenate(self._blocos)
+        self._escritor.write_table(pa.Table.from_arrays(
+            [pa.array(dados[:, i].astype(campo.type.to_pandas_dtype())) for i, campo in enumerate(ESQUEMA_DETECCOES)],
+            schema=ESQUEMA_DETECCOES))
+        self._blocos, self._linhas_pendentes = [], 0
+
+    def fechar(self, resumo: Dict[str, Any]):
+        """Conclui os arquivos e grava o resumo da execução em 'resumo.json'."""
+        if self.formato == 'parquet':
+            self._descarregar()
+            self._escritor.close()
+            pq.write_table(pa.Table.from_arrays(
+                [pa.array(np.asarray([q[0] for q in self._quadros], dtype=np.int32)),
+                 pa.array(np.asarray([q[1] for q in self._quadros], dtype=np.float32)),
+                 pa.array(np.asarray([q[2] for q in self._quadros], dtype=np.float32)),
+                 pa.array(np.asarray([q[3] for q in self._quadros], dtype=np.int32))],
+                names=['frame', 'tempo_s', 'latencia_ms', 'deteccoes']),
+                self.diretorio / ARQUIVO_QUADROS, compression='zstd')
+        else:
+            self._escritor.close()
+        with open(self.diretorio / ARQUIVO_RESUMO, 'w', encoding='utf-8') as f:
+            json.dump(resumo, f, indent=4, ensure_ascii=False)
+
+
+def inferir_video(modelo, caminho: Path, config: Dict[str, Any], device: str,
+                  gravador: GravadorDeteccoes) -> Dict[str, Any]:
+    """
+    Inferência de um vídeo com decodificação em segundo plano e frames agrupados em lotes de até
+    BATCH_SIZE por passe do modelo. A latência de cada frame vai do início da sua leitura até as
+    detecções estarem disponíveis (decodificação, fila, agrupamento, inferência e pós-processamento).
+    Retorna o resumo da execução: frames lidos/processados/descartados, FPS sustentado e latências.
+    """
+    decodificador = DecodificadorVideo(caminho, config['FRAME_STRIDE'], config['LOAD_POLICY'], config['QUEUE_SIZE'])
+    parametros = dict(imgsz=config['IMG_SIZE'], conf=config['CONF_THRESHOLD'], iou=config['NMS_IOU'],
+                      max_det=config['MAX_DETECTIONS'], device=device, verbose=False)
+
+    # Aquecimento fora da medição, no tamanho real dos frames.
+    aquecimento = np.zeros((decodificador.altura or config['IMG_SIZE'], decodificador.largura or config['IMG_SIZE'], 3),
+                           dtype=np.uint8)
+    for _ in range(config['WARMUP_BATCHES']):
+        modelo.predict([aquecimento] * config['BATCH_SIZE'], **parametros)
+
+    latencias, processados, lotes = [], 0, 0
+    inicio = time.perf_counter()
+    decodificador.start()
+    try:
+        while True:
+            lote = decodificador.proximo_lote(config['BATCH_SIZE'], config['BATCH_TIMEOUT_MS'] / 1000)
+            if lote is None:
+                break
+            resultados = modelo.predict([q.imagem for q in lote], **parametros)
+            fim_lote = time.perf_counter()
+            for quadro, resultado in zip(lote, resultados):
+                latencia_ms = (fim_lote - quadro.inicio_leitura) * 1000
+                latencias.append(latencia_ms)
+                caixas = resultado.boxes
+                gravador.adicionar(quadro, caixas.xyxy.cpu().numpy(), caixas.conf.cpu().numpy(),
+                                   caixas.cls.cpu().numpy().astype(np.int64), latencia_ms)
+            processados += len(lote)
+            lotes += 1
+    finally:
+        decodificador.encerrar()
+    duracao = time.perf_counter() - inicio
+    if decodificador.erro is not None:
+        raise decodificador.erro
+
+    segundos_video = decodificador.total_frames / decodificador.fps if decodificador.total_frames > 0 else np.nan
+    return {
+        "video": str(caminho),
+        "resolucao": f"{decodificador.largura}x{decodificador.altura}",
+        "fps_video": decodificador.fps,
+        "frames_video": decodificador.total_frames,
+        "frames_lidos": decodificador.lidos,
+        "frames_processados": processados,
+        "frames_descartados": decodificador.descartados,
+        "lotes": lotes,
+        "deteccoes": gravador.total_deteccoes,
+        "tempo_total_s": duracao,
+        "fps_sustentado": processados / duracao if duracao > 0 else np.nan,
+        # > 1: o vídeo inteiro foi percorrido mais rápido que sua duração real.
+        "fator_tempo_real": segundos_video / duracao if duracao > 0 else np.nan,
+        **resumir_latencias(latencias),
+    }